@@ -0,0 +1,176 @@
+"""
+Content-addressed store of built artefacts, shareable between machines.
+
+    python artifact_store.py stats
+    python artifact_store.py gc --max-mb 2000
+    ARTIFACT_STORE=/mnt/maths/artifacts python build_all.py
+
+build_all.py keys every node by a hash of its inputs (options, generator
+source, question bank, toolchain versions).  Because packages are written
+reproducibly, equal keys mean equal bytes.  After a successful build the
+outputs are put here under that key, and any later build with the same key,
+on this machine or any other pointed at the same folder, copies them out
+instead of running the generator.
+
+Layout, all under one folder:
+
+    objects/ab/abcd…      file contents, named by their SHA-256
+    keys/12/1234….json    input key -> the object of each output, in order
+
+Objects are shared by every key that produced the same bytes.  Everything
+is written to a temporary name and renamed into place, so concurrent
+builders never see a half-written entry.  The store defaults to
+.build_cache/artifacts; set ARTIFACT_STORE (or pass --store) to use a
+department share.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE = os.path.join(HERE, ".build_cache", "artifacts")
+
+
+def default_root():
+    return os.environ.get("ARTIFACT_STORE") or DEFAULT_STORE
+
+def _digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ArtifactStore:
+
+    def __init__(self, root=None):
+        self.root = root or default_root()
+        self.hits = self.misses = self.stored = 0
+
+    def _object(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _manifest(self, key):
+        return os.path.join(self.root, "keys", key[:2], key + ".json")
+
+    def _place(self, write, path):
+        # Write through a temporary file in the same folder, then rename
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def fetch(self, key, targets):
+        """Copy the outputs stored under `key` to the `targets` paths; False on a miss."""
+        try:
+            with open(self._manifest(key), encoding="utf-8") as f:
+                objects = json.load(f)["objects"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return False
+        if len(objects) != len(targets) or not all(os.path.exists(self._object(d)) for d in objects):
+            self.misses += 1
+            return False
+        for digest, target in zip(objects, targets):
+            if os.path.exists(target) and _digest(target) == digest:
+                continue            # already the right bytes; keep its mtime
+            with open(self._object(digest), "rb") as src:
+                self._place(lambda f: shutil.copyfileobj(src, f), target)
+        os.utime(self._manifest(key))       # recently used, for gc()
+        self.hits += 1
+        return True
+
+    def put(self, key, paths):
+        """Store the files at `paths` as the outputs of `key`."""
+        objects = []
+        for path in paths:
+            digest = _digest(path)
+            if not os.path.exists(self._object(digest)):
+                with open(path, "rb") as src:
+                    self._place(lambda f: shutil.copyfileobj(src, f), self._object(digest))
+            objects.append(digest)
+        manifest = json.dumps({"objects": objects, "stored": time.time()}).encode()
+        self._place(lambda f: f.write(manifest), self._manifest(key))
+        self.stored += 1
+
+    def _files(self, kind):
+        folder = os.path.join(self.root, kind)
+        for sub, _, names in os.walk(folder):
+            for name in names:
+                yield os.path.join(sub, name)
+
+    def stats(self):
+        objects = list(self._files("objects"))
+        return {"root": self.root, "keys": sum(1 for _ in self._files("keys")),
+                "objects": len(objects), "bytes": sum(os.path.getsize(p) for p in objects)}
+
+    def gc(self, max_bytes):
+        """Drop the least recently used keys until the objects fit in `max_bytes`.
+
+        Returns (keys removed, bytes freed).
+        """
+        manifests = sorted(self._files("keys"), key=os.path.getmtime)
+        refs, sizes = {}, {}
+        for path in manifests:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    refs[path] = json.load(f)["objects"]
+            except (OSError, ValueError, KeyError):
+                refs[path] = []
+        for path in self._files("objects"):
+            sizes[os.path.basename(path)] = os.path.getsize(path)
+        users = Counter(d for objects in refs.values() for d in set(objects))
+        total = sum(sizes.values())
+        removed = freed = 0
+
+        def drop(digest):
+            nonlocal total, freed
+            if digest in sizes:
+                os.remove(self._object(digest))
+                size = sizes.pop(digest)
+                total -= size
+                freed += size
+        for digest in [d for d in sizes if not users[d]]:       # orphans first
+            drop(digest)
+        for path in manifests:
+            if total <= max_bytes:
+                break
+            os.remove(path)
+            removed += 1
+            for digest in set(refs[path]):
+                users[digest] -= 1
+                if not users[digest]:
+                    drop(digest)
+        return removed, freed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("command", choices=("stats", "gc"))
+    ap.add_argument("--store", default=None, help="store folder (default: $ARTIFACT_STORE or "
+                                                  ".build_cache/artifacts)")
+    ap.add_argument("--max-mb", type=float, default=1024, help="gc: size to shrink the store to")
+    args = ap.parse_args(argv)
+    store = ArtifactStore(args.store)
+    if args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    else:
+        removed, freed = store.gc(int(args.max_mb * (1 << 20)))
+        print(f"removed {removed} key(s), freed {freed / (1 << 20):.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
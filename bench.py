@@ -0,0 +1,194 @@
+"""
+Benchmark the document generators at 1x / 10x / 100x scale.
+
+Every case runs in a fresh interpreter, so imports, bank compilation and
+cache set-up are part of the measurement, and records
+
+    wall_s     wall-clock time of the whole process
+    rss_mb     peak resident set size (worker processes included)
+    parts      zip entries across the files it wrote
+    bytes      total size of those files
+
+Cases always build from scratch (--no-cache) unless --warm is given, in which
+case the fragment cache is primed first and the timed run starts hot.
+
+Results are appended to bench_results.json together with the current commit,
+and each case is compared with the previous entry so regressions stand out.
+
+Usage:  python bench.py [case ...] [--repeat N] [--warm] [--results FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS = os.path.join(HERE, "bench_results.json")
+
+Case = namedtuple("Case", "name description run")
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+# Each run(out_dir, cache_flag) executes inside the child process.
+def _lessons(count, script, ext):
+    def run(out_dir, cache_flag):
+        module = __import__(script)
+        for i in range(count):
+            module.main(cache_flag + ["-o", os.path.join(out_dir, f"lesson{i + 1:02}{ext}")])
+    return run
+
+def _class_pack(students):
+    def run(out_dir, cache_flag):
+        import make_worksheet
+        roster = os.path.join(out_dir, "roster.csv")
+        with open(roster, "w", encoding="utf-8") as f:
+            f.write("name,class\n")
+            f.writelines(f"Student {i + 1:03},10B\n" for i in range(students))
+        make_worksheet.main(cache_flag + ["--roster", roster,
+                                          "--pack", os.path.join(out_dir, "pack.docx")])
+    return run
+
+CASES = [
+    Case("worksheet-1x",  "the current lesson's worksheet",       _lessons(1, "make_worksheet", ".docx")),
+    Case("deck-1x",       "the current lesson's slide deck",      _lessons(1, "make_pptx", ".pptx")),
+    Case("worksheet-10x", "ten lessons' worksheets, one process", _lessons(10, "make_worksheet", ".docx")),
+    Case("deck-10x",      "ten lessons' decks, one process",      _lessons(10, "make_pptx", ".pptx")),
+    Case("pack-100x",     "a 100-student class pack",             _class_pack(100)),
+]
+CASES_BY_NAME = {c.name: c for c in CASES}
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+def package_stats(out_dir):
+    parts = size = 0
+    for name in os.listdir(out_dir):
+        if name.endswith((".docx", ".pptx")):
+            path = os.path.join(out_dir, name)
+            size += os.path.getsize(path)
+            with zipfile.ZipFile(path) as z:
+                parts += len(z.namelist())
+    return parts, size
+
+def measure(case, warm=False):
+    """Run one case in a child interpreter; returns its metrics dict."""
+    out_dir = tempfile.mkdtemp(prefix=f"bench-{case.name}-")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", case.name, out_dir]
+    try:
+        if warm:
+            subprocess.run(cmd + ["--warm"], cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+            for name in os.listdir(out_dir):
+                os.remove(os.path.join(out_dir, name))
+            cmd.append("--warm")
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=HERE, stdout=subprocess.DEVNULL)
+        # wait4 gives this child's own rusage (its pool workers included)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - t0
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode:
+            raise RuntimeError(f"{case.name} exited with status {proc.returncode}")
+        parts, size = package_stats(out_dir)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    rss_kb = usage.ru_maxrss if sys.platform != "darwin" else usage.ru_maxrss / 1024
+    return {"wall_s": round(wall, 3), "rss_mb": round(rss_kb / 1024, 1),
+            "parts": parts, "bytes": size}
+
+def best_of(case, repeat, warm):
+    runs = [measure(case, warm) for _ in range(repeat)]
+    best = min(runs, key=lambda r: r["wall_s"])
+    return dict(best, rss_mb=max(r["rss_mb"] for r in runs), runs=repeat)
+
+
+# ── Results file ──────────────────────────────────────────────────────────────
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return out + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_results(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+def previous(history, name, warm):
+    for entry in reversed(history):
+        if entry.get("warm") == warm and name in entry["cases"]:
+            return entry["cases"][name]
+    return None
+
+def change(new, old):
+    return f"{(new - old) / old * 100:+.0f}%" if old else ""
+
+def report(cases, history, warm):
+    print(f"{'case':<15}{'wall s':>9}{'':>6}{'RSS MB':>9}{'':>6}{'parts':>7}{'bytes':>11}{'':>6}")
+    for name, r in cases.items():
+        old = previous(history, name, warm) or {}
+        print(f"{name:<15}{r['wall_s']:>9.2f}{change(r['wall_s'], old.get('wall_s')):>6}"
+              f"{r['rss_mb']:>9.1f}{change(r['rss_mb'], old.get('rss_mb')):>6}"
+              f"{r['parts']:>7}{r['bytes']:>11,}{change(r['bytes'], old.get('bytes')):>6}")
+
+
+def child(name, out_dir, warm):
+    sys.path.insert(0, HERE)
+    CASES_BY_NAME[name].run(out_dir, [] if warm else ["--no-cache"])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("cases", nargs="*", metavar="case",
+                    help=f"cases to run (default: all of {', '.join(CASES_BY_NAME)})")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is kept")
+    ap.add_argument("--warm", action="store_true", help="time builds with a primed fragment cache")
+    ap.add_argument("--results", default=RESULTS, help="JSON file results are appended to")
+    ap.add_argument("--no-save", action="store_true", help="print results without recording them")
+    ap.add_argument("--child", nargs=2, metavar=("CASE", "OUT_DIR"), help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        child(*args.child, args.warm)
+        return 0
+
+    unknown = [n for n in args.cases if n not in CASES_BY_NAME]
+    if unknown:
+        ap.error(f"unknown case(s): {', '.join(unknown)}")
+    selected = [CASES_BY_NAME[n] for n in args.cases] if args.cases else CASES
+
+    history = load_results(args.results)
+    cases = {}
+    for case in selected:
+        print(f"… {case.name}: {case.description}", file=sys.stderr)
+        cases[case.name] = best_of(case, args.repeat, args.warm)
+    report(cases, history, args.warm)
+
+    if not args.no_save:
+        history.append({
+            "commit": git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "warm": args.warm,
+            "cases": cases,
+        })
+        with open(args.results, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2)
+            f.write("\n")
+        print(f"results appended to {args.results}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,537 @@
+"""
+Build every lesson's worksheet, answer key, deck, web page and PDFs in parallel.
+
+    python build_all.py                         # every *.lesson.json under this folder
+    python build_all.py term2/ --jobs 6         # lessons under other folders, or single files
+    python build_all.py --dry-run               # list what is out of date, and why
+    python build_all.py --force --only deck,html
+
+A lesson is described by a NAME.lesson.json file:
+
+    {
+      "lesson":     "Ex 1K – Applications of Simultaneous Linear Equations",
+      "worksheet":  {"output": "Ex 1K - Worksheet.docx", "levels": "foundation,standard"},
+      "answer-key": {"output": "Ex 1K - Answer Key.docx"},
+      "deck":       {"output": "Ex 1K - Lesson.pptx", "optimize": true},
+      "html":       {"output": "index.html", "dist": "dist"},
+      "pdf":        ["worksheet", "answer-key", "deck"]
+    }
+
+Every artefact is optional.  One without "output" goes where its generator
+saves it by default; relative paths are relative to the lesson file.  "module"
+swaps in another generator for an artefact (a make_worksheet.py look-alike
+carrying a different exercise's content).
+
+Each artefact is a node in a dependency graph: the answer check runs before
+anything that prints answers, and a PDF waits for the document it converts.
+A node's signature hashes its options, the source of its generator and of
+every project module that generator imports, the question bank, and the
+signatures of the nodes it depends on (a PDF's is just the converter's source
+and its document's signature).  A node is out of date when that
+signature differs from its last successful build, when one of its outputs is
+missing or was changed since, or when a node it depends on is out of date.
+Only those nodes run, on a process pool, each as soon as its dependencies are
+done, with a progress line and an estimate of the time left taken from how
+long each node took last time.  Signatures and timings are kept in
+.build_cache/build_all.json.
+
+Output locations are not part of a signature, and the packages are
+byte-reproducible, so a signature names exactly one set of output bytes.
+Finished outputs are kept under their signature in the artifact store (see
+artifact_store.py), and a node whose signature is already there is copied
+out instead of built: on a fresh checkout, or on any machine sharing the
+store.
+"""
+import argparse
+import ast
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(HERE, ".build_cache", "build_all.json")
+SUFFIX = ".lesson.json"
+SKIP_DIRS = {".build_cache", ".git", "__pycache__", "dist"}
+PATH_OPTIONS = {"output", "dist", "source"}
+FROM_STORE = "copied from the artifact store"
+
+Node = namedtuple("Node", "id lesson kind module params outputs deps")
+
+KINDS = {
+    # kind: (default generator, lesson options it takes besides output and module)
+    "worksheet":  ("make_worksheet", {"levels", "cache"}),
+    "answer-key": ("make_worksheet", {"levels"}),
+    "deck":       ("make_pptx",      {"optimize", "downsample", "cache"}),
+    "html":       ("make_html",      {"dist"}),
+}
+
+
+# ── Lessons → graph ───────────────────────────────────────────────────────────
+def discover(paths):
+    """Every lesson file named by `paths` or found under the folders among them."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+                found += [os.path.join(folder, f) for f in sorted(files) if f.endswith(SUFFIX)]
+        elif path.endswith(SUFFIX):
+            found.append(path)
+        else:
+            raise ValueError(f"not a lesson file ({SUFFIX}) or a folder: {path}")
+    return list(dict.fromkeys(os.path.abspath(p) for p in found))
+
+def _default_outputs(kind, module):
+    if kind == "worksheet":
+        return module.OUTPUT
+    if kind == "answer-key":
+        return module.ANSWER_KEY
+    if kind == "deck":
+        return module.OUTPUT
+    return module.PAGE
+
+def lesson_nodes(path):
+    """The graph nodes for one lesson file, each after the nodes it depends on."""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    lesson = os.path.basename(path)[:-len(SUFFIX)]
+    folder = os.path.dirname(path)
+    where = lambda p: os.path.normpath(os.path.join(folder, p))
+    unknown = set(spec) - set(KINDS) - {"lesson", "pdf"}
+    if unknown:
+        raise ValueError(f"{os.path.basename(path)}: unknown artefact(s) {', '.join(sorted(unknown))}")
+
+    nodes = []
+    for kind, (default_module, options) in KINDS.items():
+        if kind not in spec:
+            continue
+        opts = dict(spec[kind] or {})
+        bad = set(opts) - options - {"output", "module"}
+        if bad:
+            raise ValueError(f"{os.path.basename(path)}: {kind} does not take {', '.join(sorted(bad))}")
+        module_name = opts.pop("module", default_module)
+        module = importlib.import_module(module_name)
+        output = where(opts.pop("output")) if "output" in opts else _default_outputs(kind, module)
+        outputs = [output]
+        if kind in ("worksheet", "answer-key"):
+            opts["levels"] = ",".join(module.parse_levels(opts.get("levels") or ",".join(module.LEVELS)))
+        if kind == "html":
+            opts["dist"] = where(opts["dist"]) if opts.get("dist") else \
+                (module.DIST if "dist" not in opts else None)
+            if opts["dist"]:
+                outputs += [os.path.join(opts["dist"], n) for n in ("index.html", "index.html.gz")]
+        nodes.append(Node(f"{lesson}:{kind}", lesson, kind, module_name,
+                          dict(opts, output=output), tuple(outputs), ("verify",)))
+
+    built = {n.kind: n for n in nodes}
+    for kind in spec.get("pdf", ()):
+        source = built.get(kind)
+        if source is None or kind == "html":
+            raise ValueError(f"{os.path.basename(path)}: no .docx/.pptx artefact {kind!r} to convert to PDF")
+        target = os.path.splitext(source.params["output"])[0] + ".pdf"
+        nodes.append(Node(f"{lesson}:pdf:{kind}", lesson, "pdf", "pdf_export",
+                          {"source": source.params["output"], "output": target},
+                          (target,), (source.id,)))
+    return nodes
+
+def build_graph(lesson_files):
+    """{node id: Node} over every lesson, in an order where dependencies come first."""
+    graph = {"verify": Node("verify", None, "verify", "verify_answers", {}, (), ())}
+    writers = {}
+    for path in lesson_files:
+        for node in lesson_nodes(path):
+            if node.id in graph:
+                raise ValueError(f"two lessons are called {node.lesson!r}")
+            for out in node.outputs:
+                if out in writers:
+                    raise ValueError(f"{node.id} and {writers[out]} both write {out}")
+                writers[out] = node.id
+            graph[node.id] = node
+    return graph
+
+
+# ── Signatures & staleness ────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def project_sources(module_name):
+    """The module's file and those of every project module it imports, recursively."""
+    seen, todo = set(), [module_name]
+    while todo:
+        path = os.path.join(HERE, todo.pop() + ".py")
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.add(path)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for stmt in ast.walk(tree):
+            if isinstance(stmt, ast.Import):
+                todo += [alias.name.split(".")[0] for alias in stmt.names]
+            elif isinstance(stmt, ast.ImportFrom) and stmt.module and not stmt.level:
+                todo.append(stmt.module.split(".")[0])
+    return tuple(sorted(seen))
+
+@lru_cache(maxsize=None)
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def node_inputs(node):
+    from question_bank import BANK_SOURCE
+    if node.kind == "pdf":
+        # The converter only; the document it converts is covered by the dependency
+        return (os.path.join(HERE, node.module + ".py"),)
+    return project_sources(node.module) + (BANK_SOURCE,)
+
+@lru_cache(maxsize=None)
+def toolchain():
+    """Versions that can change a package's bytes without any source changing."""
+    from importlib import metadata
+    versions = [f"python={sys.version_info[0]}.{sys.version_info[1]}", f"zlib={zlib.ZLIB_VERSION}"]
+    for dist in ("python-docx", "python-pptx", "lxml", "Pillow", "numpy"):
+        try:
+            versions.append(f"{dist}={metadata.version(dist)}")
+        except metadata.PackageNotFoundError:
+            pass
+    return " ".join(versions)
+
+def signatures(graph):
+    """{node id: hash of everything that decides its outputs' bytes}.
+
+    Output locations are left out, so the same artefact built for two lessons,
+    or on two machines, has the same signature (and artifact store key).
+    """
+    sigs = {}
+    for node in graph.values():
+        options = {k: (bool(v) if k in PATH_OPTIONS else v) for k, v in node.params.items()}
+        h = hashlib.sha256(json.dumps([node.kind, node.module, options, toolchain()],
+                                      sort_keys=True).encode())
+        for path in node_inputs(node):
+            h.update(f"{os.path.relpath(path, HERE)}={file_digest(path)}\n".encode())
+        for dep in node.deps:
+            h.update(sigs[dep].encode())
+        sigs[node.id] = h.hexdigest()
+    return sigs
+
+def output_stamp(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def outdated(graph, sigs, state, force=False):
+    """{node id: reason} for every node that needs to run."""
+    stale = {}
+    for node in graph.values():
+        record = state.get(node.id)
+        if force:
+            stale[node.id] = "forced"
+        elif record is None:
+            stale[node.id] = "never built"
+        elif any(dep in stale for dep in node.deps):
+            stale[node.id] = "dependency out of date"
+        elif record["signature"] != sigs[node.id]:
+            stale[node.id] = "sources or options changed"
+        elif any(output_stamp(p) is None for p in node.outputs):
+            stale[node.id] = "output missing"
+        elif any(output_stamp(p) != record["outputs"].get(p) for p in node.outputs):
+            stale[node.id] = "output changed since it was built"
+    return stale
+
+def load_state():
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, STATE_FILE)
+
+
+# ── Pool workers ──────────────────────────────────────────────────────────────
+_slot = None
+
+def _init_worker(counter):
+    # Each worker gets its own number, and so its own LibreOffice profile
+    global _slot
+    with counter.get_lock():
+        _slot = counter.value
+        counter.value += 1
+
+def _build_verify(module, p):
+    module.verify()
+
+def _build_worksheet(module, p):
+    cache = module.worksheet_cache() if p.get("cache", True) else None
+    module.write_worksheet(p["output"], cache, levels=module.parse_levels(p["levels"]))
+
+def _build_answer_key(module, p):
+    import reproducible
+    reproducible.save(module.build_answer_key(levels=module.parse_levels(p["levels"])), p["output"])
+
+def _build_deck(module, p):
+    cache = module.deck_cache() if p.get("cache", True) else None
+    if p.get("optimize") or p.get("downsample"):
+        import pptx_optimize
+        data, _ = pptx_optimize.optimize_package(module.deck_bytes(cache), p.get("downsample"))
+        with open(p["output"], "wb") as f:
+            f.write(data)
+    else:
+        module.write_deck(p["output"], cache)
+
+def _build_html(module, p):
+    html = module.build_page()
+    with open(p["output"], "w", encoding="utf-8") as f:
+        f.write(html)
+    if p["dist"]:
+        module.publish(html, p["dist"])
+
+_converter = None
+
+def _build_pdf(module, p):
+    # One converter per worker process, kept for every PDF node it runs: with the
+    # uno bridge that is one warm office per worker, as in pdf_export.export()
+    global _converter
+    if _converter is None or (_converter.soffice, _converter.timeout) != (p["soffice"], p["timeout"]):
+        if _converter is not None:
+            _converter.close()
+        kind = module.UnoConverter if module.uno is not None else module.CliConverter
+        _converter = kind(p["soffice"], f"build-{_slot}", p["timeout"])
+        multiprocessing.util.Finalize(_converter, _converter.close, exitpriority=10)
+    _converter.start()
+    _converter.convert(module.Job(p["source"], p["output"]))
+
+ACTIONS = {"verify": _build_verify, "worksheet": _build_worksheet, "answer-key": _build_answer_key,
+           "deck": _build_deck, "html": _build_html, "pdf": _build_pdf}
+
+def run_node(kind, module_name, params):
+    """(seconds, captured output) for one node; runs in a pool worker."""
+    t0 = time.perf_counter()
+    if "output" in params:
+        os.makedirs(os.path.dirname(params["output"]), exist_ok=True)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ACTIONS[kind](importlib.import_module(module_name), params)
+    return time.perf_counter() - t0, out.getvalue()
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+def _clock(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+class Progress:
+    """Counts finished nodes and estimates the time left from last run's timings."""
+
+    def __init__(self, todo, estimates, jobs, log):
+        self.total = len(todo)
+        self.estimates = estimates
+        self.jobs = jobs
+        self.log = log
+        self.pending = set(todo)
+        self.running = {}
+        self.finished = 0
+        self.done_work = 0.0
+        self.all_work = sum(estimates[n] for n in todo) or 1.0
+
+    def start(self, node_id):
+        self.running[node_id] = time.perf_counter()
+
+    def finish(self, node_id, state):
+        started = self.running.pop(node_id, None)
+        self.pending.discard(node_id)
+        self.finished += 1
+        self.done_work += self.estimates[node_id]
+        now = time.perf_counter()
+        left = sum(self.estimates[n] for n in self.pending if n not in self.running)
+        left += sum(max(0.0, self.estimates[n] - (now - t)) for n, t in self.running.items())
+        width = min(self.jobs, len(self.pending)) or 1
+        took = f"{now - started:6.1f}s" if started is not None else " " * 7
+        eta = f" · ETA {_clock(left / width)}" if self.pending else ""
+        self.log(f"[{self.finished:>{len(str(self.total))}}/{self.total}] {node_id:<28} {took} "
+                 f"{state:<8}| {self.done_work / self.all_work:4.0%}{eta}")
+
+def dependents_of(graph, node_id, among):
+    found, todo = set(), [node_id]
+    while todo:
+        current = todo.pop()
+        for node in graph.values():
+            if current in node.deps and node.id in among and node.id not in found:
+                found.add(node.id)
+                todo.append(node.id)
+    return found
+
+def schedule(graph, todo, jobs, extra, estimates, log, sigs, store=None, fetch=True):
+    """Run the `todo` nodes, each once its dependencies have succeeded.
+
+    With a store, a node whose signature is already there is copied out of it
+    instead of run (unless `fetch` is off), and what does run is put in it.
+    Returns {node id: (ok, seconds, message)}; the dependents of a failed
+    node are not run and are reported as skipped.
+    """
+    waiting = {n: {d for d in graph[n].deps if d in todo} for n in todo}
+    results = {}
+    progress = Progress(todo, estimates, jobs, log)
+
+    def succeeded(node_id, seconds, message, state):
+        results[node_id] = (True, seconds, message)
+        progress.finish(node_id, state)
+        for deps in waiting.values():
+            deps.discard(node_id)
+
+    counter = multiprocessing.Value("i", 0)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(counter,)) as pool:
+        running = {}
+        while waiting or running:
+            ready = [n for n, deps in waiting.items() if not deps]
+            for node_id in ready:
+                node = graph[node_id]
+                if store is not None and fetch and node.outputs:
+                    t0 = time.perf_counter()
+                    if store.fetch(sigs[node_id], node.outputs):
+                        del waiting[node_id]
+                        progress.start(node_id)
+                        succeeded(node_id, time.perf_counter() - t0, FROM_STORE, "stored")
+                        continue
+                if len(running) == jobs:
+                    continue
+                params = dict(node.params, **extra) if node.kind == "pdf" else node.params
+                running[pool.submit(run_node, node.kind, node.module, params)] = node_id
+                progress.start(node_id)
+                del waiting[node_id]
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node_id = running.pop(future)
+                try:
+                    seconds, output = future.result()
+                except Exception as e:
+                    results[node_id] = (False, 0.0, f"{type(e).__name__}: {e}")
+                    progress.finish(node_id, "FAILED")
+                    for skipped in sorted(dependents_of(graph, node_id, waiting)):
+                        del waiting[skipped]
+                        results[skipped] = (False, 0.0, f"skipped: {node_id} failed")
+                        progress.finish(skipped, "skipped")
+                    continue
+                if store is not None and graph[node_id].outputs:
+                    try:
+                        store.put(sigs[node_id], graph[node_id].outputs)
+                    except OSError as e:        # an unreachable share only costs the sharing
+                        log(f"  (could not store {node_id}: {e})")
+                succeeded(node_id, seconds, output, "ok")
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("paths", nargs="*", help=f"lesson files ({SUFFIX}) or folders (default: {HERE})")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="worker processes (default: one per core)")
+    ap.add_argument("--only", help="comma-separated artefact kinds to build, e.g. worksheet,pdf")
+    ap.add_argument("--force", action="store_true", help="rebuild even what is up to date")
+    ap.add_argument("--dry-run", action="store_true", help="list what would be built and why")
+    ap.add_argument("--timeout", type=float, default=120, help="seconds allowed per PDF")
+    ap.add_argument("--soffice", default=None, help="path to the soffice executable")
+    ap.add_argument("--store", default=None,
+                    help="artifact store folder (default: $ARTIFACT_STORE or .build_cache/artifacts)")
+    ap.add_argument("--no-store", action="store_true", help="neither use nor fill the artifact store")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    from question_bank import load_bank
+    try:
+        lessons = discover(args.paths or [HERE])
+        if not lessons:
+            ap.error(f"no {SUFFIX} files found")
+        graph = build_graph(lessons)
+    except (ValueError, KeyError, ImportError) as e:
+        sys.exit(f"build_all.py: {e}")
+    if args.only:
+        kinds = {k.strip() for k in args.only.split(",") if k.strip()}
+        unknown = kinds - set(KINDS) - {"pdf", "verify"}
+        if unknown:
+            ap.error(f"--only: unknown kind(s) {', '.join(sorted(unknown))}")
+        wanted = {n.id for n in graph.values() if n.kind in kinds}
+    else:
+        wanted = set(graph)
+
+    state = load_state()
+    sigs = signatures(graph)
+    stale = outdated(graph, sigs, state, args.force)
+    # What was asked for, plus any out-of-date node it needs first
+    todo, check = set(), [n for n in wanted if n in stale]
+    while check:
+        node_id = check.pop()
+        if node_id not in todo:
+            todo.add(node_id)
+            check += [d for d in graph[node_id].deps if d in stale]
+
+    from pdf_export import find_soffice
+    soffice = args.soffice or find_soffice()
+    no_pdf = sorted(n for n in todo if graph[n].kind == "pdf") if not soffice else []
+    todo -= set(no_pdf)
+    todo = [n for n in graph if n in todo]          # dependency order
+
+    up_to_date = len(wanted) - len(wanted & set(todo)) - len(no_pdf)
+    print(f"{len(lessons)} lesson(s), {len(graph)} node(s): {len(todo)} to build, "
+          f"{up_to_date} up to date" + (f", {len(no_pdf)} PDF(s) skipped (LibreOffice not found)"
+                                          if no_pdf else ""))
+    if args.dry_run:
+        for node_id in todo:
+            print(f"  {node_id:<28} {stale[node_id]}")
+        return 0
+    if not todo:
+        return 0
+
+    load_bank()     # compile the index once, before any worker needs it
+    known = [r["seconds"] for r in state.values() if r.get("seconds")]
+    guess = sum(known) / len(known) if known else 1.0
+    estimates = {n: state.get(n, {}).get("seconds") or guess for n in todo}
+    from artifact_store import ArtifactStore
+    store = None if args.no_store else ArtifactStore(args.store)
+    jobs = max(1, min(args.jobs, len(todo)))
+    t0 = time.perf_counter()
+    results = {}
+    try:
+        results = schedule(graph, todo, jobs, {"soffice": soffice, "timeout": args.timeout},
+                           estimates, lambda line: print(line, flush=True), sigs, store,
+                           fetch=not args.force)
+    finally:
+        for node_id, (ok, seconds, message) in results.items():
+            if ok:
+                if message == FROM_STORE:       # keep the real build time for the ETA
+                    seconds = state.get(node_id, {}).get("seconds") or seconds
+                state[node_id] = {"signature": sigs[node_id], "seconds": round(seconds, 3),
+                                  "outputs": {p: output_stamp(p) for p in graph[node_id].outputs}}
+        save_state(state)
+
+    failed = {n: r for n, r in results.items() if not r[0]}
+    stored = sum(1 for ok, _, message in results.values() if ok and message == FROM_STORE)
+    print(f"{len(results) - len(failed)} node(s) done in {time.perf_counter() - t0:.1f}s"
+          + (f", {stored} from the artifact store" if stored else "")
+          + (f", {len(failed)} failed or skipped" if failed else ""))
+    for node_id, (_, _, message) in failed.items():
+        print(f"  {node_id}: {message.strip().splitlines()[-1] if message.strip() else 'failed'}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Warm build daemon for make_worksheet.py, make_pptx.py, make_html.py and
+slide_preview.py.
+
+A cold build spends most of its time starting Python and importing
+python-docx / python-pptx / lxml.  The daemon pays that once: it imports the
+generators, maps the question bank and then serves build requests over a local
+socket.  It also polls the project's .py and .json files, reloads the changed
+modules and replays every build it has served, so a saved edit is rebuilt in
+a fraction of a second.
+
+    python build_daemon.py serve                 # leave running in a terminal
+    python build_daemon.py worksheet -o ws.docx  # thin client: asks the daemon
+    python build_daemon.py deck --no-cache
+    python build_daemon.py preview               # SVG previews; changed slides listed
+    python build_daemon.py status | stop
+
+Anything after the target name is passed to that generator's command line as
+is.  The client only imports the standard library.  If no daemon answers, it
+builds in-process from cold, so the command always works.
+
+The socket address and a random auth key are written to
+.build_cache/daemon.json (mode 0600), so only the same user can reach it.
+"""
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INFO_FILE = os.path.join(HERE, ".build_cache", "daemon.json")
+
+TARGETS = {"worksheet": "make_worksheet", "deck": "make_pptx", "html": "make_html",
+           "preview": "slide_preview"}
+
+# Reload order: every module comes after the project modules it imports from
+PROJECT_MODULES = (
+    "question_bank", "section_cache", "build_profile", "reproducible", "docx_stream", "pptx_optimize",
+    "minify", "grading", "problem_generator", "verify_answers", "make_worksheet", "text_fit", "make_pptx",
+    "make_html", "slide_preview",
+)
+
+REPLAY_LIMIT = 8
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+def request(message):
+    """Send one message to the daemon; None when no daemon is reachable."""
+    try:
+        with open(INFO_FILE, encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    from multiprocessing.connection import Client
+    address = info["address"] if isinstance(info["address"], str) else tuple(info["address"])
+    try:
+        conn = Client(address, authkey=bytes.fromhex(info["authkey"]))
+    except (OSError, EOFError):
+        return None
+    with conn:
+        conn.send(message)
+        return conn.recv()
+
+def run_cold(target, argv):
+    import importlib
+    sys.path.insert(0, HERE)
+    module = importlib.import_module(TARGETS[target])
+    try:
+        module.main(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (e.code is not None)
+    return 0
+
+def build(target, argv):
+    reply = request({"op": "build", "target": target, "argv": argv, "cwd": os.getcwd()})
+    if reply is None:
+        print("(no build daemon running — building cold)", file=sys.stderr)
+        return run_cold(target, argv)
+    sys.stdout.buffer.write(reply["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(reply["stderr"])
+    print(f"[daemon] {target} built in {reply['seconds']:.2f}s", file=sys.stderr)
+    return reply["status"]
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+def source_mtimes():
+    """mtime of every .py and .json source the builds depend on."""
+    mtimes = {}
+    for name in os.listdir(HERE):
+        if name.endswith((".py", ".json")):
+            path = os.path.join(HERE, name)
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                pass
+    return mtimes
+
+def reload_project():
+    import importlib
+    for name in PROJECT_MODULES:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+
+
+class BuildDaemon:
+
+    def __init__(self):
+        import threading
+        self.lock = threading.Lock()
+        self.mtimes = source_mtimes()
+        self.served = {}      # (target, argv, cwd) -> None, oldest first
+        self.builds = 0
+
+    def build(self, target, argv, cwd):
+        """(status, stdout bytes, stderr text, seconds) for one generator run."""
+        import contextlib
+        import io
+        import time
+        import traceback
+        # stdout is captured as bytes so "-o -" can stream a package back
+        out, err = io.BytesIO(), io.StringIO()
+        stdout = io.TextIOWrapper(out, encoding="utf-8", write_through=True)
+        status = 0
+        with self.lock, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(err):
+            t0 = time.perf_counter()
+            prev = os.getcwd()
+            os.chdir(cwd)
+            try:
+                sys.modules[TARGETS[target]].main(list(argv))
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code)
+                status = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                status = 1
+            finally:
+                os.chdir(prev)
+            seconds = time.perf_counter() - t0
+        self.builds += 1
+        if status == 0 and "-" not in argv:        # nothing to replay into for stdout
+            key = (target, tuple(argv), cwd)
+            self.served.pop(key, None)
+            self.served[key] = None
+            while len(self.served) > REPLAY_LIMIT:
+                del self.served[next(iter(self.served))]
+        return status, out.getvalue(), err.getvalue(), seconds
+
+    def handle(self, message):
+        op = message.get("op")
+        if op == "build":
+            if message.get("target") not in TARGETS:
+                return {"status": 2, "stdout": b"", "seconds": 0.0,
+                        "stderr": f"unknown target {message.get('target')!r}\n"}
+            status, stdout, stderr, seconds = self.build(message["target"], message["argv"],
+                                                         message["cwd"])
+            return {"status": status, "stdout": stdout, "stderr": stderr, "seconds": seconds}
+        if op == "status":
+            return {"pid": os.getpid(), "builds": self.builds,
+                    "watching": [" ".join((t,) + a) for t, a, _ in self.served]}
+        return {"error": f"unknown op {op!r}"}
+
+    def check(self):
+        """Reload and replay if any source changed since the last look."""
+        import time
+        now = source_mtimes()
+        changed = sorted(p for p in set(now) | set(self.mtimes) if now.get(p) != self.mtimes.get(p))
+        if not changed:
+            return
+        self.mtimes = now
+        names = ", ".join(os.path.basename(p) for p in changed)
+        if any(p.endswith(".py") for p in changed):
+            t0 = time.perf_counter()
+            try:
+                with self.lock:
+                    reload_project()
+            except Exception as e:      # e.g. a half-saved file; wait for the next save
+                log(f"{names} changed — reload failed: {e!r}")
+                return
+            log(f"{names} changed — reloaded in {time.perf_counter() - t0:.2f}s")
+        else:
+            log(f"{names} changed")
+        for target, argv, cwd in list(self.served):
+            status, stdout, stderr, seconds = self.build(target, argv, cwd)
+            # A generator's last line is its summary, e.g. which slides a preview changed
+            last = stdout.decode("utf-8", "replace").strip().rsplit("\n", 1)[-1]
+            outcome = (f"ok  {last}" if last else "ok") if status == 0 else f"FAILED\n{stderr}"
+            log(f"  rebuilt {' '.join((target,) + argv)} in {seconds:.2f}s {outcome}")
+
+    def watch(self, interval):
+        import time
+        while True:
+            time.sleep(interval)
+            self.check()
+
+
+def log(text):
+    import time
+    print(f"{time.strftime('%H:%M:%S')} {text}", file=sys.__stdout__, flush=True)
+
+def serve(watch=True, interval=0.25):
+    import importlib
+    import secrets
+    import threading
+    import time
+    from multiprocessing.connection import Listener
+
+    if request({"op": "status"}) is not None:
+        sys.exit("a build daemon is already running")
+    t0 = time.perf_counter()
+    sys.path.insert(0, HERE)
+    for name in PROJECT_MODULES:
+        importlib.import_module(name)
+    sys.modules["question_bank"].load_bank()
+    daemon = BuildDaemon()
+
+    os.makedirs(os.path.dirname(INFO_FILE), exist_ok=True)
+    if sys.platform == "win32":
+        address, family = ("127.0.0.1", 0), "AF_INET"
+    else:
+        address, family = os.path.join(os.path.dirname(INFO_FILE), "daemon.sock"), "AF_UNIX"
+        if os.path.exists(address):
+            os.remove(address)          # stale socket from a daemon that died
+    authkey = secrets.token_bytes(32)
+    with Listener(address, family, authkey=authkey) as listener:
+        fd = os.open(INFO_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"address": listener.address, "authkey": authkey.hex(),
+                       "pid": os.getpid()}, f)
+        if watch:
+            threading.Thread(target=daemon.watch, args=(interval,), daemon=True).start()
+        log(f"build daemon ready in {time.perf_counter() - t0:.2f}s (pid {os.getpid()})"
+            + (", watching sources" if watch else ""))
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except OSError:     # includes a client that failed authentication
+                    continue
+                with conn:
+                    try:
+                        message = conn.recv()
+                    except EOFError:
+                        continue
+                    if message.get("op") == "stop":
+                        conn.send({"stopped": os.getpid()})
+                        break
+                    conn.send(daemon.handle(message))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            try:
+                os.remove(INFO_FILE)
+            except FileNotFoundError:
+                pass
+    log("build daemon stopped")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else None
+    if command in TARGETS:
+        return build(command, argv[1:])
+    if command == "serve":
+        import argparse
+        ap = argparse.ArgumentParser(prog="build_daemon.py serve")
+        ap.add_argument("--no-watch", action="store_true",
+                        help="serve builds but do not watch sources")
+        ap.add_argument("--interval", type=float, default=0.25,
+                        help="seconds between source checks")
+        args = ap.parse_args(argv[1:])
+        serve(not args.no_watch, args.interval)
+        return 0
+    if command in ("status", "stop"):
+        reply = request({"op": command})
+        if reply is None:
+            print("no build daemon running")
+            return 1
+        print(json.dumps(reply, indent=2))
+        return 0
+    print(__doc__.strip().split("\n\n")[2], file=sys.stderr)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
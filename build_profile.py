@@ -0,0 +1,168 @@
+"""
+Opt-in build instrumentation for make_worksheet.py and make_pptx.py.
+
+With --profile (or BUILD_PROFILE=1 in the environment) every shared helper is
+wrapped to count its calls, each worksheet PART / slide and the save phase are
+timed as spans, and a report sorted by self time is printed when the build
+finishes:
+
+    python make_worksheet.py --profile
+    python make_pptx.py --trace deck.folded      # also writes folded stacks
+
+--trace writes one "build;slide_roadmap;add_label_box;add_text 1234" line per
+distinct call stack, weighted by self time in microseconds — the format
+flamegraph.pl, inferno and speedscope read directly.
+
+When profiling is off, span() hands back a shared no-op context manager and no
+helper is wrapped, so normal builds pay nothing.
+"""
+import functools
+import os
+import sys
+from collections import Counter
+from time import perf_counter_ns
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("prof", "name", "start", "child")
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+        self.child = 0
+
+    def __enter__(self):
+        self.prof._stack.append(self)
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = perf_counter_ns() - self.start
+        stack = self.prof._stack
+        stack.pop()
+        own = elapsed - self.child
+        if stack:
+            stack[-1].child += elapsed
+        else:
+            self.prof.wall += elapsed
+        path = ";".join([s.name for s in stack] + [self.name])
+        self.prof.folded[path] += own
+        stats = self.prof.stats.setdefault(self.name, [0, 0, 0])     # calls, total, self
+        stats[0] += 1
+        stats[2] += own
+        if all(s.name != self.name for s in stack):   # count recursion once
+            stats[1] += elapsed
+        return False
+
+
+class BuildProfile:
+    """Call counts and timings for one build process."""
+
+    def __init__(self):
+        self._wrapped = []      # (namespace, name) of every helper instrument() replaced
+        self.reset()
+
+    def reset(self):
+        """Back to off with no stats, for the next build in a long-lived process."""
+        self.enabled = False
+        self.stats = {}
+        self.folded = Counter()
+        self.wall = 0
+        self._stack = []
+
+    def enable(self):
+        self.enabled = True
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def wrap(self, fn, name=None):
+        name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            with _Span(self, name):
+                return fn(*args, **kwargs)
+        timed.profiled = True
+        return timed
+
+    def instrument(self, namespace, names):
+        """Replace each named function in `namespace` (a module's globals()) with a timed wrapper."""
+        for name in names:
+            if not getattr(namespace[name], "profiled", False):    # main() may run twice
+                namespace[name] = self.wrap(namespace[name])
+                self._wrapped.append((namespace, name))
+
+    def uninstrument(self):
+        """Put back every helper instrument() wrapped."""
+        for namespace, name in self._wrapped:
+            fn = namespace.get(name)
+            if getattr(fn, "profiled", False):
+                namespace[name] = fn.__wrapped__
+        self._wrapped = []
+
+    def report(self, file=None, top=None):
+        file = file or sys.stderr
+        roots = self.wall
+        rows = sorted(self.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:top]
+        width = max([len(name) for name, _ in rows] + [12])
+        print(f"\nbuild profile — {roots / 1e9:.3f} s", file=file)
+        print(f"  {'span':<{width}}  {'calls':>7}  {'total ms':>10}  {'self ms':>10}  {'self %':>6}",
+              file=file)
+        for name, (calls, total, own) in rows:
+            share = own / roots * 100 if roots else 0
+            print(f"  {name:<{width}}  {calls:>7}  {total / 1e6:>10.1f}  {own / 1e6:>10.1f}  "
+                  f"{share:>5.1f}%", file=file)
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, ns in sorted(self.folded.items()):
+                if ns >= 1000:
+                    f.write(f"{stack} {ns // 1000}\n")
+
+
+PROFILE = BuildProfile()
+
+
+# ── Command-line glue shared by the generators ────────────────────────────────
+def add_arguments(ap):
+    ap.add_argument("--profile", action="store_true",
+                    help="count helper calls, time every section and the save, print a report")
+    ap.add_argument("--trace", metavar="FILE",
+                    help="with profiling, also write flamegraph folded stacks to FILE")
+
+def configure(args, namespace, helpers):
+    """Turn profiling on if asked for, wrapping `helpers` in `namespace`.
+
+    Every run starts from a clean profile, so an earlier --profile build in the
+    same process (the build daemon, the render service) leaves nothing behind.
+    """
+    PROFILE.uninstrument()
+    PROFILE.reset()
+    if args.profile or args.trace or os.environ.get("BUILD_PROFILE", "") not in ("", "0"):
+        PROFILE.enable()
+        PROFILE.instrument(namespace, helpers)
+
+def finish(args):
+    """Print the report if profiling, then unwrap the helpers and switch it off."""
+    try:
+        if PROFILE.enabled:
+            PROFILE.report()
+            if args.trace:
+                PROFILE.write_folded(args.trace)
+                print(f"folded stacks written to {args.trace}", file=sys.stderr)
+    finally:
+        PROFILE.uninstrument()
+        PROFILE.reset()
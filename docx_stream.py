@@ -0,0 +1,161 @@
+"""
+Streaming .docx writer for very large class packs.
+
+python-docx holds the whole document tree until save(), so merging hundreds of
+worksheets into one printable file grows memory with every page and then pauses
+for the final serialise.  StreamingDocument wraps an ordinary python-docx
+Document and writes word/document.xml straight into the output zip instead:
+content is built in the wrapped document as usual (heading(), body(),
+answer_box(), section_banner(), the fragment cache — anything that takes a
+`doc`), and flush() serialises everything rendered so far into the compressed
+zip stream and drops it from the tree.  Memory stays at one worksheet however
+many are written.
+
+    with StreamingDocument("pack.docx") as doc:
+        for ...:
+            heading(doc, "…")
+            doc.flush()
+            doc.page_break()
+
+The remaining parts (styles, settings, relationships, content types) come from
+the wrapped document when it is closed, and the section properties (page size,
+margins) are written last, as Word expects.  Every entry carries the fixed
+metadata from reproducible.py, so a pack's bytes depend only on its content.
+
+Bodies can also be rendered elsewhere — in a worker process, say — and handed
+over whole: body_fragment(doc) serialises a document's body and collects the
+images it references, and write_fragment() streams that into the package,
+pointing every picture at a single shared image part per distinct image.
+"""
+import io
+import re
+import zipfile
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from lxml import etree
+
+from reproducible import canonical_part, part_order, zip_info
+
+DOCUMENT_PART = "word/document.xml"
+PAGE_BREAK = f'<w:p {nsdecls("w")}><w:r><w:br w:type="page"/></w:r></w:p>'
+
+_XMLNS = re.compile(rb' xmlns:(\w+)="([^"]*)"')
+_EMBED = re.compile(rb' r:embed="([^"]+)"')
+
+
+def declared_namespaces(root):
+    return {p.encode(): u.encode() for p, u in root.nsmap.items() if p}
+
+def serialise(el, declared):
+    """`el` as bytes, minus the xmlns declarations the document root already makes."""
+    blob = etree.tostring(el, encoding="UTF-8", with_tail=False)
+    end = blob.index(b">")
+    tag = _XMLNS.sub(lambda m: b"" if declared.get(m.group(1)) == m.group(2)
+                     else m.group(0), blob[:end])
+    return tag + blob[end:]
+
+def body_fragment(doc):
+    """(xml bytes, images) for everything in `doc`'s body except its section properties.
+
+    `images` maps each relationship id the XML embeds to that image's bytes.
+    """
+    body = doc.element.body
+    declared = declared_namespaces(doc.element)
+    xml = b"".join(serialise(el, declared) for el in body if el is not body.sectPr)
+    images = {}
+    for rId in _EMBED.findall(xml):
+        rId = rId.decode()
+        if rId not in images:
+            images[rId] = doc.part.related_parts[rId].blob
+    return xml, images
+
+
+class StreamingDocument:
+    """A python-docx Document whose body is streamed to `out` as it is built."""
+
+    def __init__(self, out, template=None, compression=zipfile.ZIP_DEFLATED):
+        self.doc = Document(template)
+        body = self.doc.element.body
+        for el in list(body):
+            if el is not body.sectPr:
+                body.remove(el)
+        self._zip = zipfile.ZipFile(out, "w", compression)
+        self._stream = self._zip.open(zip_info(DOCUMENT_PART, compression), "w", force_zip64=True)
+
+        # Root and body start tags are written once; every flushed element is
+        # then emitted without re-declaring the namespaces the root already has.
+        root = self.doc.element
+        shell = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+        etree.SubElement(shell, body.tag)
+        head = etree.tostring(shell, xml_declaration=True, encoding="UTF-8", standalone=True)
+        w = body.prefix
+        self._stream.write(head.rpartition(f"<{w}:body/>".encode())[0] + f"<{w}:body>".encode())
+        self._tail = f"</{w}:body></{root.prefix}:document>".encode()
+        self._declared = declared_namespaces(root)
+
+    def __getattr__(self, name):
+        # add_paragraph, add_table, sections, element, … all go to the wrapped document
+        return getattr(self.doc, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._zip.fp is not None:
+            self._stream.close()
+            self._zip.close()
+
+    def _serialise(self, el):
+        return serialise(el, self._declared)
+
+    def flush(self):
+        """Write everything rendered so far and drop it from the tree."""
+        body = self.doc.element.body
+        sect_pr = body.sectPr
+        for el in list(body):
+            if el is sect_pr:
+                continue
+            self._stream.write(self._serialise(el))
+            body.remove(el)
+
+    def write_fragment(self, xml, images=None):
+        """Stream body XML from body_fragment(), relinking its images to this package.
+
+        Identical images share one part (python-docx matches them by SHA-1),
+        so a picture repeated on every copy is stored once.
+        """
+        self.flush()
+        if images:
+            relink = {}
+            for rId, blob in images.items():
+                relink[rId.encode()] = self.doc.part.get_or_add_image(io.BytesIO(blob))[0].encode()
+            xml = _EMBED.sub(lambda m: m.group(0).replace(m.group(1), relink[m.group(1)]), xml)
+        self._stream.write(xml)
+
+    def page_break(self):
+        self.flush()
+        self._stream.write(self._serialise(parse_xml(PAGE_BREAK)))
+
+    def close(self):
+        if self._zip.fp is None:          # already closed
+            return
+        self.flush()
+        sect_pr = self.doc.element.body.sectPr
+        if sect_pr is not None:
+            self._stream.write(self._serialise(sect_pr))
+        self._stream.write(self._tail)
+        self._stream.close()
+
+        # Every other part comes from the (now empty) wrapped document
+        buf = io.BytesIO()
+        self.doc.save(buf)
+        with zipfile.ZipFile(buf) as src:
+            for name in part_order(src.namelist()):
+                if name != DOCUMENT_PART:
+                    self._zip.writestr(zip_info(name, self._zip.compression),
+                                       canonical_part(name, src.read(name)))
+        self._zip.close()
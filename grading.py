@@ -0,0 +1,276 @@
+"""
+Bulk grading of student responses against the shared question bank.
+
+    python grading.py responses.csv                  # summary only
+    python grading.py responses.csv -o graded.csv
+    python grading.py term1/*.jsonl --out-dir graded/ --jobs 4
+
+Each question's accepted answers are compiled once into a Matcher.  A
+response is normalised — case and currency symbols dropped, commas or spaces
+between groups of three digits read as thousands separators, one of the known
+UNITS after the number ("hours", "km", "°", "%") and a leading "x =" ignored —
+and then compared as a number, with a small relative tolerance, or as a word.
+So "$3,000", "3000.0" and "3 000 dollars" all mean 3000, "Infinitely many"
+matches "infinitely many", and "25abc" or the decimal comma in "3,5" are not
+numbers at all.  grade() in index.html is the JavaScript twin of normalise():
+make_html.py writes NUMBER_PATTERN into the page and builds its checks from
+the same compiled specs, so the page and this grader agree.
+
+Input is CSV (with a header) or JSON Lines, and needs a `question` column
+(the question id) and a `response` column.  Other columns pass through, and
+`correct` (0/1) and `xp` are added; a row that cannot be read (bad JSON, not
+an object, too few columns) is reported on stderr and left out.  Rows are graded in chunks: each distinct
+(question, response) pair in a chunk is normalised and matched once and the
+verdicts are spread back over the rows with numpy, so the cost follows the
+number of distinct answers rather than the number of responses.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from question_bank import load_bank
+
+TOLERANCE = 1e-9        # relative; absolute below 1
+CHUNK = 100_000
+BAD_SHOWN = 5           # bad rows listed per file; the rest are only counted
+
+# Units a numeric answer may end with; anything else makes it a word
+UNITS = (
+    "hours", "hour", "hrs", "hr", "h", "minutes", "minute", "mins", "min",
+    "years", "year", "yrs", "yr", "km/h", "kmh", "km", "cm", "mm", "m",
+    "litres", "litre", "liters", "liter", "ml", "l", "kg", "g",
+    "dollars", "dollar", "cents", "cent", "texts", "text", "units", "items", "tickets",
+    "degrees", "degree", "deg", "°", "%",
+)
+# Shared with index.html, so it only uses syntax Python and JavaScript agree on.
+# Group 1 is the number, with its thousands separators still in.
+NUMBER_PATTERN = (
+    r"(?:[a-z] ?= ?)?"
+    r"([+-]? ?(?:(?:[0-9]{1,3}(?:[, ][0-9]{3})+|[0-9]+)(?:\.[0-9]*)?|\.[0-9]+))"
+    r"(?: ?(?:" + "|".join(re.escape(u) for u in sorted(UNITS, key=len, reverse=True)) + r")\.?)?"
+)
+
+_CURRENCY = re.compile(r"[$£€]")
+_NUMBER = re.compile(NUMBER_PATTERN)
+_SEPARATORS = re.compile(r"[ ,]")
+_WORD = re.compile(r"[^a-z0-9_]")
+
+
+def normalise(text):
+    """(number or None, word form) of a response; mirrors grade() in index.html."""
+    s = " ".join(_CURRENCY.sub("", text.lower().replace("−", "-")).split())
+    m = _NUMBER.fullmatch(s)
+    return (float(_SEPARATORS.sub("", m.group(1))) if m else None), _WORD.sub("", s)
+
+
+class Matcher:
+    """One question's accepted answers, compiled for repeated grading."""
+    __slots__ = ("qid", "xp", "numbers", "words")
+
+    def __init__(self, qid, accepted, xp=0):
+        self.qid = qid
+        self.xp = xp
+        numbers, words = set(), set()
+        for answer in accepted:
+            number, word = normalise(answer)
+            if number is None:
+                words.add(word)
+            else:
+                numbers.add(number)
+        self.numbers = tuple(sorted(numbers))
+        self.words = frozenset(words)
+
+    def __call__(self, response):
+        number, word = normalise(response)
+        if number is None:
+            return word in self.words
+        return any(abs(number - a) <= TOLERANCE * max(1.0, abs(a)) for a in self.numbers)
+
+    def spec(self):
+        """The compiled answer as plain data, for the page's grade()."""
+        return {"n": [int(n) if n.is_integer() else n for n in self.numbers],
+                "w": sorted(self.words)}
+
+
+def compile_matchers(bank=None):
+    """{question id: Matcher} for every question with an answer."""
+    bank = bank or load_bank()
+    return {q.id: Matcher(q.id, set(q.accept) | {q.answer}, q.xp)
+            for q in bank if q.answer}
+
+
+# ── Batches ───────────────────────────────────────────────────────────────────
+def _distinct(matchers, questions, responses):
+    # (distinct (question, response) pairs, their verdicts, row -> pair index)
+    seen, verdicts = {}, []
+    inverse = np.empty(len(questions), dtype=np.intp)
+    for i, pair in enumerate(zip(questions, responses)):
+        j = seen.get(pair)
+        if j is None:
+            j = seen[pair] = len(verdicts)
+            matcher = matchers.get(pair[0])
+            verdicts.append(matcher is not None and matcher(pair[1]))
+        inverse[i] = j
+    return list(seen), np.array(verdicts, dtype=bool), inverse
+
+def grade_rows(matchers, questions, responses):
+    """Boolean array of verdicts; each distinct (question, response) is graded once."""
+    _, verdicts, inverse = _distinct(matchers, questions, responses)
+    return verdicts[inverse]
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _csv_reader(f, bad):
+    reader = csv.reader(f)
+    header = next(reader, [])
+    try:
+        qcol, rcol = header.index("question"), header.index("response")
+    except ValueError:
+        raise ValueError("CSV input needs 'question' and 'response' columns") from None
+
+    def rows():
+        for row in reader:
+            if not row:
+                continue
+            if qcol >= len(row):
+                bad(reader.line_num, f"{len(row)} column(s)")
+                continue
+            yield row
+    return header, rows(), (lambda row: row[qcol]), (lambda row: row[rcol] if rcol < len(row) else "")
+
+def _jsonl_reader(f, bad):
+    def rows():
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                bad(number, "not JSON")
+                continue
+            if not isinstance(row, dict):
+                bad(number, "not a JSON object")
+                continue
+            yield row
+    return None, rows(), (lambda row: str(row.get("question", ""))), \
+        (lambda row: str(row.get("response", "")))
+
+def grade_file(path, out=None, matchers=None):
+    """Grade one CSV/JSONL file, writing graded rows to `out` if given.
+
+    Returns a Counter of (question id, "rows" | "correct") plus "unknown" for
+    rows naming no known question and "bad" for rows that could not be read.
+    """
+    matchers = matchers or compile_matchers()
+    jsonl = path.endswith((".jsonl", ".ndjson"))
+    stats = Counter()
+
+    def bad(line, reason):
+        stats["bad"] += 1
+        if stats["bad"] <= BAD_SHOWN:
+            print(f"{path}:{line}: bad row skipped ({reason})", file=sys.stderr)
+    with open(path, newline="", encoding="utf-8-sig") as f, \
+            (open(out, "w", newline="", encoding="utf-8") if out else contextlib.nullcontext()) as g:
+        header, rows, question_of, response_of = (_jsonl_reader if jsonl else _csv_reader)(f, bad)
+        writer = None
+        if out and not jsonl:
+            writer = csv.writer(g)
+            writer.writerow(header + ["correct", "xp"])
+        for chunk in _chunks(rows):
+            questions = [question_of(r) for r in chunk]
+            pairs, pair_verdicts, inverse = _distinct(matchers, questions,
+                                                      [response_of(r) for r in chunk])
+            for (qid, _), n, ok in zip(pairs, np.bincount(inverse, minlength=len(pairs)),
+                                       pair_verdicts):
+                if qid in matchers:
+                    stats[qid, "rows"] += int(n)
+                    stats[qid, "correct"] += int(n) if ok else 0
+                else:
+                    stats["unknown"] += int(n)
+            verdicts = pair_verdicts[inverse]
+            if out:
+                xp = [matchers[q].xp if ok else 0 for q, ok in zip(questions, verdicts)]
+                if writer:
+                    writer.writerows(r + [int(ok), x] for r, ok, x in zip(chunk, verdicts, xp))
+                else:
+                    g.writelines(json.dumps(dict(r, correct=int(ok), xp=x), ensure_ascii=False) + "\n"
+                                 for r, ok, x in zip(chunk, verdicts, xp))
+    return stats
+
+
+def _grade_job(job):
+    return grade_file(*job)
+
+def graded_path(path, out_dir):
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return os.path.join(out_dir, f"{stem}.graded{ext}")
+
+def report(stats, matchers, seconds):
+    total = sum(stats[q, "rows"] for q in matchers) + stats["unknown"]
+    print(f"{'question':<10}{'responses':>11}{'correct':>10}{'rate':>8}")
+    for qid in matchers:
+        n, c = stats[qid, "rows"], stats[qid, "correct"]
+        if n:
+            print(f"{qid:<10}{n:>11,}{c:>10,}{c / n:>8.0%}")
+    if stats["unknown"]:
+        print(f"{'(unknown)':<10}{stats['unknown']:>11,}")
+    if stats["bad"]:
+        print(f"{'(bad rows)':<10}{stats['bad']:>11,}  skipped")
+    rate = f", {total / seconds:,.0f} responses/s" if seconds else ""
+    print(f"{total:,} responses graded in {seconds:.2f}s{rate}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("inputs", nargs="+", help="CSV or JSONL files of responses")
+    ap.add_argument("-o", "--output", help="graded copy of a single input")
+    ap.add_argument("--out-dir", help="graded copies of every input, as NAME.graded.EXT; "
+                                      "inputs must have distinct names")
+    ap.add_argument("--jobs", type=int, default=1, help="files graded in parallel")
+    args = ap.parse_args(argv)
+    if args.output and len(args.inputs) > 1:
+        ap.error("-o takes a single input; use --out-dir for several")
+
+    matchers = compile_matchers()
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    outs = ([args.output] if args.output else
+            [graded_path(p, args.out_dir) if args.out_dir else None for p in args.inputs])
+    # Inputs with the same file name would overwrite each other's graded copy
+    claimed = {}
+    for path, out in zip(args.inputs, outs):
+        if out is not None:
+            other = claimed.setdefault(os.path.normcase(os.path.abspath(out)), path)
+            if other != path:
+                ap.error(f"{other} and {path} would both be written to {out}")
+    t0 = time.perf_counter()
+    try:
+        if args.jobs > 1 and len(args.inputs) > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                results = list(pool.map(_grade_job, zip(args.inputs, outs)))
+        else:
+            results = [grade_file(p, o, matchers) for p, o in zip(args.inputs, outs)]
+    except ValueError as e:
+        sys.exit(f"grading.py: {e}")
+    report(sum(results, Counter()), matchers, time.perf_counter() - t0)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
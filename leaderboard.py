@@ -0,0 +1,326 @@
+"""
+Class and school leaderboards for the lesson page's XP events.
+
+Every addXP() on the page posts {class, name, amount, reason, id} to the
+render service's /xp route, which hands it to Leaderboard.record(); /leaderboard
+answers from Leaderboard.board().
+
+    python leaderboard.py [--db FILE] [--class 10B] [--top 10]   # print the boards
+
+Storage is SQLite in WAL mode, so readers never wait for the writer.  Players
+are indexed by (xp, reached) school-wide and per class.  One writer thread
+drains the queue of incoming events and commits them together, so thousands
+of simultaneous posts cost a handful of transactions.  An event id is kept
+once per player: the page sends the award's source ("c1", "exit", …), so a
+retry on a flaky connection, a repeated click or a reload of the page adds
+nothing the second time.
+
+The boards are also kept in memory and updated as events are committed: the
+top of each board as a short sorted list, so the common "top 10" request does
+not touch the database, and every player's score in an order-statistic index
+(a Fenwick tree over XP), so a player's rank is a logarithmic lookup however
+far down the board they are.
+"""
+import argparse
+import bisect
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB = os.path.join(HERE, "leaderboard.db")
+
+TOP_K = 50          # entries kept in memory per board; requests may ask for up to this many
+MAX_AMOUNT = 100    # the most XP a single event can award
+BATCH = 500         # events committed per transaction at most
+WAIT = 30           # seconds record() waits for its event to be committed
+
+Entry = namedtuple("Entry", "name class_name xp")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id       INTEGER PRIMARY KEY,
+    class    TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    xp       INTEGER NOT NULL DEFAULT 0,
+    reached  INTEGER NOT NULL DEFAULT 0,     -- event sequence when xp last changed
+    UNIQUE (class, name)
+);
+CREATE INDEX IF NOT EXISTS players_school ON players (xp DESC, reached);
+CREATE INDEX IF NOT EXISTS players_class ON players (class, xp DESC, reached);
+CREATE TABLE IF NOT EXISTS events (
+    seq      INTEGER PRIMARY KEY,
+    event    TEXT UNIQUE,
+    player   INTEGER NOT NULL REFERENCES players (id),
+    amount   INTEGER NOT NULL,
+    reason   TEXT NOT NULL DEFAULT '',
+    at       REAL NOT NULL
+);
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TopK:
+    """The k best (xp, reached) players of one board, kept sorted as scores rise."""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.order = []         # (-xp, reached, player id), best first
+        self.where = {}         # player id -> its tuple in order
+        self.names = {}         # player id -> Entry
+
+    def update(self, player, entry, reached):
+        old = self.where.get(player)
+        item = (-entry.xp, reached, player)
+        if old is None and len(self.order) == self.k and item >= self.order[-1]:
+            return              # still below the k-th place
+        if old is not None:
+            del self.order[bisect.bisect_left(self.order, old)]
+        bisect.insort(self.order, item)
+        self.where[player] = item
+        self.names[player] = entry
+        if len(self.order) > self.k:
+            dropped = self.order.pop()[2]
+            del self.where[dropped], self.names[dropped]
+
+    def top(self, n):
+        return [self.names[p] for _, _, p in self.order[:n]]
+
+
+class RankIndex:
+    """Counts players by (xp, reached) so the number ahead of a score is O(log n).
+
+    A Fenwick tree over XP counts the players on each score; the players tied
+    on a score are kept as a sorted list of the event sequence that put them there.
+    """
+
+    def __init__(self, size=1024):
+        self.tree = [0] * (size + 1)
+        self.ties = {}          # xp -> sorted reached values
+        self.count = 0
+
+    def _add(self, xp, delta):
+        while xp >= len(self.tree):             # scores only rise; double as needed
+            counts = [len(self.ties.get(x, ())) for x in range(len(self.tree))]
+            self.tree = [0] * (2 * len(self.tree) - 1)
+            for x, n in enumerate(counts):
+                if n:
+                    self._bump(x, n)
+        self._bump(xp, delta)
+
+    def _bump(self, xp, delta):
+        while xp < len(self.tree):
+            self.tree[xp] += delta
+            xp += xp & -xp
+
+    def _at_most(self, xp):
+        xp, total = min(xp, len(self.tree) - 1), 0
+        while xp > 0:
+            total += self.tree[xp]
+            xp -= xp & -xp
+        return total
+
+    def add(self, xp, reached):
+        self._add(xp, 1)        # before the tie list, which a resize counts from
+        bisect.insort(self.ties.setdefault(xp, []), reached)
+        self.count += 1
+
+    def remove(self, xp, reached):
+        tied = self.ties[xp]
+        del tied[bisect.bisect_left(tied, reached)]
+        if not tied:
+            del self.ties[xp]
+        self.count -= 1
+        self._bump(xp, -1)
+
+    def ahead(self, xp, reached):
+        """Players with more XP, or the same XP reached earlier."""
+        return self.count - self._at_most(xp) + bisect.bisect_left(self.ties.get(xp, ()), reached)
+
+
+class Leaderboard:
+
+    def __init__(self, path=DB, k=TOP_K):
+        self.path = path
+        self.k = k
+        self._lock = threading.Lock()          # guards the in-memory boards
+        self._queue = queue.Queue()
+        self.events = 0
+
+        self._writer = connect(path)
+        self._writer.executescript(SCHEMA)
+        self._seq = self._writer.execute("SELECT coalesce(max(seq), 0) FROM events").fetchone()[0]
+        self.school = TopK(k)
+        self.classes = {}
+        self.players = {}                       # (class, name) -> (xp, reached)
+        self.ranks = {None: RankIndex()}        # None for the school, else a class
+        self._load()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        for cls, name, xp, reached in self._writer.execute(
+                "SELECT class, name, xp, reached FROM players WHERE xp > 0"):
+            self._rank(cls, name, xp, reached)
+        rows = self._writer.execute(
+            "SELECT id, name, class, xp, reached FROM players ORDER BY xp DESC, reached LIMIT ?",
+            (self.k,))
+        for pid, name, cls, xp, reached in rows:
+            self.school.update(pid, Entry(name, cls, xp), reached)
+        for (cls,) in self._writer.execute("SELECT DISTINCT class FROM players").fetchall():
+            board = self.classes[cls] = TopK(self.k)
+            for pid, name, xp, reached in self._writer.execute(
+                    "SELECT id, name, xp, reached FROM players WHERE class = ? "
+                    "ORDER BY xp DESC, reached LIMIT ?", (cls, self.k)):
+                board.update(pid, Entry(name, cls, xp), reached)
+
+    def _rank(self, cls, name, xp, reached):
+        """Move a player to a new score in the school and class rank indexes."""
+        old = self.players.get((cls, name))
+        boards = (self.ranks[None], self.ranks.setdefault(cls, RankIndex()))
+        for index in boards:
+            if old:
+                index.remove(*old)
+            index.add(xp, reached)
+        self.players[(cls, name)] = (xp, reached)
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+    def record(self, class_name, name, amount, reason="", event=None, wait=True):
+        """Add `amount` XP to a player; returns their new total once it is committed."""
+        if not name:
+            raise ValueError("a player needs a name")
+        if type(amount) is not int or not 0 < amount <= MAX_AMOUNT:
+            raise ValueError(f"amount must be a whole number from 1 to {MAX_AMOUNT}")
+        done = threading.Event() if wait else None
+        job = [class_name, name, amount, reason, event, done, None]
+        self._queue.put(job)
+        if wait:
+            if not done.wait(WAIT):
+                raise TimeoutError("the leaderboard writer is not answering")
+            if isinstance(job[6], Exception):
+                raise job[6]
+            return job[6]
+
+    def _write_loop(self):
+        while True:
+            jobs = [self._queue.get()]
+            if jobs[0] is None:
+                return
+            while len(jobs) < BATCH:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)
+                    break
+                jobs.append(job)
+            # Any failure goes back to the waiting requests; the thread must not die
+            try:
+                changed = self._commit(jobs)
+                with self._lock:
+                    for pid, (entry, reached) in changed.items():
+                        self.school.update(pid, entry, reached)
+                        self.classes.setdefault(entry.class_name, TopK(self.k)).update(pid, entry, reached)
+                        self._rank(entry.class_name, entry.name, entry.xp, reached)
+            except Exception as e:
+                for job in jobs:
+                    job[6] = e
+            finally:
+                for job in jobs:
+                    if job[5] is not None:
+                        job[5].set()
+
+    def _commit(self, jobs):
+        changed = {}
+        conn = self._writer
+        with conn:
+            now = time.time()
+            for job in jobs:
+                cls, name, amount, reason, event = job[:5]
+                conn.execute("INSERT OR IGNORE INTO players (class, name) VALUES (?, ?)", (cls, name))
+                pid, xp = conn.execute("SELECT id, xp FROM players WHERE class = ? AND name = ?",
+                                       (cls, name)).fetchone()
+                seq = self._seq + 1
+                key = None if event is None else f"{pid}:{event}"      # unique per player
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO events (seq, event, player, amount, reason, at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (seq, key, pid, amount, reason[:80], now)).rowcount
+                if inserted:                            # a repeated event id changes nothing
+                    self._seq = seq
+                    xp += amount
+                    conn.execute("UPDATE players SET xp = ?, reached = ? WHERE id = ?", (xp, seq, pid))
+                    changed[pid] = (Entry(name, cls, xp), seq)
+                job[6] = xp
+        self.events += len(jobs)
+        return changed
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.close()
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+    def top(self, class_name=None, n=10):
+        """The best n entries of one class's board, or of the school's."""
+        n = max(1, min(n, self.k))
+        with self._lock:
+            board = self.school if class_name is None else self.classes.get(class_name)
+            return board.top(n) if board else []
+
+    def standing(self, class_name, name):
+        """(xp, class rank, school rank) for one player, or None if they have no XP yet."""
+        with self._lock:
+            found = self.players.get((class_name, name))
+            if found is None:
+                return None
+            xp, reached = found
+            return (xp, self.ranks[class_name].ahead(xp, reached) + 1,
+                    self.ranks[None].ahead(xp, reached) + 1)
+
+    def board(self, class_name=None, name=None, n=10):
+        """The JSON the page's leaderboard tab renders."""
+        as_rows = lambda entries: [{"name": e.name, "class": e.class_name, "xp": e.xp} for e in entries]
+        reply = {"school": as_rows(self.top(None, n))}
+        if class_name:
+            reply["class"] = as_rows(self.top(class_name, n))
+        if name:
+            found = self.standing(class_name, name)
+            if found:
+                xp, class_rank, school_rank = found
+                reply["you"] = {"name": name, "class": class_name, "xp": xp,
+                                "class_rank": class_rank, "school_rank": school_rank}
+        return reply
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", default=DB)
+    ap.add_argument("--class", dest="class_name", help="also show this class's board")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args(argv)
+    if not os.path.exists(args.db):
+        sys.exit(f"no leaderboard at {args.db}")
+    lb = Leaderboard(args.db)
+    boards = [("School", lb.top(None, args.top))]
+    if args.class_name:
+        boards.append((args.class_name, lb.top(args.class_name, args.top)))
+    for title, entries in boards:
+        print(f"\n{title}")
+        for rank, e in enumerate(entries, 1):
+            print(f"  {rank:>3}. {e.name:<20} {e.class_name:<8} {e.xp:>6} XP")
+    lb.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Regenerate the questions in index.html from the shared question bank.
+
+The page keeps its hand-written layout and script; only the generated blocks
+are rewritten, so the website always matches the worksheet and slides:
+
+  <!-- <bank:practice-cards> -->   every practice card, for every level, as
+  <!-- <bank:challenge-cards> -->  static markup (the level filter only hides
+                                    cards, it never rebuilds them)
+  // <bank:practice>               id-keyed lookup tables the answer checks
+  // <bank:challenge>              read in constant time
+  // <bank:grading>                grading.py's number pattern, for grade()
+
+The readable page is also published to dist/ for serving: CSS and JS
+minified, plus index.html.gz and (when the brotli package is installed)
+index.html.br beside it, so a static server can send precompressed bytes.
+The compressed files are reproducible, so unchanged content keeps its ETag.
+"""
+import argparse
+import gzip
+import html as markup
+import json
+import os
+import re
+
+from grading import NUMBER_PATTERN, compile_matchers
+from minify import minify_html
+from question_bank import load_bank
+from verify_answers import verify
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGE = os.path.join(HERE, "index.html")
+DIST = os.path.join(HERE, "dist")
+
+
+def js(value):
+    # JSON literals are valid JS; "</" is escaped so text can never close the <script>
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+def check_js(matcher):
+    return f"v => grade(v, {js(matcher.spec())})"
+
+def grading_js():
+    return f"const ANSWER_NUMBER = new RegExp({js(f'^(?:{NUMBER_PATTERN})$')});\n"
+
+def practice_js(bank, matchers):
+    lines = ["const practiceById = {"]
+    for num, q in enumerate(bank.select(set="practice", has="ask"), 1):
+        lines.append(f"  {js(q.id)}: {{ id:{js(q.id)}, xp:{q.xp}, "
+                     f"title:{js(f'Q{num} — {q.title} {q.stars}')}, "
+                     f"check: {check_js(matchers[q.id])} }},")
+    lines += ["};", "const practiceQuestions = Object.values(practiceById);"]
+    return "\n".join(lines) + "\n"
+
+def challenge_js(bank, matchers):
+    lines = ["const challengeById = {"]
+    for q in bank.select(set="challenge", has="ask"):
+        lines.append(f"  {js(q.id)}: {{ id:{js(q.id)}, xp:{q.xp}, title:{js(q.title)}, "
+                     f"check: {check_js(matchers[q.id])} }},")
+    lines += ["};", "const challengeQuestions = Object.values(challengeById);"]
+    return "\n".join(lines) + "\n"
+
+# ── Pre-rendered cards ────────────────────────────────────────────────────────
+LEVEL_COLOURS = {"foundation": "var(--green)", "standard": "var(--teal)", "advanced": "var(--orange)"}
+
+def text(value):
+    return markup.escape(value, quote=False)
+
+def practice_cards(bank):
+    cards = []
+    for num, q in enumerate(bank.select(set="practice", has="ask"), 1):
+        qid = markup.escape(q.id)
+        scaffold = (f'\n  <div class="scaffold"><h4>💡 Scaffold</h4><p>{text(q.hint)}</p></div>'
+                    if q.hint else "")
+        cards.append(f"""<div class="card" data-level="{q.level}">
+  <div class="card-header">
+    <h2>{text(f"Q{num} — {q.title} {q.stars}")}</h2>
+    <span class="tag" style="background:{LEVEL_COLOURS[q.level]};color:white">{q.level.capitalize()} • +{q.xp} XP</span>
+  </div>
+  <div class="progress-wrap"><div class="progress-bar" style="width:0%"></div></div>
+  <div class="question-text">{text(q.ask)}</div>{scaffold}
+  <div style="display:flex;gap:1rem;align-items:flex-end;flex-wrap:wrap">
+    <div style="flex:1;min-width:180px">
+      <label>Your Answer:</label>
+      <input type="text" id="input-{qid}" placeholder="Type your answer…">
+    </div>
+    <button class="btn btn-primary" onclick="checkPractice('{qid}')">Submit (+{q.xp} XP)</button>
+  </div>
+  <div class="feedback" id="fb-{qid}"></div>
+</div>""")
+    return indent_cards(cards)
+
+def challenge_cards(bank):
+    cards = []
+    for q in bank.select(set="challenge", has="ask"):
+        qid = markup.escape(q.id)
+        cards.append(f"""<div class="card">
+  <div class="card-header">
+    <h2>{text(q.stars)} {text(q.title)} <span style="color:var(--gold)">+{q.xp} XP</span></h2>
+  </div>
+  <div class="challenge-text">{text(q.ask)}</div>
+  <div style="display:flex;gap:1rem;align-items:flex-end;flex-wrap:wrap">
+    <div style="flex:1">
+      <label>Answer:</label>
+      <input type="text" id="cinput-{qid}" placeholder="Your answer…">
+    </div>
+    <button class="btn btn-gold" id="cbtn-{qid}" onclick="checkChallenge('{qid}')">Submit</button>
+  </div>
+  <div class="feedback" id="cfb-{qid}"></div>
+</div>""")
+    return indent_cards(cards)
+
+def indent_cards(cards):
+    return "".join("".join(f"    {line}\n" for line in card.split("\n")) for card in cards)
+
+def splice(page, name, code, comment="// <{}>"):
+    start, end = (re.escape(comment.format(tag)) for tag in (f"bank:{name}", f"/bank:{name}"))
+    pattern = re.compile(rf"([ \t]*{start}\n).*?([ \t]*{end}\n)", re.S)
+    if not pattern.search(page):
+        raise ValueError(f"index.html has no <bank:{name}> block")
+    return pattern.sub(lambda m: m.group(1) + code + m.group(2), page, count=1)
+
+def build_page(bank=None, page=PAGE):
+    bank = bank or load_bank()
+    with open(page, encoding="utf-8") as f:
+        html = f.read()
+    html = splice(html, "practice-cards", practice_cards(bank), "<!-- <{}> -->")
+    html = splice(html, "challenge-cards", challenge_cards(bank), "<!-- <{}> -->")
+    matchers = compile_matchers(bank)
+    html = splice(html, "grading", grading_js())
+    html = splice(html, "practice", practice_js(bank, matchers))
+    return splice(html, "challenge", challenge_js(bank, matchers))
+
+def compressed_copies(data):
+    """{file suffix: bytes} for the served page and its precompressed siblings."""
+    copies = {"": data, ".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        copies[".br"] = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+    return copies
+
+def publish(html, dist=DIST, name="index.html"):
+    """Write the minified page and its .gz/.br copies to `dist`; returns {path: size}."""
+    os.makedirs(dist, exist_ok=True)
+    copies = compressed_copies(minify_html(html).encode("utf-8"))
+    written = {}
+    for suffix in ("", ".gz", ".br"):
+        path = os.path.join(dist, name + suffix)
+        if suffix not in copies:
+            if os.path.exists(path):
+                os.remove(path)       # a stale copy would be served in preference
+            continue
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(copies[suffix])
+        os.replace(tmp, path)
+        written[path] = len(copies[suffix])
+    return written
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-o", "--output", default=PAGE)
+    ap.add_argument("--dist", default=DIST,
+                    help="where the minified, precompressed copy is published")
+    ap.add_argument("--no-dist", action="store_true", help="only update the readable page")
+    args = ap.parse_args(argv)
+
+    verify()
+    html = build_page()
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(html)
+    print("Web page saved successfully!")
+    if not args.no_dist:
+        written = publish(html, args.dist)
+        print(f"Published to {args.dist}: " + ", ".join(
+            f"{os.path.basename(p)} {n / 1024:.1f} KB" for p, n in written.items()))
+        if brotli is None:
+            print("(pip install brotli to also publish index.html.br)")
+
+if __name__ == "__main__":
+    main()
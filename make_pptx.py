@@ -3,11 +3,27 @@ Generate a new, engaging PowerPoint for:
 Ex 1K – Applications of Simultaneous Linear Equations (55 min lesson)
 """
 from pptx import Presentation
-from pptx.util import Inches, Pt, Emu
+from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
-from pptx.util import Inches, Pt
-import copy
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from lxml import etree
+import pptx
+import argparse
+import io
+import sys
+
+from build_profile import PROFILE
+import build_profile
+import pptx_optimize
+from question_bank import load_bank
+import reproducible
+from section_cache import SectionCache, source_salt
+import text_fit
+from verify_answers import equations, key_values, parse_equation, parse_side, verify
+
+OUTPUT = "/home/user/mathsteaching/Ex 1K - Applications (New Engaging Lesson).pptx"
 
 # ── Palette ──────────────────────────────────────────────────────────────────
 NAVY   = RGBColor(0x1A, 0x23, 0x5C)   # deep navy
@@ -20,15 +36,12 @@ GREEN  = RGBColor(0x2E, 0x86, 0x48)
 ORANGE = RGBColor(0xE8, 0x57, 0x1A)
 PURPLE = RGBColor(0x6A, 0x3D, 0x9A)
 
-prs = Presentation()
-prs.slide_width  = Inches(13.33)
-prs.slide_height = Inches(7.5)
-
-BLANK = prs.slide_layouts[6]   # completely blank
-
 # ═══════════════════════════════════════════════════════════════════════════
 # Helper utilities
 # ═══════════════════════════════════════════════════════════════════════════
+# Text add_text() could not fit even at text_fit.MIN_SIZE in the current build
+OVERFLOWS = []
+
 
 def add_rect(slide, l, t, w, h, fill=None, line=None, line_w=Pt(0)):
     shape = slide.shapes.add_shape(1, Inches(l), Inches(t), Inches(w), Inches(h))
@@ -46,7 +59,13 @@ def add_rect(slide, l, t, w, h, fill=None, line=None, line_w=Pt(0)):
 
 def add_text(slide, text, l, t, w, h,
              font_size=18, bold=False, color=WHITE,
-             align=PP_ALIGN.LEFT, italic=False, wrap=True):
+             align=PP_ALIGN.LEFT, italic=False, wrap=True, fit=True):
+    """A text box; with `fit`, font_size is shrunk until the text fits the box."""
+    if fit:
+        fitted = text_fit.fit(text, w, h, font_size, bold, wrap)
+        if not fitted.fits:
+            OVERFLOWS.append(text)
+        font_size = fitted.size
     txb = slide.shapes.add_textbox(Inches(l), Inches(t), Inches(w), Inches(h))
     txb.word_wrap = wrap
     tf = txb.text_frame
@@ -79,559 +98,823 @@ def add_label_box(slide, label, l, t, w, h, bg=TEAL, fg=WHITE, fs=13, bold=True)
     add_text(slide, label, l+0.05, t+0.03, w-0.1, h-0.06,
              font_size=fs, bold=bold, color=fg, align=PP_ALIGN.CENTER)
 
-def slide_bg(slide, color=LGRAY):
-    add_rect(slide, 0, 0, 13.33, 7.5, fill=color)
+# Numbers read off a bank entry (verify_answers.equations / key_values), as printed
+def num(v):
+    return str(v.numerator) if v.denominator == 1 else f"{float(v):g}"
+
+def money(v):
+    return f"${v.numerator}" if v.denominator == 1 else f"${float(v):.2f}"
+
+def term(coeff, var):
+    return f"{'' if coeff == 1 else num(coeff)}{var}"
+
+def check(coeffs, const, values):
+    """'140 + 210 = 350' or '12(140) + 7(210) = 1680 + 1470 = 3150'."""
+    parts = [(c, values[var]) for var, c in coeffs.items()]
+    if all(c == 1 for c, _ in parts):
+        return f"{' + '.join(num(v) for _, v in parts)} = {num(const)}"
+    return (f"{' + '.join(f'{num(c)}({num(v)})' for c, v in parts)} = "
+            f"{' + '.join(num(c * v) for c, v in parts)} = {num(const)}")
+
+def slide_bg(slide, color):
+    """Background for one slide; the master's is LGRAY."""
+    fill = slide.background.fill
+    fill.solid()
+    fill.fore_color.rgb = color
+
+def set_placeholder(slide, idx, text):
+    """Fill placeholder `idx`, or drop it when there is nothing to show."""
+    ph = slide.placeholders[idx]
+    if text:
+        ph.text = text
+    else:
+        ph._element.getparent().remove(ph._element)
 
 def header_bar(slide, title, subtitle=None):
-    add_rect(slide, 0, 0, 13.33, 1.35, fill=NAVY)
-    add_text(slide, title, 0.25, 0.1, 10, 0.75,
-             font_size=32, bold=True, color=WHITE, align=PP_ALIGN.LEFT)
-    if subtitle:
-        add_text(slide, subtitle, 0.25, 0.78, 10, 0.5,
-                 font_size=16, bold=False, color=TEAL, align=PP_ALIGN.LEFT)
+    # The navy bar is on the layout; only the words belong to the slide
+    set_placeholder(slide, 0, title)
+    set_placeholder(slide, 1, subtitle)
 
 def accent_bar(slide, l, t, w, h=0.06, color=GOLD):
     add_rect(slide, l, t, w, h, fill=color)
 
+# ═══════════════════════════════════════════════════════════════════════════
+# Slide master & layouts
+# ═══════════════════════════════════════════════════════════════════════════
+# The chrome the slides share (background, navy header bar, title styles)
+# lives once on a generated master and four named layouts, so each slide only
+# carries its own content and fills the title/subtitle placeholders.
+
+def _xfrm(l, t, w, h):
+    return (f'<a:xfrm><a:off x="{Inches(l)}" y="{Inches(t)}"/>'
+            f'<a:ext cx="{Inches(w)}" cy="{Inches(h)}"/></a:xfrm>')
+
+def _fill(color):
+    return f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+
+def _rect(l, t, w, h, color):
+    # Same geometry, fill and theme style (soft shadow) as add_rect()
+    return (f'<p:sp><p:nvSpPr><p:cNvPr id="#" name="Rectangle"/><p:cNvSpPr/><p:nvPr userDrawn="1"/>'
+            f'</p:nvSpPr><p:spPr>{_xfrm(l, t, w, h)}<a:prstGeom prst="rect"><a:avLst/></a:prstGeom>'
+            f'{_fill(color)}<a:ln><a:noFill/></a:ln></p:spPr>'
+            '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+            '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+            '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+            '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style></p:sp>')
+
+def _placeholder(name, ph, box=None, size=None, color=None, bold=False, align="l"):
+    """A placeholder; without a box and style it inherits both from the master."""
+    geom = f'{_xfrm(*box)}<a:prstGeom prst="rect"><a:avLst/></a:prstGeom>' if box else ""
+    body_pr, style = "<a:bodyPr/>", ""
+    if size:
+        body_pr = ('<a:bodyPr vert="horz" wrap="square" lIns="91440" tIns="45720" rIns="91440" '
+                   'bIns="45720" rtlCol="0" anchor="t"><a:noAutofit/></a:bodyPr>')
+        style = (f'<a:lvl1pPr marL="0" indent="0" algn="{align}"><a:lnSpc><a:spcPct val="100000"/>'
+                 '</a:lnSpc><a:spcBef><a:spcPts val="0"/></a:spcBef><a:buNone/>'
+                 f'<a:defRPr sz="{size * 100}" b="{int(bold)}">{_fill(color)}'
+                 '<a:latin typeface="+mn-lt"/></a:defRPr></a:lvl1pPr>')
+    return (f'<p:sp><p:nvSpPr><p:cNvPr id="#" name="{name}"/><p:cNvSpPr><a:spLocks noGrp="1"/>'
+            f'</p:cNvSpPr><p:nvPr>{ph}</p:nvPr></p:nvSpPr><p:spPr>{geom}</p:spPr>'
+            f'<p:txBody>{body_pr}<a:lstStyle>{style}</a:lstStyle>'
+            '<a:p><a:endParaRPr lang="en-US"/></a:p></p:txBody></p:sp>')
+
+def _cSld(name, bg, shapes):
+    tree = ""
+    for i, shape in enumerate(shapes, 2):
+        tree += shape.replace('id="#"', f'id="{i}"', 1)
+    bg = f'<p:bg><p:bgPr>{_fill(bg)}<a:effectLst/></p:bgPr></p:bg>' if bg else ""
+    name = f' name="{name}"' if name else ""
+    return parse_xml(
+        f'<p:cSld {nsdecls("p", "a")}{name}>{bg}<p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/>'
+        '<p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr><a:xfrm><a:off x="0" y="0"/>'
+        '<a:ext cx="0" cy="0"/><a:chOff x="0" y="0"/><a:chExt cx="0" cy="0"/></a:xfrm></p:grpSpPr>'
+        f'{tree}</p:spTree></p:cSld>')
+
+TITLE_PH    = '<p:ph type="title"/>'
+SUBTITLE_PH = '<p:ph type="body" idx="1"/>'
+
+# Master: LGRAY background, header title 32pt bold white, subtitle 16pt teal
+MASTER = (LGRAY, [
+    _placeholder("Title Placeholder", TITLE_PH, (0.25, 0.1, 10, 0.75), 32, WHITE, bold=True),
+    _placeholder("Subtitle Placeholder", SUBTITLE_PH, (0.25, 0.78, 10, 0.5), 16, TEAL),
+])
+
+HEADER = [
+    _rect(0, 0, 13.33, 1.35, NAVY),
+    _placeholder("Title", TITLE_PH),
+    _placeholder("Subtitle", SUBTITLE_PH),
+]
+
+# name -> (layout type, background, shapes)
+LAYOUTS = {
+    "Title": ("title", NAVY, [
+        _rect(0, 5.5, 13.33, 0.12, TEAL),
+        _rect(10.5, 0, 2.83, 7.5, RGBColor(0x1E, 0x2D, 0x72)),
+        _rect(10.7, 0.8, 2.2, 0.08, GOLD),
+        _rect(10.7, 6.4, 2.2, 0.08, GOLD),
+        _placeholder("Title", '<p:ph type="ctrTitle"/>', (0.4, 1.2, 9.5, 2.9), 48, WHITE),
+        _placeholder("Subtitle", '<p:ph type="subTitle" idx="1"/>', (0.4, 4.1, 9, 0.5), 20, LGRAY),
+    ]),
+    "Content with Header": ("cust", None, HEADER),
+    # narrow left column, wide right column
+    "Two Column": ("cust", None, HEADER + [
+        _rect(0.3, 1.55, 4.5, 5.55, WHITE),
+        _rect(0.3, 1.55, 4.5, 0.07, NAVY),
+        _rect(5.05, 1.55, 8.0, 5.55, WHITE),
+        _rect(5.05, 1.55, 8.0, 0.07, GOLD),
+    ]),
+    "Challenge": ("cust", NAVY, [
+        _rect(0, 0, 13.33, 0.08, GOLD),
+        _rect(0, 7.42, 13.33, 0.08, GOLD),
+        _placeholder("Title", TITLE_PH, (0.5, 0.4, 12.3, 0.8), 38, GOLD, bold=True, align="ctr"),
+        _placeholder("Subtitle", SUBTITLE_PH, (0.5, 1.1, 12.3, 0.5), 16, LGRAY, align="ctr"),
+    ]),
+}
+
+def build_master(prs):
+    """Swap the template's master and eleven stock layouts for the deck's own."""
+    master = prs.slide_master
+    el = master._element
+    el.replace(el.cSld, _cSld(None, *MASTER))
+    stock = list(prs.slide_layouts)
+    for layout, (name, (kind, bg, shapes)) in zip(stock, LAYOUTS.items()):
+        layout._element.set("type", kind)
+        layout._element.replace(layout._element.cSld, _cSld(name, bg, shapes))
+    # Unused stock layouts are unlinked, so they are not written to the file
+    id_lst = el.sldLayoutIdLst
+    for layout_id in list(id_lst)[len(LAYOUTS):]:
+        id_lst.remove(layout_id)
+        master.part.drop_rel(layout_id.rId)
+    return {layout.name: layout for layout in prs.slide_layouts}
+
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 1 – Title
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-# Full navy background
-add_rect(slide, 0, 0, 13.33, 7.5, fill=NAVY)
-# Teal accent stripe
-add_rect(slide, 0, 5.5, 13.33, 0.12, fill=TEAL)
-# Gold geometric accent
-add_rect(slide, 10.5, 0, 2.83, 7.5, fill=RGBColor(0x1E, 0x2D, 0x72))
-add_rect(slide, 10.7, 0.8, 2.2, 0.08, fill=GOLD)
-add_rect(slide, 10.7, 6.4, 2.2, 0.08, fill=GOLD)
-
-# Topic tag
-add_label_box(slide, "YEAR 10 MATHEMATICS", 0.4, 0.5, 3.2, 0.45,
-              bg=TEAL, fg=WHITE, fs=13)
-# Main title
-add_text(slide, "Applications of", 0.4, 1.2, 9.5, 1.0,
-         font_size=48, bold=False, color=WHITE, align=PP_ALIGN.LEFT)
-add_text(slide, "Simultaneous", 0.4, 2.0, 9.5, 1.1,
-         font_size=60, bold=True, color=GOLD, align=PP_ALIGN.LEFT)
-add_text(slide, "Linear Equations", 0.4, 2.95, 9.5, 1.0,
-         font_size=48, bold=False, color=WHITE, align=PP_ALIGN.LEFT)
-# Subtitle line
-add_text(slide, "Ex 1K  |  55-Minute Lesson", 0.4, 4.1, 9, 0.5,
-         font_size=20, bold=False, color=LGRAY, align=PP_ALIGN.LEFT)
-# Lesson tags
-tags = [("📘 APPLY", 0.4), ("📊 SOLVE", 2.2), ("🌍 CONNECT", 4.0)]
-for lbl, lx in tags:
-    add_label_box(slide, lbl, lx, 4.85, 1.55, 0.42,
-                  bg=RGBColor(0x00, 0x6E, 0x73), fg=WHITE, fs=12)
+def slide_title(slide):
+    # Navy background, teal stripe and gold accents come from the "Title" layout
+
+    # Topic tag
+    add_label_box(slide, "YEAR 10 MATHEMATICS", 0.4, 0.5, 3.2, 0.45,
+                  bg=TEAL, fg=WHITE, fs=13)
+    # Main title
+    tf = slide.shapes.title.text_frame
+    tf.text = "Applications of"
+    add_para(tf, "Simultaneous", 60, bold=True, color=GOLD, space_before=0)
+    add_para(tf, "Linear Equations", 48, color=WHITE, space_before=0)
+    # Subtitle line
+    set_placeholder(slide, 1, "Ex 1K  |  55-Minute Lesson")
+    # Lesson tags
+    tags = [("📘 APPLY", 0.4), ("📊 SOLVE", 2.2), ("🌍 CONNECT", 4.0)]
+    for lbl, lx in tags:
+        add_label_box(slide, lbl, lx, 4.85, 1.55, 0.42,
+                      bg=RGBColor(0x00, 0x6E, 0x73), fg=WHITE, fs=12)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 2 – Lesson Roadmap / 55-min plan
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, LGRAY)
-header_bar(slide, "Today's Lesson Roadmap", "55 minutes — where we're headed")
-
-stages = [
-    ("⚡ WARM UP",      "0–5 min",   "Quick puzzle to activate prior knowledge", TEAL),
-    ("🎯 INTENTIONS",  "5–10 min",  "What we'll learn and why it matters",       PURPLE),
-    ("📖 LEARN",       "10–25 min", "Key steps + two worked examples",            NAVY),
-    ("🏋 PRACTICE",    "25–45 min", "Graduated exercises with scaffolding",       GREEN),
-    ("🎮 CHALLENGE",   "45–52 min", "Real-world problem-solving race",            ORANGE),
-    ("🪞 REFLECT",     "52–55 min", "Exit ticket + learning check",               RGBColor(0x8B, 0x00, 0x8B)),
-]
-for i, (title, time, desc, col) in enumerate(stages):
-    lx = 0.35 + i * 2.1
-    add_rect(slide, lx, 1.55, 1.85, 3.2, fill=col)
-    add_rect(slide, lx, 1.55, 1.85, 0.55, fill=RGBColor(
-        max(col[0]-30,0), max(col[1]-30,0), max(col[2]-30,0)))
-    add_text(slide, title, lx+0.05, 1.57, 1.75, 0.5,
-             font_size=11, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text(slide, time, lx+0.05, 2.13, 1.75, 0.4,
-             font_size=13, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-    add_text(slide, desc, lx+0.08, 2.55, 1.7, 1.9,
-             font_size=11, bold=False, color=WHITE, align=PP_ALIGN.CENTER)
-# Bottom note
-add_text(slide, "💡 Interactive website open throughout — earn points as you go!",
-         0.5, 6.5, 12, 0.55, font_size=15, bold=True, color=NAVY,
-         align=PP_ALIGN.CENTER)
+def slide_roadmap(slide):
+    header_bar(slide, "Today's Lesson Roadmap", "55 minutes — where we're headed")
+
+    stages = [
+        ("⚡ WARM UP",      "0–5 min",   "Quick puzzle to activate prior knowledge", TEAL),
+        ("🎯 INTENTIONS",  "5–10 min",  "What we'll learn and why it matters",       PURPLE),
+        ("📖 LEARN",       "10–25 min", "Key steps + two worked examples",            NAVY),
+        ("🏋 PRACTICE",    "25–45 min", "Graduated exercises with scaffolding",       GREEN),
+        ("🎮 CHALLENGE",   "45–52 min", "Real-world problem-solving race",            ORANGE),
+        ("🪞 REFLECT",     "52–55 min", "Exit ticket + learning check",               RGBColor(0x8B, 0x00, 0x8B)),
+    ]
+    for i, (title, time, desc, col) in enumerate(stages):
+        lx = 0.35 + i * 2.1
+        add_rect(slide, lx, 1.55, 1.85, 3.2, fill=col)
+        add_rect(slide, lx, 1.55, 1.85, 0.55, fill=RGBColor(
+            max(col[0]-30,0), max(col[1]-30,0), max(col[2]-30,0)))
+        add_text(slide, title, lx+0.05, 1.57, 1.75, 0.5,
+                 font_size=11, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        add_text(slide, time, lx+0.05, 2.13, 1.75, 0.4,
+                 font_size=13, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
+        add_text(slide, desc, lx+0.08, 2.55, 1.7, 1.9,
+                 font_size=11, bold=False, color=WHITE, align=PP_ALIGN.CENTER)
+    # Bottom note
+    add_text(slide, "💡 Interactive website open throughout — earn points as you go!",
+             0.5, 6.5, 12, 0.55, font_size=15, bold=True, color=NAVY,
+             align=PP_ALIGN.CENTER)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 3 – Warm-Up (5 min)
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, RGBColor(0xFF, 0xF8, 0xE7))
-header_bar(slide, "⚡ Warm-Up  |  5 Minutes", "Decode the mystery amounts!")
-
-add_rect(slide, 0.3, 1.5, 8.0, 4.8, fill=WHITE)
-accent_bar(slide, 0.3, 1.5, 8.0, 0.07, color=GOLD)
-
-txb = slide.shapes.add_textbox(Inches(0.5), Inches(1.65), Inches(7.6), Inches(4.5))
-txb.word_wrap = True
-tf = txb.text_frame
-tf.word_wrap = True
-p = tf.paragraphs[0]
-p.alignment = PP_ALIGN.LEFT
-r = p.add_run()
-r.text = "🧩  The Snack Bar Problem"
-r.font.size = Pt(20); r.font.bold = True; r.font.color.rgb = NAVY
-
-add_para(tf, "At the school canteen:", 15, italic=True, color=DGRAY, space_before=10)
-add_para(tf, "   • 2 pies + 3 drinks cost $13.00", 17, color=DGRAY)
-add_para(tf, "   • 4 pies + 1 drink cost $15.00", 17, color=DGRAY)
-add_para(tf, "", 10)
-add_para(tf, "Can you figure out the price of one pie and one drink?", 16,
-         bold=True, color=NAVY)
-add_para(tf, "", 8)
-add_para(tf, "💬 Discuss with your neighbour for 2 minutes, then share!", 14,
-         italic=True, color=TEAL)
-
-# Hint box
-add_rect(slide, 8.6, 1.5, 4.4, 2.2, fill=TEAL)
-add_text(slide, "💡 Hint", 8.7, 1.55, 4.2, 0.45,
-         font_size=16, bold=True, color=WHITE)
-add_text(slide,
-         "Let p = price of a pie\nLet d = price of a drink\n\n"
-         "Write TWO equations\nand solve!",
-         8.7, 2.0, 4.2, 1.6, font_size=15, color=WHITE)
-
-# Answer reveal box
-add_rect(slide, 8.6, 3.9, 4.4, 2.4, fill=NAVY)
-add_text(slide, "✅ Answer (reveal after!)", 8.7, 3.95, 4.2, 0.45,
-         font_size=13, bold=True, color=GOLD)
-add_text(slide,
-         "2p + 3d = 13  … (1)\n4p +  d = 15  … (2)\n\n"
-         "Solving: p = $3.00,  d = $2.33",
-         8.7, 4.42, 4.2, 1.75, font_size=14, color=WHITE)
+def slide_warm_up(slide, warmup):
+    slide_bg(slide, RGBColor(0xFF, 0xF8, 0xE7))
+    header_bar(slide, "⚡ Warm-Up  |  5 Minutes", "Decode the mystery amounts!")
+
+    add_rect(slide, 0.3, 1.5, 8.0, 4.8, fill=WHITE)
+    accent_bar(slide, 0.3, 1.5, 8.0, 0.07, color=GOLD)
+
+    txb = slide.shapes.add_textbox(Inches(0.5), Inches(1.65), Inches(7.6), Inches(4.5))
+    txb.word_wrap = True
+    tf = txb.text_frame
+    tf.word_wrap = True
+    p = tf.paragraphs[0]
+    p.alignment = PP_ALIGN.LEFT
+    r = p.add_run()
+    r.text = "🧩  The Snack Bar Problem"
+    r.font.size = Pt(20); r.font.bold = True; r.font.color.rgb = NAVY
+
+    add_para(tf, "At the school canteen:", 15, italic=True, color=DGRAY, space_before=10)
+    for coeffs, total in equations(warmup):
+        pies, drinks = coeffs["p"], coeffs["d"]
+        add_para(tf, f"   • {num(pies)} pie{'s' * (pies != 1)} + {num(drinks)} drink"
+                     f"{'s' * (drinks != 1)} cost ${float(total):.2f}", 17, color=DGRAY)
+    add_para(tf, "", 10)
+    add_para(tf, "Can you figure out the price of one pie and one drink?", 16,
+             bold=True, color=NAVY)
+    add_para(tf, "", 8)
+    add_para(tf, "💬 Discuss with your neighbour for 2 minutes, then share!", 14,
+             italic=True, color=TEAL)
+
+    # Hint box
+    add_rect(slide, 8.6, 1.5, 4.4, 2.2, fill=TEAL)
+    add_text(slide, "💡 Hint", 8.7, 1.55, 4.2, 0.45,
+             font_size=16, bold=True, color=WHITE)
+    add_text(slide,
+             "Let p = price of a pie\nLet d = price of a drink\n\n"
+             "Write TWO equations\nand solve!",
+             8.7, 2.0, 4.2, 1.6, font_size=15, color=WHITE)
+
+    # Answer reveal box
+    add_rect(slide, 8.6, 3.9, 4.4, 2.4, fill=NAVY)
+    add_text(slide, "✅ Answer (reveal after!)", 8.7, 3.95, 4.2, 0.45,
+             font_size=13, bold=True, color=GOLD)
+    # Facts, equations and key all come from the bank, where verify_answers.py checks them
+    stated = "\n".join(f"{eq}  … ({n})" for n, eq in enumerate(warmup.system, 1))
+    solved = ",  ".join(f"{var} = ${float(v):.2f}" for var, v in key_values(warmup).items())
+    add_text(slide, f"{stated}\n\nSolving: {solved}",
+             8.7, 4.42, 4.2, 1.75, font_size=14, color=WHITE)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 4 – Learning Intentions
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, LGRAY)
-header_bar(slide, "🎯 Learning Intentions", "By the end of this lesson you will be able to…")
-
-intentions = [
-    ("1", "Set up equations",
-     "Translate a real-world worded problem into a pair of linear equations by carefully defining variables."),
-    ("2", "Choose your method",
-     "Select the most efficient solving method (substitution or elimination) based on the structure of the equations."),
-    ("3", "Solve & interpret",
-     "Solve simultaneously and communicate the answer back in the context of the original problem."),
-    ("4", "Spot special cases",
-     "Identify when two equations represent parallel lines (no solution) or the same line (infinite solutions)."),
-]
-for i, (num, short, detail) in enumerate(intentions):
-    lx = 0.35 if i % 2 == 0 else 6.85
-    ty = 1.7 if i < 2 else 4.2
-    add_rect(slide, lx, ty, 6.1, 2.1, fill=WHITE)
-    accent_bar(slide, lx, ty, 6.1, 0.08, color=TEAL if i % 2 == 0 else GOLD)
-    # Number circle
-    add_rect(slide, lx+0.1, ty+0.25, 0.55, 0.55, fill=NAVY)
-    add_text(slide, num, lx+0.1, ty+0.24, 0.55, 0.55,
-             font_size=22, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text(slide, short, lx+0.78, ty+0.15, 5.0, 0.5,
-             font_size=18, bold=True, color=NAVY)
-    add_text(slide, detail, lx+0.15, ty+0.72, 5.8, 1.2,
-             font_size=14, color=DGRAY, wrap=True)
+def slide_intentions(slide):
+    header_bar(slide, "🎯 Learning Intentions", "By the end of this lesson you will be able to…")
+
+    intentions = [
+        ("1", "Set up equations",
+         "Translate a real-world worded problem into a pair of linear equations by carefully defining variables."),
+        ("2", "Choose your method",
+         "Select the most efficient solving method (substitution or elimination) based on the structure of the equations."),
+        ("3", "Solve & interpret",
+         "Solve simultaneously and communicate the answer back in the context of the original problem."),
+        ("4", "Spot special cases",
+         "Identify when two equations represent parallel lines (no solution) or the same line (infinite solutions)."),
+    ]
+    for i, (num, short, detail) in enumerate(intentions):
+        lx = 0.35 if i % 2 == 0 else 6.85
+        ty = 1.7 if i < 2 else 4.2
+        add_rect(slide, lx, ty, 6.1, 2.1, fill=WHITE)
+        accent_bar(slide, lx, ty, 6.1, 0.08, color=TEAL if i % 2 == 0 else GOLD)
+        # Number circle
+        add_rect(slide, lx+0.1, ty+0.25, 0.55, 0.55, fill=NAVY)
+        add_text(slide, num, lx+0.1, ty+0.24, 0.55, 0.55,
+                 font_size=22, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        add_text(slide, short, lx+0.78, ty+0.15, 5.0, 0.5,
+                 font_size=18, bold=True, color=NAVY)
+        add_text(slide, detail, lx+0.15, ty+0.72, 5.8, 1.2,
+                 font_size=14, color=DGRAY, wrap=True)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 5 – The 4-Step Method
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, RGBColor(0xE8, 0xF4, 0xFD))
-header_bar(slide, "📐 The 4-Step Method", "A reliable strategy for every worded problem")
-
-steps = [
-    (TEAL,   "STEP 1", "Define Variables",
-     'Choose letters that make sense.\nWrite them down clearly.\nE.g.  "Let a = number of adults"'),
-    (GREEN,  "STEP 2", "Form Equations",
-     'Read carefully — each fact gives you ONE equation.\nCheck: you need exactly 2 equations\nfor 2 unknowns.'),
-    (ORANGE, "STEP 3", "Solve Simultaneously",
-     'Pick elimination or substitution.\nShow ALL working — method marks matter!\nLabel each equation (1) and (2).'),
-    (PURPLE, "STEP 4", "Answer in Context",
-     'Write a sentence using the original wording.\nInclude units (e.g. $, kg, hours).\nSanity-check: does the answer make sense?'),
-]
-
-for i, (col, step, title, body) in enumerate(steps):
-    lx = 0.3 + i * 3.2
-    # Card
-    add_rect(slide, lx, 1.55, 2.9, 5.2, fill=WHITE)
-    add_rect(slide, lx, 1.55, 2.9, 0.9, fill=col)
-    # Step label
-    add_text(slide, step, lx+0.05, 1.57, 2.8, 0.42,
-             font_size=13, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    # Arrow connector (not last)
-    if i < 3:
-        add_rect(slide, lx+2.92, 3.8, 0.25, 0.18, fill=col)
-        # Simple arrow text
-        add_text(slide, "▶", lx+2.93, 3.75, 0.22, 0.28,
-                 font_size=14, bold=True, color=col, align=PP_ALIGN.CENTER)
-    # Title
-    add_text(slide, title, lx+0.1, 2.5, 2.7, 0.52,
-             font_size=17, bold=True, color=col, align=PP_ALIGN.CENTER)
-    # Body
-    add_text(slide, body, lx+0.15, 3.08, 2.65, 3.4,
-             font_size=13, color=DGRAY, wrap=True)
-
-# Bottom tip
-add_rect(slide, 0.3, 6.9, 12.7, 0.42, fill=NAVY)
-add_text(slide, "💡 Pro tip: underline the key numbers and circle the unknowns as you read the question!",
-         0.5, 6.92, 12.5, 0.38, font_size=13, bold=True, color=GOLD,
-         align=PP_ALIGN.CENTER)
+def slide_four_steps(slide):
+    slide_bg(slide, RGBColor(0xE8, 0xF4, 0xFD))
+    header_bar(slide, "📐 The 4-Step Method", "A reliable strategy for every worded problem")
+
+    steps = [
+        (TEAL,   "STEP 1", "Define Variables",
+         'Choose letters that make sense.\nWrite them down clearly.\nE.g.  "Let a = number of adults"'),
+        (GREEN,  "STEP 2", "Form Equations",
+         'Read carefully — each fact gives you ONE equation.\nCheck: you need exactly 2 equations\nfor 2 unknowns.'),
+        (ORANGE, "STEP 3", "Solve Simultaneously",
+         'Pick elimination or substitution.\nShow ALL working — method marks matter!\nLabel each equation (1) and (2).'),
+        (PURPLE, "STEP 4", "Answer in Context",
+         'Write a sentence using the original wording.\nInclude units (e.g. $, kg, hours).\nSanity-check: does the answer make sense?'),
+    ]
+
+    for i, (col, step, title, body) in enumerate(steps):
+        lx = 0.3 + i * 3.2
+        # Card
+        add_rect(slide, lx, 1.55, 2.9, 5.2, fill=WHITE)
+        add_rect(slide, lx, 1.55, 2.9, 0.9, fill=col)
+        # Step label
+        add_text(slide, step, lx+0.05, 1.57, 2.8, 0.42,
+                 font_size=13, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        # Arrow connector (not last)
+        if i < 3:
+            add_rect(slide, lx+2.92, 3.8, 0.25, 0.18, fill=col)
+            # Simple arrow text
+            add_text(slide, "▶", lx+2.93, 3.72, 0.22, 0.34,
+                     font_size=14, bold=True, color=col, align=PP_ALIGN.CENTER)
+        # Title
+        add_text(slide, title, lx+0.1, 2.5, 2.7, 0.52,
+                 font_size=17, bold=True, color=col, align=PP_ALIGN.CENTER)
+        # Body
+        add_text(slide, body, lx+0.15, 3.08, 2.65, 3.4,
+                 font_size=13, color=DGRAY, wrap=True)
+
+    # Bottom tip
+    add_rect(slide, 0.3, 6.9, 12.7, 0.42, fill=NAVY)
+    add_text(slide, "💡 Pro tip: underline the key numbers and circle the unknowns as you read the question!",
+             0.5, 6.92, 12.5, 0.38, font_size=13, bold=True, color=GOLD,
+             align=PP_ALIGN.CENTER)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 6 – Worked Example 1 (Question)
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, LGRAY)
-header_bar(slide, "📖 Worked Example 1", "Setting up and solving — ticket sales")
-
-# Question box
-add_rect(slide, 0.3, 1.55, 8.5, 2.8, fill=WHITE)
-accent_bar(slide, 0.3, 1.55, 8.5, 0.08, color=GOLD)
-
-txb = slide.shapes.add_textbox(Inches(0.45), Inches(1.7), Inches(8.2), Inches(2.5))
-txb.word_wrap = True
-tf = txb.text_frame; tf.word_wrap = True
-p = tf.paragraphs[0]; r = p.add_run()
-r.text = "🎟️  The School Concert"
-r.font.size = Pt(19); r.font.bold = True; r.font.color.rgb = NAVY
-
-add_para(tf,
-    "Adult tickets cost $12 and student tickets cost $7. "
-    "A total of 350 tickets were sold, raising $3150.", 15, color=DGRAY, space_before=8)
-add_para(tf, "How many adult tickets and how many student tickets were sold?",
-         16, bold=True, color=NAVY, space_before=6)
-
-# Step labels on right
-step_labels = [
-    (TEAL,   "STEP 1\nDefine Variables", 1.62),
-    (GREEN,  "STEP 2\nForm Equations",   2.55),
-    (ORANGE, "STEP 3\nSolve",            3.85),
-    (PURPLE, "STEP 4\nAnswer",           5.5),
-]
-for col, lbl, ty in step_labels:
-    add_rect(slide, 9.05, ty, 1.5, 0.7, fill=col)
-    add_text(slide, lbl, 9.1, ty+0.03, 1.4, 0.65,
-             font_size=10, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    # Arrow line
-    add_rect(slide, 8.85, ty+0.3, 0.22, 0.06, fill=col)
-
-# Scaffold working area
-add_rect(slide, 0.3, 4.5, 12.7, 2.7, fill=WHITE)
-accent_bar(slide, 0.3, 4.5, 12.7, 0.07, color=NAVY)
-add_text(slide, "✍️  Your turn — set it up!  (Try before we work through it together)",
-         0.45, 4.56, 12.5, 0.45, font_size=14, bold=True, color=NAVY)
-# Lined areas
-for i in range(4):
-    add_rect(slide, 0.45, 5.12 + i*0.44, 12.4, 0.03, fill=RGBColor(0xCC,0xCC,0xCC))
+def slide_example1_question(slide, ex):
+    (_, sold), (prices, raised) = equations(ex)
+    header_bar(slide, "📖 Worked Example 1", "Setting up and solving — ticket sales")
+
+    # Question box
+    add_rect(slide, 0.3, 1.55, 8.5, 2.8, fill=WHITE)
+    accent_bar(slide, 0.3, 1.55, 8.5, 0.08, color=GOLD)
+
+    txb = slide.shapes.add_textbox(Inches(0.45), Inches(1.7), Inches(8.2), Inches(2.5))
+    txb.word_wrap = True
+    tf = txb.text_frame; tf.word_wrap = True
+    p = tf.paragraphs[0]; r = p.add_run()
+    r.text = "🎟️  The School Concert"
+    r.font.size = Pt(19); r.font.bold = True; r.font.color.rgb = NAVY
+
+    add_para(tf,
+        f"Adult tickets cost {money(prices['a'])} and student tickets cost {money(prices['s'])}. "
+        f"A total of {num(sold)} tickets were sold, raising {money(raised)}.",
+        15, color=DGRAY, space_before=8)
+    add_para(tf, "How many adult tickets and how many student tickets were sold?",
+             16, bold=True, color=NAVY, space_before=6)
+
+    # Step labels on right
+    step_labels = [
+        (TEAL,   "STEP 1\nDefine Variables", 1.62),
+        (GREEN,  "STEP 2\nForm Equations",   2.55),
+        (ORANGE, "STEP 3\nSolve",            3.85),
+        (PURPLE, "STEP 4\nAnswer",           5.5),
+    ]
+    for col, lbl, ty in step_labels:
+        add_rect(slide, 9.05, ty, 1.5, 0.7, fill=col)
+        add_text(slide, lbl, 9.1, ty+0.03, 1.4, 0.65,
+                 font_size=10, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        # Arrow line
+        add_rect(slide, 8.85, ty+0.3, 0.22, 0.06, fill=col)
+
+    # Scaffold working area
+    add_rect(slide, 0.3, 4.5, 12.7, 2.7, fill=WHITE)
+    accent_bar(slide, 0.3, 4.5, 12.7, 0.07, color=NAVY)
+    add_text(slide, "✍️  Your turn — set it up!  (Try before we work through it together)",
+             0.45, 4.56, 12.5, 0.45, font_size=14, bold=True, color=NAVY)
+    # Lined areas
+    for i in range(4):
+        add_rect(slide, 0.45, 5.12 + i*0.44, 12.4, 0.03, fill=RGBColor(0xCC,0xCC,0xCC))
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 7 – Worked Example 1 (Solution)
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, LGRAY)
-header_bar(slide, "📖 Worked Example 1 — Solution", "")
-
-cols = [TEAL, GREEN, ORANGE, PURPLE]
-steps_data = [
-    ("STEP 1 — Define Variables",
-     "Let  a  =  number of adult tickets sold\nLet  s  =  number of student tickets sold"),
-    ("STEP 2 — Form Equations",
-     "Total tickets:    a  +  s  =  350   … (1)\nTotal revenue:  12a  +  7s  =  3150  … (2)"),
-    ("STEP 3 — Solve (Elimination)",
-     "Multiply (1) by 7:    7a + 7s = 2450    … (3)\n"
-     "Subtract (3) from (2):   5a = 700\n"
-     "∴  a = 140\nSubstitute into (1):  140 + s = 350  →  s = 210"),
-    ("STEP 4 — Answer in Context",
-     "140 adult tickets and 210 student tickets were sold.\n"
-     "✅ Check: 140 + 210 = 350 ✓   and   12(140) + 7(210) = 1680 + 1470 = 3150 ✓"),
-]
-
-for i, (title, body) in enumerate(steps_data):
-    lx = 0.3 if i % 2 == 0 else 6.85
-    ty = 1.55 if i < 2 else 4.05
-    add_rect(slide, lx, ty, 6.1, 2.15, fill=WHITE)
-    add_rect(slide, lx, ty, 6.1, 0.52, fill=cols[i])
-    add_text(slide, title, lx+0.1, ty+0.07, 5.9, 0.42,
-             font_size=14, bold=True, color=WHITE)
-    add_text(slide, body, lx+0.15, ty+0.62, 5.8, 1.45,
-             font_size=14, color=DGRAY, wrap=True)
+def slide_example1_solution(slide, ex):
+    header_bar(slide, "📖 Worked Example 1 — Solution", "")
+
+    # Every number below is worked from the bank entry, whose key verify() checks
+    (c1, k1), (c2, k2) = equations(ex)
+    v = key_values(ex)
+    m = c2["s"] / c1["s"]          # scale (1) so the s terms match (2)
+    cols = [TEAL, GREEN, ORANGE, PURPLE]
+    steps_data = [
+        ("STEP 1 — Define Variables",
+         "Let  a  =  number of adult tickets sold\nLet  s  =  number of student tickets sold"),
+        ("STEP 2 — Form Equations",
+         f"Total tickets:    {ex.system[0].replace(' ', '  ')}   … (1)\n"
+         f"Total revenue:  {ex.system[1].replace(' ', '  ')}  … (2)"),
+        ("STEP 3 — Solve (Elimination)",
+         f"Multiply (1) by {num(m)}:    {term(m * c1['a'], 'a')} + {term(m * c1['s'], 's')} = "
+         f"{num(m * k1)}    … (3)\n"
+         f"Subtract (3) from (2):   {term(c2['a'] - m * c1['a'], 'a')} = {num(k2 - m * k1)}\n"
+         f"∴  a = {num(v['a'])}\nSubstitute into (1):  {num(c1['a'] * v['a'])} + {term(c1['s'], 's')} "
+         f"= {num(k1)}  →  s = {num(v['s'])}"),
+        ("STEP 4 — Answer in Context",
+         f"{num(v['a'])} adult tickets and {num(v['s'])} student tickets were sold.\n"
+         f"✅ Check: {check(c1, k1, v)} ✓   and   {check(c2, k2, v)} ✓"),
+    ]
+
+    for i, (title, body) in enumerate(steps_data):
+        lx = 0.3 if i % 2 == 0 else 6.85
+        ty = 1.55 if i < 2 else 4.05
+        add_rect(slide, lx, ty, 6.1, 2.15, fill=WHITE)
+        add_rect(slide, lx, ty, 6.1, 0.52, fill=cols[i])
+        add_text(slide, title, lx+0.1, ty+0.07, 5.9, 0.42,
+                 font_size=14, bold=True, color=WHITE)
+        add_text(slide, body, lx+0.15, ty+0.62, 5.8, 1.45,
+                 font_size=14, color=DGRAY, wrap=True)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 8 – Worked Example 2 (Question)
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, RGBColor(0xF0, 0xF8, 0xF0))
-header_bar(slide, "📖 Worked Example 2", "A more complex application — break-even")
-
-add_rect(slide, 0.3, 1.55, 12.7, 2.7, fill=WHITE)
-accent_bar(slide, 0.3, 1.55, 12.7, 0.08, color=TEAL)
-
-txb = slide.shapes.add_textbox(Inches(0.45), Inches(1.7), Inches(12.3), Inches(2.4))
-txb.word_wrap = True
-tf = txb.text_frame; tf.word_wrap = True
-p = tf.paragraphs[0]; r = p.add_run()
-r.text = "🏭  The Cupcake Business"
-r.font.size = Pt(19); r.font.bold = True; r.font.color.rgb = NAVY
-
-add_para(tf,
-    "Emma starts a cupcake business. She spends $240 on equipment (fixed cost) "
-    "and $1.50 to make each cupcake. She sells each cupcake for $4.50.",
-    15, color=DGRAY, space_before=8)
-add_para(tf,
-    "(a)  Write equations for Emma's total Cost (C) and total Revenue (R) "
-    "in terms of n, the number of cupcakes.",
-    15, bold=True, color=NAVY, space_before=6)
-add_para(tf,
-    "(b)  Find the break-even point — how many cupcakes must she sell?",
-    15, bold=True, color=NAVY, space_before=4)
-
-# Scaffold grid
-for col_x, col_label, col_color in [(0.3,"Cost Equation", TEAL),(6.65,"Revenue Equation", GREEN)]:
-    add_rect(slide, col_x, 4.35, 6.1, 2.85, fill=WHITE)
-    add_rect(slide, col_x, 4.35, 6.1, 0.48, fill=col_color)
-    add_text(slide, col_label, col_x+0.1, 4.37, 5.9, 0.44,
-             font_size=14, bold=True, color=WHITE)
-    for i in range(4):
-        add_rect(slide, col_x+0.15, 4.95+i*0.5, 5.8, 0.03,
-                 fill=RGBColor(0xCC,0xCC,0xCC))
+def slide_example2_question(slide, ex):
+    (cost, fixed), (revenue, _) = equations(ex)
+    slide_bg(slide, RGBColor(0xF0, 0xF8, 0xF0))
+    header_bar(slide, "📖 Worked Example 2", "A more complex application — break-even")
+
+    add_rect(slide, 0.3, 1.55, 12.7, 2.7, fill=WHITE)
+    accent_bar(slide, 0.3, 1.55, 12.7, 0.08, color=TEAL)
+
+    txb = slide.shapes.add_textbox(Inches(0.45), Inches(1.7), Inches(12.3), Inches(2.4))
+    txb.word_wrap = True
+    tf = txb.text_frame; tf.word_wrap = True
+    p = tf.paragraphs[0]; r = p.add_run()
+    r.text = "🏭  The Cupcake Business"
+    r.font.size = Pt(19); r.font.bold = True; r.font.color.rgb = NAVY
+
+    add_para(tf,
+        f"Emma starts a cupcake business. She spends {money(fixed)} on equipment (fixed cost) "
+        f"and {money(-cost['n'])} to make each cupcake. She sells each cupcake for "
+        f"{money(-revenue['n'])}.",
+        15, color=DGRAY, space_before=8)
+    add_para(tf,
+        "(a)  Write equations for Emma's total Cost (C) and total Revenue (R) "
+        "in terms of n, the number of cupcakes.",
+        15, bold=True, color=NAVY, space_before=6)
+    add_para(tf,
+        "(b)  Find the break-even point — how many cupcakes must she sell?",
+        15, bold=True, color=NAVY, space_before=4)
+
+    # Scaffold grid
+    for col_x, col_label, col_color in [(0.3,"Cost Equation", TEAL),(6.65,"Revenue Equation", GREEN)]:
+        add_rect(slide, col_x, 4.35, 6.1, 2.85, fill=WHITE)
+        add_rect(slide, col_x, 4.35, 6.1, 0.48, fill=col_color)
+        add_text(slide, col_label, col_x+0.1, 4.37, 5.9, 0.44,
+                 font_size=14, bold=True, color=WHITE)
+        for i in range(4):
+            add_rect(slide, col_x+0.15, 4.95+i*0.5, 5.8, 0.03,
+                     fill=RGBColor(0xCC,0xCC,0xCC))
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 9 – Worked Example 2 (Solution)
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, RGBColor(0xF0, 0xF8, 0xF0))
-header_bar(slide, "📖 Worked Example 2 — Solution", "Break-even analysis")
-
-# Part (a)
-add_rect(slide, 0.3, 1.55, 5.9, 2.5, fill=WHITE)
-add_rect(slide, 0.3, 1.55, 5.9, 0.52, fill=TEAL)
-add_text(slide, "(a)  Equations", 0.4, 1.59, 5.7, 0.44,
-         font_size=15, bold=True, color=WHITE)
-add_text(slide,
-    "Cost:     C  =  1.5n  +  240\n\n"
-    "Revenue:  R  =  4.5n\n\n"
-    "(n = number of cupcakes sold)",
-    0.45, 2.18, 5.7, 1.75, font_size=16, color=DGRAY)
-
-# Part (b)
-add_rect(slide, 6.55, 1.55, 6.45, 2.5, fill=WHITE)
-add_rect(slide, 6.55, 1.55, 6.45, 0.52, fill=GREEN)
-add_text(slide, "(b)  Break-even: set C = R", 6.65, 1.59, 6.2, 0.44,
-         font_size=15, bold=True, color=WHITE)
-add_text(slide,
-    "1.5n + 240  =  4.5n\n"
-    "240  =  3n\n"
-    "n  =  80 cupcakes\n\n"
-    "∴ Emma must sell 80 cupcakes to break even.",
-    6.65, 2.18, 6.2, 1.75, font_size=16, color=DGRAY)
-
-# Graph description
-add_rect(slide, 0.3, 4.2, 12.7, 3.0, fill=NAVY)
-add_text(slide, "📊 What does this look like graphically?", 0.5, 4.25, 12.5, 0.5,
-         font_size=17, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-add_text(slide,
-    "• The Cost line starts at (0, 240) — fixed cost — and rises with gradient 1.5\n"
-    "• The Revenue line passes through the origin with gradient 4.5\n"
-    "• They intersect at the point (80, 360) — the break-even point\n"
-    "• For n < 80: Cost > Revenue → LOSS       For n > 80: Revenue > Cost → PROFIT",
-    0.5, 4.82, 12.5, 2.2, font_size=15, color=WHITE, wrap=True)
+def slide_example2_solution(slide, ex):
+    (cost, fixed), (revenue, _) = equations(ex)
+    unit, price, v = -cost["n"], -revenue["n"], key_values(ex)
+    n, at = num(v["n"]), num(v["C"])
+    slide_bg(slide, RGBColor(0xF0, 0xF8, 0xF0))
+    header_bar(slide, "📖 Worked Example 2 — Solution", "Break-even analysis")
+
+    # Part (a)
+    add_rect(slide, 0.3, 1.55, 5.9, 2.5, fill=WHITE)
+    add_rect(slide, 0.3, 1.55, 5.9, 0.52, fill=TEAL)
+    add_text(slide, "(a)  Equations", 0.4, 1.59, 5.7, 0.44,
+             font_size=15, bold=True, color=WHITE)
+    add_text(slide,
+        f"Cost:     C  =  {term(unit, 'n')}  +  {num(fixed)}\n\n"
+        f"Revenue:  R  =  {term(price, 'n')}\n\n"
+        "(n = number of cupcakes sold)",
+        0.45, 2.18, 5.7, 1.75, font_size=16, color=DGRAY)
+
+    # Part (b)
+    add_rect(slide, 6.55, 1.55, 6.45, 2.5, fill=WHITE)
+    add_rect(slide, 6.55, 1.55, 6.45, 0.52, fill=GREEN)
+    add_text(slide, "(b)  Break-even: set C = R", 6.65, 1.59, 6.2, 0.44,
+             font_size=15, bold=True, color=WHITE)
+    add_text(slide,
+        f"{term(unit, 'n')} + {num(fixed)}  =  {term(price, 'n')}\n"
+        f"{num(fixed)}  =  {term(price - unit, 'n')}\n"
+        f"n  =  {n} cupcakes\n\n"
+        f"∴ Emma must sell {n} cupcakes to break even.",
+        6.65, 2.18, 6.2, 1.75, font_size=16, color=DGRAY)
+
+    # Graph description
+    add_rect(slide, 0.3, 4.2, 12.7, 3.0, fill=NAVY)
+    add_text(slide, "📊 What does this look like graphically?", 0.5, 4.25, 12.5, 0.5,
+             font_size=17, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
+    add_text(slide,
+        f"• The Cost line starts at (0, {num(fixed)}) — fixed cost — and rises with gradient {num(unit)}\n"
+        f"• The Revenue line passes through the origin with gradient {num(price)}\n"
+        f"• They intersect at the point ({n}, {at}) — the break-even point\n"
+        f"• For n < {n}: Cost > Revenue → LOSS       For n > {n}: Revenue > Cost → PROFIT",
+        0.5, 4.82, 12.5, 2.2, font_size=15, color=WHITE, wrap=True)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 10 – Practice Time
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, LGRAY)
-header_bar(slide, "🏋 Practice Time  |  20 Minutes", "Graduated exercises — choose your level!")
-
-levels = [
-    (GREEN, "🌱 FOUNDATION\n(Q1–5)",
-     "Highly scaffolded problems with equation frames provided. "
-     "Focus on setting up equations correctly and practising elimination."),
-    (TEAL, "📘 STANDARD\n(Q4–9)",
-     "Mixed worded problems across different contexts. "
-     "Choose your own method. Full working required."),
-    (ORANGE, "🔥 ADVANCED\n(Q8–14)",
-     "Multi-step problems, break-even scenarios, and proof questions. "
-     "Extend to parallel/perpendicular line analysis."),
-]
-
-for i, (col, title, desc) in enumerate(levels):
-    lx = 0.3 + i * 4.3
-    add_rect(slide, lx, 1.6, 4.0, 4.5, fill=WHITE)
-    add_rect(slide, lx, 1.6, 4.0, 1.1, fill=col)
-    add_text(slide, title, lx+0.1, 1.65, 3.8, 1.0,
-             font_size=17, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text(slide, desc, lx+0.15, 2.82, 3.7, 3.1,
-             font_size=14, color=DGRAY, wrap=True)
-
-# Tips row
-add_rect(slide, 0.3, 6.2, 12.7, 1.1, fill=NAVY)
-add_text(slide,
-    "📝 Show ALL working    |    ✅ Write final answers as sentences    |    "
-    "🤝 Ask your neighbour before asking me    |    🎮 Log answers on the website to earn XP!",
-    0.5, 6.28, 12.5, 0.9, font_size=13, bold=False, color=WHITE,
-    align=PP_ALIGN.CENTER)
+def slide_practice(slide):
+    header_bar(slide, "🏋 Practice Time  |  20 Minutes", "Graduated exercises — choose your level!")
+
+    levels = [
+        (GREEN, "🌱 FOUNDATION\n(Q1–5)",
+         "Highly scaffolded problems with equation frames provided. "
+         "Focus on setting up equations correctly and practising elimination."),
+        (TEAL, "📘 STANDARD\n(Q4–9)",
+         "Mixed worded problems across different contexts. "
+         "Choose your own method. Full working required."),
+        (ORANGE, "🔥 ADVANCED\n(Q8–14)",
+         "Multi-step problems, break-even scenarios, and proof questions. "
+         "Extend to parallel/perpendicular line analysis."),
+    ]
+
+    for i, (col, title, desc) in enumerate(levels):
+        lx = 0.3 + i * 4.3
+        add_rect(slide, lx, 1.6, 4.0, 4.5, fill=WHITE)
+        add_rect(slide, lx, 1.6, 4.0, 1.1, fill=col)
+        add_text(slide, title, lx+0.1, 1.65, 3.8, 1.0,
+                 font_size=17, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        add_text(slide, desc, lx+0.15, 2.82, 3.7, 3.1,
+                 font_size=14, color=DGRAY, wrap=True)
+
+    # Tips row
+    add_rect(slide, 0.3, 6.2, 12.7, 1.1, fill=NAVY)
+    add_text(slide,
+        "📝 Show ALL working    |    ✅ Write final answers as sentences    |    "
+        "🤝 Ask your neighbour before asking me    |    🎮 Log answers on the website to earn XP!",
+        0.5, 6.28, 12.5, 0.9, font_size=13, bold=False, color=WHITE,
+        align=PP_ALIGN.CENTER)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 11 – Special Cases: Parallel & Same Line
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, RGBColor(0xF5, 0xEC, 0xFF))
-header_bar(slide, "⚠️ Special Cases", "When things don't work out as expected…")
-
-cases = [
-    (TEAL,   "✅ ONE Solution",
-     "Lines intersect at exactly one point.\n\n"
-     "Gradients are DIFFERENT.\n\n"
-     "e.g.  y = 2x + 1\n       y = x + 4\n\n"
-     "Solve to find the unique (x, y).",
-     "NORMAL CASE"),
-    (ORANGE, "🚫 NO Solution",
-     "Lines are PARALLEL — they never meet.\n\n"
-     "Same gradient, different y-intercept.\n\n"
-     "e.g.  y = 3x + 2\n       y = 3x − 5\n\n"
-     "Elimination gives: 0 = 7  (impossible!)",
-     "PARALLEL LINES"),
-    (PURPLE, "∞  INFINITE Solutions",
-     "Lines are IDENTICAL — they sit on top of each other.\n\n"
-     "Same gradient AND same y-intercept.\n\n"
-     "e.g.  2y = 4x + 6\n       y = 2x + 3\n\n"
-     "Elimination gives: 0 = 0  (always true!)",
-     "SAME LINE"),
-]
-
-for i, (col, title, body, tag) in enumerate(cases):
-    lx = 0.3 + i * 4.3
-    add_rect(slide, lx, 1.55, 4.0, 5.3, fill=WHITE)
-    add_rect(slide, lx, 1.55, 4.0, 0.8, fill=col)
-    add_text(slide, tag, lx+0.1, 1.57, 3.8, 0.35,
-             font_size=11, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_text(slide, title, lx+0.1, 1.9, 3.8, 0.44,
-             font_size=18, bold=True, color=col, align=PP_ALIGN.CENTER)
-    add_text(slide, body, lx+0.15, 2.45, 3.75, 4.2,
-             font_size=14, color=DGRAY, wrap=True)
+def slide_special_cases(slide, examples):
+    slide_bg(slide, RGBColor(0xF5, 0xEC, 0xFF))
+    header_bar(slide, "⚠️ Special Cases", "When things don't work out as expected…")
+
+    # The bank's systems, and what eliminating the first unknown leaves of them
+    shown, left = [], []
+    for q in examples:
+        first, second = (eq.replace(" - ", " − ") for eq in q.system)
+        shown.append(f"e.g.  {first}\n       {second}")
+        (c1, k1), (c2, k2) = equations(q)
+        var = next(iter(c1))
+        left.append(num(k1 - c1[var] / c2[var] * k2))
+    cases = [
+        (TEAL,   "✅ ONE Solution",
+         "Lines intersect at exactly one point.\n\n"
+         "Gradients are DIFFERENT.\n\n"
+         f"{shown[0]}\n\n"
+         "Solve to find the unique (x, y).",
+         "NORMAL CASE"),
+        (ORANGE, "🚫 NO Solution",
+         "Lines are PARALLEL — they never meet.\n\n"
+         "Same gradient, different y-intercept.\n\n"
+         f"{shown[1]}\n\n"
+         f"Elimination gives: 0 = {left[1]}  (impossible!)",
+         "PARALLEL LINES"),
+        (PURPLE, "∞  INFINITE Solutions",
+         "Lines are IDENTICAL — they sit on top of each other.\n\n"
+         "Same gradient AND same y-intercept.\n\n"
+         f"{shown[2]}\n\n"
+         f"Elimination gives: 0 = {left[2]}  (always true!)",
+         "SAME LINE"),
+    ]
+
+    for i, (col, title, body, tag) in enumerate(cases):
+        lx = 0.3 + i * 4.3
+        add_rect(slide, lx, 1.55, 4.0, 5.3, fill=WHITE)
+        add_rect(slide, lx, 1.55, 4.0, 0.8, fill=col)
+        add_text(slide, tag, lx+0.1, 1.57, 3.8, 0.35,
+                 font_size=11, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        add_text(slide, title, lx+0.1, 1.9, 3.8, 0.44,
+                 font_size=18, bold=True, color=col, align=PP_ALIGN.CENTER)
+        add_text(slide, body, lx+0.15, 2.45, 3.75, 4.2,
+                 font_size=14, color=DGRAY, wrap=True)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 12 – Real-World Connections
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, RGBColor(0xE8, 0xF4, 0xFD))
-header_bar(slide, "🌍 Where Is This Used in the Real World?",
-           "Simultaneous equations are everywhere!")
-
-contexts = [
-    ("💰", "Economics",     "Finding equilibrium where supply meets demand."),
-    ("🏗️", "Engineering",   "Balancing forces in structures and circuits."),
-    ("🧪", "Chemistry",     "Mixing solutions to hit a target concentration."),
-    ("📈", "Business",      "Break-even analysis and profit optimisation."),
-    ("🏥", "Medicine",      "Calculating drug dosages across compartments."),
-    ("🎮", "Game Design",   "Balancing character stats and resource systems."),
-]
-
-for i, (icon, field, desc) in enumerate(contexts):
-    col = i % 3
-    row = i // 3
-    lx = 0.4 + col * 4.25
-    ty = 1.65 + row * 2.35
-    add_rect(slide, lx, ty, 3.9, 2.05, fill=WHITE)
-    add_rect(slide, lx, ty, 3.9, 0.07, fill=TEAL if row==0 else GOLD)
-    add_text(slide, icon, lx+0.1, ty+0.12, 0.7, 0.65,
-             font_size=30, color=NAVY, align=PP_ALIGN.CENTER)
-    add_text(slide, field, lx+0.8, ty+0.18, 2.9, 0.48,
-             font_size=17, bold=True, color=NAVY)
-    add_text(slide, desc, lx+0.15, ty+0.72, 3.65, 1.1,
-             font_size=13, color=DGRAY, wrap=True)
+def slide_real_world(slide):
+    slide_bg(slide, RGBColor(0xE8, 0xF4, 0xFD))
+    header_bar(slide, "🌍 Where Is This Used in the Real World?",
+               "Simultaneous equations are everywhere!")
+
+    contexts = [
+        ("💰", "Economics",     "Finding equilibrium where supply meets demand."),
+        ("🏗️", "Engineering",   "Balancing forces in structures and circuits."),
+        ("🧪", "Chemistry",     "Mixing solutions to hit a target concentration."),
+        ("📈", "Business",      "Break-even analysis and profit optimisation."),
+        ("🏥", "Medicine",      "Calculating drug dosages across compartments."),
+        ("🎮", "Game Design",   "Balancing character stats and resource systems."),
+    ]
+
+    for i, (icon, field, desc) in enumerate(contexts):
+        col = i % 3
+        row = i // 3
+        lx = 0.4 + col * 4.25
+        ty = 1.65 + row * 2.35
+        add_rect(slide, lx, ty, 3.9, 2.05, fill=WHITE)
+        add_rect(slide, lx, ty, 3.9, 0.07, fill=TEAL if row==0 else GOLD)
+        add_text(slide, icon, lx+0.1, ty+0.12, 0.7, 0.65,
+                 font_size=30, color=NAVY, align=PP_ALIGN.CENTER)
+        add_text(slide, field, lx+0.8, ty+0.18, 2.9, 0.48,
+                 font_size=17, bold=True, color=NAVY)
+        add_text(slide, desc, lx+0.15, ty+0.72, 3.65, 1.1,
+                 font_size=13, color=DGRAY, wrap=True)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 13 – Challenge Round (Gamification)
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-add_rect(slide, 0, 0, 13.33, 7.5, fill=NAVY)
-add_rect(slide, 0, 0, 13.33, 0.08, fill=GOLD)
-add_rect(slide, 0, 7.42, 13.33, 0.08, fill=GOLD)
-
-add_text(slide, "🎮  CHALLENGE ROUND", 0.5, 0.4, 12.3, 0.8,
-         font_size=38, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-add_text(slide, "7 minutes  —  solve as many as you can  —  earn XP on the website!",
-         0.5, 1.1, 12.3, 0.5, font_size=16, color=LGRAY, align=PP_ALIGN.CENTER)
-
-challenges = [
-    ("⭐ 10 XP", "QUICK FIRE",
-     "The sum of two numbers is 56.\nTheir difference is 14.\nFind both numbers."),
-    ("⭐⭐ 20 XP", "REAL WORLD",
-     "A phone plan charges $25/month + $0.10/text.\nAnother charges $15/month + $0.25/text.\nFor how many texts are they equal?"),
-    ("⭐⭐⭐ 30 XP", "BOSS LEVEL",
-     "Two cars leave cities 480 km apart at the same time.\nCar A travels at 90 km/h, Car B at 70 km/h.\nWhen and where do they meet?"),
-]
-
-for i, (xp, title, problem) in enumerate(challenges):
-    lx = 0.4 + i * 4.25
-    add_rect(slide, lx, 1.8, 3.9, 5.2, fill=RGBColor(0x1E, 0x2D, 0x72))
-    add_rect(slide, lx, 1.8, 3.9, 0.07, fill=TEAL)
-    add_text(slide, xp, lx+0.1, 1.88, 3.7, 0.42,
-             font_size=14, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
-    add_text(slide, title, lx+0.1, 2.32, 3.7, 0.5,
-             font_size=16, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
-    add_rect(slide, lx+0.15, 2.88, 3.6, 0.03, fill=TEAL)
-    add_text(slide, problem, lx+0.15, 3.0, 3.65, 3.6,
-             font_size=15, color=LGRAY, wrap=True)
-
-add_text(slide, "🏆 Top 3 scorers on the leaderboard win a bonus prize!",
-         0.5, 7.1, 12.3, 0.3, font_size=13, bold=True, color=GOLD,
-         align=PP_ALIGN.CENTER)
+def slide_challenge(slide, challenges):
+    header_bar(slide, "🎮  CHALLENGE ROUND",
+               "7 minutes  —  solve as many as you can  —  earn XP on the website!")
+
+    for i, q in enumerate(challenges):
+        xp, title, problem = f"{q.stars} {q.xp} XP", q.title, q.text
+        lx = 0.4 + i * 4.25
+        add_rect(slide, lx, 1.8, 3.9, 5.2, fill=RGBColor(0x1E, 0x2D, 0x72))
+        add_rect(slide, lx, 1.8, 3.9, 0.07, fill=TEAL)
+        add_text(slide, xp, lx+0.1, 1.88, 3.7, 0.42,
+                 font_size=14, bold=True, color=GOLD, align=PP_ALIGN.CENTER)
+        add_text(slide, title, lx+0.1, 2.32, 3.7, 0.5,
+                 font_size=16, bold=True, color=WHITE, align=PP_ALIGN.CENTER)
+        add_rect(slide, lx+0.15, 2.88, 3.6, 0.03, fill=TEAL)
+        add_text(slide, problem, lx+0.15, 3.0, 3.65, 3.6,
+                 font_size=15, color=LGRAY, wrap=True)
+
+    add_text(slide, "🏆 Top 3 scorers on the leaderboard win a bonus prize!",
+             0.5, 7.1, 12.3, 0.3, font_size=13, bold=True, color=GOLD,
+             align=PP_ALIGN.CENTER)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SLIDE 14 – Exit Ticket / Reflect
 # ═══════════════════════════════════════════════════════════════════════════
-slide = prs.slides.add_slide(BLANK)
-slide_bg(slide, LGRAY)
-header_bar(slide, "🪞 Reflect & Exit Ticket", "3 minutes — show what you know")
-
-# Traffic light self-assessment
-add_rect(slide, 0.3, 1.55, 4.5, 5.55, fill=WHITE)
-accent_bar(slide, 0.3, 1.55, 4.5, 0.07, color=NAVY)
-add_text(slide, "Self-Assessment\nTraffic Light", 0.4, 1.65, 4.3, 0.75,
-         font_size=16, bold=True, color=NAVY, align=PP_ALIGN.CENTER)
-
-lights = [
-    (GREEN,  "🟢 Green  — Got it!",
-     "I can set up AND solve worded simultaneous equation problems independently."),
-    (GOLD,   "🟡 Yellow — Nearly!",
-     "I can set up the equations but need more practice with the solving methods."),
-    (RGBColor(0xD0,0x32,0x2A), "🔴 Red — Need help!",
-     "I'm still unsure about how to start worded problems — more practice needed."),
-]
-for i, (col, label, desc) in enumerate(lights):
-    ty = 2.5 + i * 1.55
-    add_rect(slide, 0.4, ty, 4.2, 1.35, fill=RGBColor(0xFA,0xFA,0xFA))
-    add_rect(slide, 0.4, ty, 0.18, 1.35, fill=col)
-    add_text(slide, label, 0.65, ty+0.1, 3.8, 0.4,
-             font_size=13, bold=True, color=DGRAY)
-    add_text(slide, desc, 0.65, ty+0.52, 3.8, 0.75,
-             font_size=12, color=DGRAY, wrap=True)
-
-# Exit ticket question
-add_rect(slide, 5.05, 1.55, 8.0, 5.55, fill=WHITE)
-accent_bar(slide, 5.05, 1.55, 8.0, 0.07, color=GOLD)
-add_text(slide, "📝 Exit Ticket", 5.15, 1.64, 7.8, 0.5,
-         font_size=18, bold=True, color=NAVY)
-add_text(slide,
-    "On your mini whiteboard (or worksheet):\n\n"
-    "A jar contains 20-cent and 50-cent coins.\n"
-    "There are 30 coins worth $12.00 in total.\n\n"
-    "Find the number of each type of coin.",
-    5.15, 2.22, 7.8, 2.2, font_size=16, color=DGRAY, wrap=True)
-# Lines
-for i in range(5):
-    add_rect(slide, 5.15, 4.55+i*0.44, 7.7, 0.03,
-             fill=RGBColor(0xCC,0xCC,0xCC))
-# Homework note
-add_rect(slide, 5.05, 6.5, 8.0, 0.55, fill=NAVY)
-add_text(slide, "📚 Homework: Exercise 1K — see working programs on the class portal",
-         5.15, 6.54, 7.8, 0.45, font_size=12, bold=True, color=GOLD)
-
-prs.save("/home/user/mathsteaching/Ex 1K - Applications (New Engaging Lesson).pptx")
-print("PowerPoint saved successfully!")
+def slide_exit_ticket(slide, ticket):
+    (_, coins), (values, worth) = equations(ticket)
+    header_bar(slide, "🪞 Reflect & Exit Ticket", "3 minutes — show what you know")
+
+    # Traffic light self-assessment (left column)
+    add_text(slide, "Self-Assessment\nTraffic Light", 0.4, 1.65, 4.3, 0.75,
+             font_size=16, bold=True, color=NAVY, align=PP_ALIGN.CENTER)
+
+    lights = [
+        (GREEN,  "🟢 Green  — Got it!",
+         "I can set up AND solve worded simultaneous equation problems independently."),
+        (GOLD,   "🟡 Yellow — Nearly!",
+         "I can set up the equations but need more practice with the solving methods."),
+        (RGBColor(0xD0,0x32,0x2A), "🔴 Red — Need help!",
+         "I'm still unsure about how to start worded problems — more practice needed."),
+    ]
+    for i, (col, label, desc) in enumerate(lights):
+        ty = 2.5 + i * 1.55
+        add_rect(slide, 0.4, ty, 4.2, 1.35, fill=RGBColor(0xFA,0xFA,0xFA))
+        add_rect(slide, 0.4, ty, 0.18, 1.35, fill=col)
+        add_text(slide, label, 0.65, ty+0.1, 3.8, 0.4,
+                 font_size=13, bold=True, color=DGRAY)
+        add_text(slide, desc, 0.65, ty+0.52, 3.8, 0.75,
+                 font_size=12, color=DGRAY, wrap=True)
+
+    # Exit ticket question (right column)
+    add_text(slide, "📝 Exit Ticket", 5.15, 1.64, 7.8, 0.5,
+             font_size=18, bold=True, color=NAVY)
+    add_text(slide,
+        "On your mini whiteboard (or worksheet):\n\n"
+        f"A jar contains {num(100 * values['t'])}-cent and {num(100 * values['f'])}-cent coins.\n"
+        f"There are {num(coins)} coins worth ${float(worth):.2f} in total.\n\n"
+        "Find the number of each type of coin.",
+        5.15, 2.22, 7.8, 2.2, font_size=16, color=DGRAY, wrap=True)
+    # Lines
+    for i in range(5):
+        add_rect(slide, 5.15, 4.55+i*0.44, 7.7, 0.03,
+                 fill=RGBColor(0xCC,0xCC,0xCC))
+    # Homework note
+    add_rect(slide, 5.05, 6.5, 8.0, 0.55, fill=NAVY)
+    add_text(slide, "📚 Homework: Exercise 1K — see working programs on the class portal",
+             5.15, 6.54, 7.8, 0.45, font_size=12, bold=True, color=GOLD)
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════════════════
+def deck_slides():
+    """The (layout name, slide function, args) list for the deck, in order."""
+    bank = load_bank()
+    content = "Content with Header"
+    return [
+        ("Title",      slide_title,             ()),                            # 1
+        (content,      slide_roadmap,           ()),                            # 2
+        (content,      slide_warm_up,           (bank.get("warmup"),)),         # 3
+        (content,      slide_intentions,        ()),                            # 4
+        (content,      slide_four_steps,        ()),                            # 5
+        (content,      slide_example1_question, (bank.get("exA"),)),            # 6
+        (content,      slide_example1_solution, (bank.get("exA"),)),            # 7
+        (content,      slide_example2_question, (bank.get("exB"),)),            # 8
+        (content,      slide_example2_solution, (bank.get("exB"),)),            # 9
+        (content,      slide_practice,          ()),                            # 10
+        (content,      slide_special_cases,
+         (tuple(bank.get(qid) for qid in ("case1", "case2", "case3")),)),        # 11
+        (content,      slide_real_world,        ()),                            # 12
+        ("Challenge",  slide_challenge,         (tuple(bank.select(set="challenge")),)),  # 13
+        ("Two Column", slide_exit_ticket,       (bank.get("exit"),)),           # 14
+    ]
+
+def _overflow_notes(texts):
+    """Overflow warnings as elements stored after a slide's cached <p:cSld>, so a
+    cache hit reports them as rendering the slide would."""
+    notes = []
+    for text in texts:
+        note = etree.Element("overflow")
+        note.text = text
+        notes.append(note)
+    return notes
+
+# Any change to the shared helpers or palette invalidates every cached slide
+HELPER_SALT = source_salt(
+    add_rect, add_text, add_para, add_label_box, slide_bg, set_placeholder, header_bar,
+    accent_bar, _xfrm, _fill, _rect, _placeholder, _cSld, MASTER, LAYOUTS, build_master,
+    NAVY, TEAL, GOLD, WHITE, LGRAY, DGRAY, GREEN, ORANGE, PURPLE, _overflow_notes,
+    num, money, term, check, equations, key_values, parse_equation, parse_side,
+    text_fit.fit, text_fit.wrap_lines, text_fit.TABLES, pptx.__version__,
+)
+
+# Wrapped to count calls and time them under --profile
+PROFILED_HELPERS = (
+    "add_rect", "add_text", "add_para", "add_label_box", "slide_bg", "set_placeholder",
+    "header_bar", "accent_bar", "build_master",
+)
+
+def deck_cache():
+    return SectionCache("deck", HELPER_SALT, parse_xml)
+
+def render_slide(slide, cache, fn, args=()):
+    """Render one slide, splicing its <p:cSld> from the cache when unchanged."""
+    if cache is None:
+        fn(slide, *args)
+        return
+    key = cache.key(fn, (slide.slide_layout.name, args))
+    cached = cache.fragment(key)
+    if cached is not None:
+        old = slide._element.cSld
+        old.addprevious(cached[0])
+        slide._element.remove(old)
+        OVERFLOWS.extend(note.text for note in cached[1:])
+        return
+    first = len(OVERFLOWS)
+    fn(slide, *args)
+    cache.store(key, [slide._element.cSld, *_overflow_notes(OVERFLOWS[first:])])
+
+def build_deck(cache=None):
+    OVERFLOWS.clear()
+    prs = Presentation()
+    prs.slide_width  = Inches(13.33)
+    prs.slide_height = Inches(7.5)
+
+    layouts = build_master(prs)
+    for layout, fn, args in deck_slides():
+        with PROFILE.span(fn.__name__):
+            render_slide(prs.slides.add_slide(layouts[layout]), cache, fn, args)
+    return prs
+
+def write_deck(out, cache=None):
+    """Build the deck and write the .pptx to `out`: a path or any writable
+    binary file object, seekable or not."""
+    with PROFILE.span("build"):
+        prs = build_deck(cache)
+    with PROFILE.span("save"):
+        reproducible.save(prs, out)
+
+def deck_bytes(cache=None):
+    """The .pptx package as a memoryview over an in-memory buffer (no temp file, no copy)."""
+    buf = io.BytesIO()
+    write_deck(buf, cache)
+    return buf.getbuffer()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    ap.add_argument("-o", "--output", default=OUTPUT,
+                    help="where to save the deck; - writes it to stdout")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="render every slide from scratch")
+    ap.add_argument("--optimize", action="store_true",
+                    help="merge duplicate images and repack the zip tighter after saving")
+    pptx_optimize.add_arguments(ap)
+    build_profile.add_arguments(ap)
+    args = ap.parse_args(argv)
+    build_profile.configure(args, globals(), PROFILED_HELPERS)
+
+    try:
+        with PROFILE.span("verify"):
+            verify()
+        cache = None if args.no_cache else deck_cache()
+        # With -o - the package goes to stdout, so progress notes go to stderr
+        to_stdout = args.output == "-"
+        log = sys.stderr if to_stdout else sys.stdout
+        if args.optimize or args.downsample:
+            with PROFILE.span("optimize"):
+                data, report = pptx_optimize.optimize_package(deck_bytes(cache), args.downsample)
+            if to_stdout:
+                sys.stdout.buffer.write(data)
+            else:
+                with open(args.output, "wb") as f:
+                    f.write(data)
+        else:
+            write_deck(sys.stdout.buffer if to_stdout else args.output, cache)
+        if cache is not None:
+            print(cache.summary(), file=log)
+        for text in OVERFLOWS:
+            print(f"warning: text overflows its box even at {text_fit.MIN_SIZE}pt: "
+                  f"{text[:60]!r}", file=log)
+        if args.optimize or args.downsample:
+            print(pptx_optimize.describe(report), file=log)
+        print("PowerPoint saved successfully!", file=log)
+    finally:
+        build_profile.finish(args)
+
+if __name__ == "__main__":
+    main()
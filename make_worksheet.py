@@ -3,21 +3,39 @@ Generate a scaffolded worksheet (.docx) for Ex 1K – Applications of Simultaneo
 55-minute lesson  |  Student-facing
 """
 from docx import Document
-from docx.shared import Pt, Inches, RGBColor, Cm
+from docx.shared import Pt, Inches, RGBColor, Cm, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import nsdecls, qn
+from docx.oxml import OxmlElement, parse_xml
+from docx.text.run import Run
+from lxml import etree
+import docx
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from xml.sax.saxutils import escape
+import argparse
+import contextlib
 import copy
-
-doc = Document()
-
-# ── Page margins ─────────────────────────────────────────────────────────────
-section = doc.sections[0]
-section.top_margin    = Cm(1.5)
-section.bottom_margin = Cm(1.5)
-section.left_margin   = Cm(2.0)
-section.right_margin  = Cm(2.0)
+import csv
+import io
+import os
+import random
+import re
+import sys
+import zlib
+
+from build_profile import PROFILE
+import build_profile
+from docx_stream import StreamingDocument, body_fragment
+from question_bank import load_bank
+import reproducible
+from section_cache import SectionCache, source_salt
+from verify_answers import equations, key_values, parse_equation, parse_side, verify
+
+OUTPUT = "/home/user/mathsteaching/Ex 1K - Applications Worksheet.docx"
+ANSWER_KEY = "/home/user/mathsteaching/Ex 1K - Applications Answer Key.docx"
 
 # ── Colour helpers ────────────────────────────────────────────────────────────
 NAVY   = RGBColor(0x1A, 0x23, 0x5C)
@@ -31,35 +49,117 @@ ORANGE = RGBColor(0xE8, 0x57, 0x1A)
 PURPLE = RGBColor(0x6A, 0x3D, 0x9A)
 RED    = RGBColor(0xC0, 0x20, 0x20)
 
-def set_cell_bg(cell, rgb: RGBColor):
-    tcPr = cell._tc.get_or_add_tcPr()
+# ── OOXML fragment cache ──────────────────────────────────────────────────────
+# Shading, borders and run formatting repeat thousands of times in a class
+# pack, so each distinct element is built once and deep-copied after that.
+@lru_cache(maxsize=None)
+def _shd(hex_color):
     shd = OxmlElement('w:shd')
     shd.set(qn('w:val'), 'clear')
     shd.set(qn('w:color'), 'auto')
-    hex_color = '{:02X}{:02X}{:02X}'.format(rgb[0], rgb[1], rgb[2])
     shd.set(qn('w:fill'), hex_color)
-    tcPr.append(shd)
+    return shd
+
+@lru_cache(maxsize=None)
+def _tc_borders(spec):
+    tcBorders = OxmlElement('w:tcBorders')
+    for side, val, sz, color in spec:
+        el = OxmlElement(f'w:{side}')
+        el.set(qn('w:val'), val)
+        el.set(qn('w:sz'), str(sz))
+        el.set(qn('w:color'), color)
+        tcBorders.append(el)
+    return tcBorders
+
+@lru_cache(maxsize=None)
+def _rpr(size, color, bold, italic):
+    run = Run(OxmlElement('w:r'), None)
+    run.font.size = Pt(size)
+    run.font.color.rgb = color
+    if bold is not None:
+        run.bold = bold
+    if italic is not None:
+        run.italic = italic
+    return run._r.rPr
+
+def style_run(run, size, color, bold=None, italic=None):
+    """Apply size/colour/bold/italic to a fresh run from the fragment cache."""
+    run._r.insert(0, copy.deepcopy(_rpr(size, color, bold, italic)))
+    return run
+
+def set_cell_bg(cell, rgb: RGBColor):
+    tcPr = cell._tc.get_or_add_tcPr()
+    hex_color = '{:02X}{:02X}{:02X}'.format(rgb[0], rgb[1], rgb[2])
+    tcPr.append(copy.deepcopy(_shd(hex_color)))
 
 def set_cell_borders(cell, top=None, bottom=None, left=None, right=None):
     tcPr = cell._tc.get_or_add_tcPr()
-    tcBorders = OxmlElement('w:tcBorders')
-    for side, val in [('top', top), ('bottom', bottom), ('left', left), ('right', right)]:
-        if val:
-            el = OxmlElement(f'w:{side}')
-            el.set(qn('w:val'), val.get('val', 'single'))
-            el.set(qn('w:sz'), str(val.get('sz', 4)))
-            el.set(qn('w:color'), val.get('color', '000000'))
-            tcBorders.append(el)
-    tcPr.append(tcBorders)
+    spec = tuple((side, val.get('val', 'single'), val.get('sz', 4), val.get('color', '000000'))
+                 for side, val in [('top', top), ('bottom', bottom), ('left', left), ('right', right)]
+                 if val)
+    tcPr.append(copy.deepcopy(_tc_borders(spec)))
+
+# ── Bulk tables ───────────────────────────────────────────────────────────────
+# A whole table is written as one XML string and parsed once, instead of
+# python-docx's cell-by-cell access (tbl.cell() walks the grid on every call).
+Cell = namedtuple("Cell", "text size color bold italic fill align",
+                  defaults=(10, DGRAY, None, None, None, None))
+
+@lru_cache(maxsize=None)
+def _rpr_xml(size, color, bold, italic):
+    return re.sub(r' xmlns:\w+="[^"]*"', "", etree.tostring(_rpr(size, color, bold, italic), encoding="unicode"))
+
+def _run_xml(text):
+    # Tabs and line breaks become w:tab / w:br, as python-docx's run.text does
+    out = []
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            out.append("<w:br/>")
+        for j, chunk in enumerate(line.split("\t")):
+            if j:
+                out.append("<w:tab/>")
+            if chunk:
+                space = ' xml:space="preserve"' if chunk.strip() != chunk else ""
+                out.append(f"<w:t{space}>{escape(chunk)}</w:t>")
+    return "".join(out)
+
+def _cell_xml(cell, width):
+    tc_pr = f'<w:tcW w:type="dxa" w:w="{width}"/>'
+    if cell.fill is not None:
+        tc_pr += '<w:shd w:val="clear" w:color="auto" w:fill="{:02X}{:02X}{:02X}"/>'.format(*cell.fill)
+    p_pr = f'<w:pPr><w:jc w:val="{cell.align.xml_value}"/></w:pPr>' if cell.align is not None else ""
+    run = f"<w:r>{_rpr_xml(cell.size, cell.color, cell.bold, cell.italic)}{_run_xml(cell.text)}</w:r>"
+    return f"<w:tc><w:tcPr>{tc_pr}</w:tcPr><w:p>{p_pr}{run}</w:p></w:tc>"
+
+def bulk_table(doc, rows, widths=None, align=WD_TABLE_ALIGNMENT.LEFT):
+    """Append a table from a matrix of Cells in one step; linear in the number of cells.
+
+    `widths` are column widths (python-docx Lengths); by default the page width
+    is shared equally, as with doc.add_table().
+    """
+    cols = max(len(row) for row in rows)
+    if widths is None:
+        widths = [doc._block_width // cols] * cols
+    twips = [int(Emu(w).twips) for w in widths]
+    jc = f'<w:jc w:val="{align.xml_value}"/>' if align is not None else ""
+    xml = "".join([
+        f"<w:tbl {nsdecls('w')}><w:tblPr><w:tblW w:type=\"auto\" w:w=\"0\"/>{jc}",
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+        'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>',
+        *(f'<w:gridCol w:w="{w}"/>' for w in twips), "</w:tblGrid>",
+        *("<w:tr>" + "".join(_cell_xml(cell, w) for cell, w in zip(row, twips)) + "</w:tr>"
+          for row in rows),
+        "</w:tbl>",
+    ])
+    tbl = parse_xml(xml)
+    doc.element.body.sectPr.addprevious(tbl)
+    return tbl
 
 def heading(doc, text, level=1, color=NAVY, size=18, space_before=12, space_after=4):
     p = doc.add_paragraph()
     p.paragraph_format.space_before = Pt(space_before)
     p.paragraph_format.space_after  = Pt(space_after)
-    run = p.add_run(text)
-    run.bold = True
-    run.font.size = Pt(size)
-    run.font.color.rgb = color
+    style_run(p.add_run(text), size, color, bold=True)
     return p
 
 def body(doc, text, size=11, color=DGRAY, bold=False, italic=False,
@@ -69,21 +169,34 @@ def body(doc, text, size=11, color=DGRAY, bold=False, italic=False,
     p.paragraph_format.space_after  = Pt(space_after)
     if indent:
         p.paragraph_format.left_indent = Cm(indent)
-    run = p.add_run(text)
-    run.font.size = Pt(size)
-    run.font.color.rgb = color
-    run.bold = bold
-    run.italic = italic
+    style_run(p.add_run(text), size, color, bold=bold, italic=italic)
     return p
 
+# Numbers read off a bank entry (verify_answers.equations / key_values), as printed
+def num(v, sep=""):
+    """7, 1.5, or 3 150 with sep=" " for thousands."""
+    return f"{v.numerator:,}".replace(",", sep) if v.denominator == 1 else f"{float(v):g}"
+
+def money(v, sep=""):
+    return f"${num(v, sep)}" if v.denominator == 1 else f"${float(v):.2f}"
+
+def term(coeff, var):
+    return f"{'' if coeff == 1 else num(coeff)}{var}"
+
+def check(coeffs, const, values):
+    """'140 + 210 = 350' or '12(140) + 7(210) = 1680 + 1470 = 3150'."""
+    parts = [(c, values[var]) for var, c in coeffs.items()]
+    if all(c == 1 for c, _ in parts):
+        return f"{' + '.join(num(v) for _, v in parts)} = {num(const)}"
+    return (f"{' + '.join(f'{num(c)}({num(v)})' for c, v in parts)} = "
+            f"{' + '.join(num(c * v) for c, v in parts)} = {num(const)}")
+
 def blank_lines(doc, n=3, label="Working space"):
     for _ in range(n):
         p = doc.add_paragraph()
         p.paragraph_format.space_before = Pt(0)
         p.paragraph_format.space_after  = Pt(0)
-        run = p.add_run("_" * 90)
-        run.font.size = Pt(9)
-        run.font.color.rgb = RGBColor(0xCC, 0xCC, 0xCC)
+        style_run(p.add_run("_" * 90), 9, RGBColor(0xCC, 0xCC, 0xCC))
 
 def answer_box(doc, rows=2):
     """A shaded answer box."""
@@ -93,13 +206,9 @@ def answer_box(doc, rows=2):
     set_cell_bg(cell, LGRAY)
     cell.width = Inches(6.5)
     p = cell.paragraphs[0]
-    run = p.add_run("Answer: " + "_" * 60)
-    run.font.size = Pt(11)
-    run.font.color.rgb = NAVY
+    style_run(p.add_run("Answer: " + "_" * 60), 11, NAVY)
     for _ in range(rows - 1):
-        p2 = cell.add_paragraph("_" * 72)
-        p2.runs[0].font.size = Pt(11)
-        p2.runs[0].font.color.rgb = NAVY
+        style_run(cell.add_paragraph().add_run("_" * 72), 11, NAVY)
     doc.add_paragraph()
 
 def section_banner(doc, text, bg=NAVY, fg=WHITE):
@@ -109,104 +218,91 @@ def section_banner(doc, text, bg=NAVY, fg=WHITE):
     set_cell_bg(cell, bg)
     p = cell.paragraphs[0]
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    run = p.add_run(text)
-    run.font.size = Pt(13)
-    run.font.bold = True
-    run.font.color.rgb = fg
+    style_run(p.add_run(text), 13, fg, bold=True)
     doc.add_paragraph()
 
 def step_scaffold_table(doc, steps):
     """4-column scaffold for the 4-step method."""
-    tbl = doc.add_table(rows=2, cols=4)
-    tbl.alignment = WD_TABLE_ALIGNMENT.LEFT
     colors = [TEAL, GREEN, ORANGE, PURPLE]
-    for i, (step_title, step_hint) in enumerate(steps):
-        hdr_cell = tbl.cell(0, i)
-        set_cell_bg(hdr_cell, colors[i])
-        p = hdr_cell.paragraphs[0]
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = p.add_run(step_title)
-        run.font.bold = True; run.font.size = Pt(10); run.font.color.rgb = WHITE
-
-        body_cell = tbl.cell(1, i)
-        set_cell_bg(body_cell, LGRAY)
-        p2 = body_cell.paragraphs[0]
-        run2 = p2.add_run(step_hint)
-        run2.font.size = Pt(9); run2.font.color.rgb = DGRAY; run2.italic = True
+    bulk_table(doc, [
+        [Cell(title, 10, WHITE, bold=True, fill=color, align=WD_ALIGN_PARAGRAPH.CENTER)
+         for (title, _), color in zip(steps, colors)],
+        [Cell(hint, 9, DGRAY, italic=True, fill=LGRAY) for _, hint in steps],
+    ])
     doc.add_paragraph()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # WORKSHEET HEADER
 # ══════════════════════════════════════════════════════════════════════════════
-# Title banner
-tbl = doc.add_table(rows=1, cols=1)
-cell = tbl.cell(0, 0)
-set_cell_bg(cell, NAVY)
-p = cell.paragraphs[0]
-p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-r = p.add_run("Ex 1K  —  Applications of Simultaneous Linear Equations")
-r.font.size = Pt(18); r.font.bold = True; r.font.color.rgb = WHITE
-doc.add_paragraph()
-
-# Student info row
-tbl2 = doc.add_table(rows=1, cols=4)
-tbl2.alignment = WD_TABLE_ALIGNMENT.LEFT
-for i, lbl in enumerate(["Name: ___________________________",
-                          "Date: ____________",
-                          "Class: __________",
-                          "Score: _____ / 50 XP"]):
-    c = tbl2.cell(0, i)
-    rn = c.paragraphs[0].add_run(lbl)
-    rn.font.size = Pt(10); rn.font.color.rgb = DGRAY
-doc.add_paragraph()
-
-# Learning intentions box
-tbl3 = doc.add_table(rows=1, cols=1)
-cell3 = tbl3.cell(0, 0)
-set_cell_bg(cell3, RGBColor(0xE8, 0xF4, 0xFD))
-p3 = cell3.paragraphs[0]
-r3 = p3.add_run("🎯  Learning Intentions")
-r3.font.bold = True; r3.font.size = Pt(12); r3.font.color.rgb = NAVY
-for intent in [
-    "  ✔  I can define variables clearly from a worded problem.",
-    "  ✔  I can write two linear equations from given information.",
-    "  ✔  I can solve simultaneous equations and interpret the answer in context.",
-    "  ✔  I can identify parallel and coincident lines from their equations.",
-]:
-    pp = cell3.add_paragraph(intent)
-    pp.runs[0].font.size = Pt(10); pp.runs[0].font.color.rgb = DGRAY
-doc.add_paragraph()
+def worksheet_header(doc, student=None, class_name=None):
+    # Title banner
+    tbl = doc.add_table(rows=1, cols=1)
+    cell = tbl.cell(0, 0)
+    set_cell_bg(cell, NAVY)
+    p = cell.paragraphs[0]
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    r = p.add_run("Ex 1K  —  Applications of Simultaneous Linear Equations")
+    r.font.size = Pt(18); r.font.bold = True; r.font.color.rgb = WHITE
+    doc.add_paragraph()
+
+    # Student info row
+    bulk_table(doc, [[Cell(lbl) for lbl in [
+        f"Name: {student}" if student else "Name: ___________________________",
+        "Date: ____________",
+        f"Class: {class_name}" if class_name else "Class: __________",
+        "Score: _____ / 50 XP"]]])
+    doc.add_paragraph()
+
+    # Learning intentions box
+    tbl3 = doc.add_table(rows=1, cols=1)
+    cell3 = tbl3.cell(0, 0)
+    set_cell_bg(cell3, RGBColor(0xE8, 0xF4, 0xFD))
+    p3 = cell3.paragraphs[0]
+    r3 = p3.add_run("🎯  Learning Intentions")
+    r3.font.bold = True; r3.font.size = Pt(12); r3.font.color.rgb = NAVY
+    for intent in [
+        "  ✔  I can define variables clearly from a worded problem.",
+        "  ✔  I can write two linear equations from given information.",
+        "  ✔  I can solve simultaneous equations and interpret the answer in context.",
+        "  ✔  I can identify parallel and coincident lines from their equations.",
+    ]:
+        pp = cell3.add_paragraph(intent)
+        pp.runs[0].font.size = Pt(10); pp.runs[0].font.color.rgb = DGRAY
+    doc.add_paragraph()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PART 1 – WARM UP
 # ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc, "⚡  PART 1  |  Warm-Up  (5 minutes)", bg=TEAL)
-
-body(doc, "At the school canteen:", bold=True, size=11, color=NAVY)
-body(doc, "   •  2 pies + 3 drinks = $13.00", size=11, color=DGRAY)
-body(doc, "   •  4 pies + 1 drink  = $15.00", size=11, color=DGRAY)
-body(doc, "Using the 4-step method below, find the price of one pie and one drink.",
-     size=11, bold=True, color=NAVY, space_before=6)
-
-step_scaffold_table(doc, [
-    ("STEP 1\nDefine Variables",
-     'Let p = price of a pie\nLet d = price of a drink'),
-    ("STEP 2\nForm Equations",
-     'Write equation (1): _______________\nWrite equation (2): _______________'),
-    ("STEP 3\nSolve",
-     'Show your working below.\nUse elimination or substitution.'),
-    ("STEP 4\nAnswer in Context",
-     'Write a sentence:\n"The price of one pie is …"'),
-])
-
-blank_lines(doc, 5)
-answer_box(doc, 2)
+def part_warm_up(doc, warmup):
+    section_banner(doc, "⚡  PART 1  |  Warm-Up  (5 minutes)", bg=TEAL)
+
+    body(doc, "At the school canteen:", bold=True, size=11, color=NAVY)
+    # The facts are the bank's system, which verify_answers.py checks against its key
+    facts = [(f"{num(c['p'])} pie{'s' * (c['p'] != 1)} + {num(c['d'])} drink{'s' * (c['d'] != 1)}",
+              total) for c, total in equations(warmup)]
+    width = max(len(items) for items, _ in facts)
+    for items, total in facts:
+        body(doc, f"   •  {items.ljust(width)} = ${float(total):.2f}", size=11, color=DGRAY)
+    body(doc, "Using the 4-step method below, find the price of one pie and one drink.",
+         size=11, bold=True, color=NAVY, space_before=6)
+
+    step_scaffold_table(doc, [
+        ("STEP 1\nDefine Variables",
+         'Let p = price of a pie\nLet d = price of a drink'),
+        ("STEP 2\nForm Equations",
+         'Write equation (1): _______________\nWrite equation (2): _______________'),
+        ("STEP 3\nSolve",
+         'Show your working below.\nUse elimination or substitution.'),
+        ("STEP 4\nAnswer in Context",
+         'Write a sentence:\n"The price of one pie is …"'),
+    ])
+
+    blank_lines(doc, 5)
+    answer_box(doc, 2)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PART 2 – THE 4-STEP METHOD (REMINDER)
 # ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc, "📐  The 4-Step Method  —  Quick Reference", bg=NAVY)
-
 steps_ref = [
     ("1. Define Variables",
      'Choose a meaningful letter for each unknown. Write e.g. "Let x = …"'),
@@ -217,234 +313,507 @@ steps_ref = [
     ("4. Answer in Context",
      "Write a full sentence using the original words and units. Check your answer!"),
 ]
-for num, hint in steps_ref:
-    tbl_s = doc.add_table(rows=1, cols=2)
-    tbl_s.alignment = WD_TABLE_ALIGNMENT.LEFT
-    tbl_s.columns[0].width = Inches(2)
-    tbl_s.columns[1].width = Inches(4.8)
-    c0 = tbl_s.cell(0, 0)
-    set_cell_bg(c0, LGRAY)
-    r0 = c0.paragraphs[0].add_run(num)
-    r0.font.bold = True; r0.font.size = Pt(10); r0.font.color.rgb = NAVY
-    c1 = tbl_s.cell(0, 1)
-    r1 = c1.paragraphs[0].add_run(hint)
-    r1.font.size = Pt(10); r1.font.color.rgb = DGRAY
-doc.add_paragraph()
+
+def part_method_reference(doc, steps):
+    section_banner(doc, "📐  The 4-Step Method  —  Quick Reference", bg=NAVY)
+
+    bulk_table(doc, [[Cell(num, 10, NAVY, bold=True, fill=LGRAY), Cell(hint)] for num, hint in steps],
+               widths=(Inches(2), Inches(4.8)))
+    doc.add_paragraph()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PART 3 – GUIDED EXAMPLES
 # ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc, "📖  PART 2  |  Guided Examples  (follow along)", bg=GREEN)
-
-# Example A
-heading(doc, "Example A  —  Ticket Sales  ⭐", size=13, color=GREEN, space_before=8)
-body(doc,
-     "Adult tickets cost $12 and student tickets cost $7. "
-     "A total of 350 tickets were sold, raising $3 150. "
-     "How many adult and student tickets were sold?",
-     size=11, color=DGRAY)
-
-body(doc, "Step 1 — Define Variables:", bold=True, size=11, color=TEAL, space_before=6)
-body(doc, "   Let a = number of adult tickets      Let s = number of student tickets",
-     size=11, color=DGRAY)
-
-body(doc, "Step 2 — Form Equations:", bold=True, size=11, color=GREEN, space_before=4)
-body(doc, "   Total tickets:    a  +  s  =  350     … (1)", size=11, color=DGRAY)
-body(doc, "   Total revenue:  12a + 7s  = 3 150   … (2)", size=11, color=DGRAY)
-
-body(doc, "Step 3 — Solve (elimination):", bold=True, size=11, color=ORANGE, space_before=4)
-body(doc, "   Multiply (1) by 7:   7a + 7s = 2 450  … (3)", size=11, color=DGRAY)
-body(doc, "   Subtract (3) from (2):   5a = 700   ∴  a = 140", size=11, color=DGRAY)
-body(doc, "   Substitute into (1):  140 + s = 350   ∴  s = 210", size=11, color=DGRAY)
-
-body(doc, "Step 4 — Answer:", bold=True, size=11, color=PURPLE, space_before=4)
-body(doc, "   140 adult tickets and 210 student tickets were sold.", size=11, color=DGRAY)
-body(doc, "   Check: 140 + 210 = 350 ✓   and   12(140) + 7(210) = 1680 + 1470 = 3150 ✓",
-     size=10, italic=True, color=DGRAY)
-doc.add_paragraph()
-
-# Example B
-heading(doc, "Example B  —  Break-Even Analysis  ⭐⭐", size=13, color=GREEN, space_before=8)
-body(doc,
-     "Emma starts a cupcake business. Fixed costs are $240. Each cupcake costs $1.50 to make "
-     "and sells for $4.50.",
-     size=11, color=DGRAY)
-body(doc, "(a)  Write equations for Cost (C) and Revenue (R) in terms of n (number of cupcakes).",
-     size=11, bold=True, color=NAVY)
-body(doc, "     C = _______________________________        R = _______________________________",
-     size=11, color=DGRAY)
-body(doc, "(b)  Find the break-even point (where C = R).", size=11, bold=True, color=NAVY,
-     space_before=4)
-blank_lines(doc, 4)
-answer_box(doc, 2)
+def part_guided_examples(doc, ex_a, ex_b):
+    section_banner(doc, "📖  PART 2  |  Guided Examples  (follow along)", bg=GREEN)
+
+    # Example A, worked from the bank entry whose key verify() checks
+    (c1, k1), (c2, k2) = equations(ex_a)
+    v = key_values(ex_a)
+    m = c2["s"] / c1["s"]          # scale (1) so the s terms match (2)
+    heading(doc, "Example A  —  Ticket Sales  ⭐", size=13, color=GREEN, space_before=8)
+    body(doc,
+         f"Adult tickets cost {money(c2['a'])} and student tickets cost {money(c2['s'])}. "
+         f"A total of {num(k1)} tickets were sold, raising {money(k2, ' ')}. "
+         "How many adult and student tickets were sold?",
+         size=11, color=DGRAY)
 
-# ══════════════════════════════════════════════════════════════════════════════
-# PART 4 – FOUNDATION PRACTICE
-# ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc, "🌱  PART 3  |  Foundation Practice  (Questions 1–5)  ⭐  10 XP each", bg=GREEN)
-body(doc, "Equations are partially set up for you. Complete the solution and answer in context.",
-     size=10, italic=True, color=DGRAY)
-
-foundation_qs = [
-    ("Q1  —  Two Numbers  ⭐",
-     "The sum of two numbers is 42 and their difference is 8. Find both numbers.",
-     [("Let x = larger number,  y = smaller number", False),
-      ("x  +  y  =  _______    … (1)        x  −  y  =  _______    … (2)", False),
-      ("Solve by adding the equations:  2x = _______  ∴  x = _______", False),
-      ("Substitute back:  y = _______", False)], 10),
-    ("Q2  —  Fruit Shop  ⭐",
-     "A bag of apples costs $a and a bag of oranges costs $r. "
-     "3 bags of apples + 2 bags of oranges = $13. "
-     "1 bag of apples + 4 bags of oranges = $11. Find the cost of each.",
-     [("(1)  3a + 2r = _______       (2)  a + 4r = _______", False),
-      ("Method chosen: ________________________________", False),
-      ("Working:", False)], 12),
-    ("Q3  —  Perimeter  ⭐",
-     "A rectangle has perimeter 52 cm. Its length is 8 cm more than its width. "
-     "Find the length and width.",
-     [("Let l = length,  w = width", False),
-      ("Perimeter equation: 2l + 2w = _______   →   l + w = _______    … (1)", False),
-      ("Length/width relationship:  l − w = _______    … (2)", False),
-      ("Solve:", False)], 12),
-    ("Q4  —  Mixing Solutions  ⭐⭐",
-     "A chemist mixes a 20% acid solution with a 50% acid solution to make 12 litres "
-     "of a 35% acid solution. How many litres of each solution does he use?",
-     [("Let x = litres of 20% solution,  y = litres of 50% solution", False),
-      ("Total volume:  x + y = _______    … (1)", False),
-      ("Acid equation:  0.2x + 0.5y = _______    … (2)", False),
-      ("Working:", False)], 14),
-    ("Q5  —  Mobile Plans  ⭐⭐",
-     "Plan A: $25 per month + $0.10 per text. Plan B: $15 per month + $0.25 per text. "
-     "Find the number of texts for which both plans cost the same.",
-     [("Cost A:  C = _______  +  _______  × n", False),
-      ("Cost B:  C = _______  +  _______  × n", False),
-      ("Set equal and solve:  _______________________________", False)], 12),
-]
+    body(doc, "Step 1 — Define Variables:", bold=True, size=11, color=TEAL, space_before=6)
+    body(doc, "   Let a = number of adult tickets      Let s = number of student tickets",
+         size=11, color=DGRAY)
+
+    body(doc, "Step 2 — Form Equations:", bold=True, size=11, color=GREEN, space_before=4)
+    body(doc, f"   Total tickets:    {term(c1['a'], 'a')}  +  {term(c1['s'], 's')}  =  {num(k1, ' ')}     … (1)",
+         size=11, color=DGRAY)
+    body(doc, f"   Total revenue:  {term(c2['a'], 'a')}  +  {term(c2['s'], 's')}  =  {num(k2, ' ')}   … (2)",
+         size=11, color=DGRAY)
 
-for title, question, scaffold_lines, xp in foundation_qs:
-    heading(doc, f"{title}  ({xp} XP)", size=12, color=GREEN, space_before=10)
-    body(doc, question, size=11, color=DGRAY)
+    body(doc, "Step 3 — Solve (elimination):", bold=True, size=11, color=ORANGE, space_before=4)
+    body(doc, f"   Multiply (1) by {num(m)}:   {term(m * c1['a'], 'a')} + {term(m * c1['s'], 's')} = "
+              f"{num(m * k1, ' ')}  … (3)", size=11, color=DGRAY)
+    body(doc, f"   Subtract (3) from (2):   {term(c2['a'] - m * c1['a'], 'a')} = {num(k2 - m * k1)}   "
+              f"∴  a = {num(v['a'])}", size=11, color=DGRAY)
+    body(doc, f"   Substitute into (1):  {num(c1['a'] * v['a'])} + {term(c1['s'], 's')} = {num(k1)}   "
+              f"∴  s = {num(v['s'])}", size=11, color=DGRAY)
+
+    body(doc, "Step 4 — Answer:", bold=True, size=11, color=PURPLE, space_before=4)
+    body(doc, f"   {num(v['a'])} adult tickets and {num(v['s'])} student tickets were sold.",
+         size=11, color=DGRAY)
+    body(doc, f"   Check: {check(c1, k1, v)} ✓   and   {check(c2, k2, v)} ✓",
+         size=10, italic=True, color=DGRAY)
     doc.add_paragraph()
-    for line_text, is_bold in scaffold_lines:
-        body(doc, "   " + line_text, size=11, color=DGRAY, bold=is_bold, space_before=2)
+
+    # Example B
+    (cost, fixed), (revenue, _) = equations(ex_b)
+    heading(doc, "Example B  —  Break-Even Analysis  ⭐⭐", size=13, color=GREEN, space_before=8)
+    body(doc,
+         f"Emma starts a cupcake business. Fixed costs are {money(fixed)}. Each cupcake costs "
+         f"{money(-cost['n'])} to make and sells for {money(-revenue['n'])}.",
+         size=11, color=DGRAY)
+    body(doc, "(a)  Write equations for Cost (C) and Revenue (R) in terms of n (number of cupcakes).",
+         size=11, bold=True, color=NAVY)
+    body(doc, "     C = _______________________________        R = _______________________________",
+         size=11, color=DGRAY)
+    body(doc, "(b)  Find the break-even point (where C = R).", size=11, bold=True, color=NAVY,
+         space_before=4)
     blank_lines(doc, 4)
     answer_box(doc, 2)
 
 # ══════════════════════════════════════════════════════════════════════════════
-# PART 5 – STANDARD PRACTICE
+# PART 4 – FOUNDATION PRACTICE
 # ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc,
-    "📘  PART 4  |  Standard Practice  (Questions 6–9)  ⭐⭐  15 XP each", bg=TEAL)
-body(doc, "Set up your own equations. Choose your method. Full working required.",
-     size=10, italic=True, color=DGRAY)
-
-standard_qs = [
-    ("Q6  —  Age Problem  ⭐⭐",
-     "Maria is three times as old as her daughter Lily. In 10 years, Maria will be twice Lily's age. "
-     "Find their current ages.",
-     16),
-    ("Q7  —  Distance & Speed  ⭐⭐",
-     "Two trains leave cities 480 km apart at the same time, travelling towards each other. "
-     "Train A travels at 90 km/h and Train B at 70 km/h. "
-     "When and where do they meet? (Hint: combined they cover 480 km together.)",
-     18),
-    ("Q8  —  Investment  ⭐⭐⭐",
-     "Omar invests $8 000 in two accounts. Account X pays 4% annual interest, "
-     "Account Y pays 6%. After one year, the total interest is $380. "
-     "How much did Omar invest in each account?",
-     18),
-    ("Q9  —  Geometry  ⭐⭐⭐",
-     "Two angles are supplementary (add to 180°). One angle is 24° more than three times the other. "
-     "Find both angles. Then determine whether the lines with equations y = (first angle)x + 1 "
-     "and y = (second angle)x − 3 are parallel, perpendicular, or neither.",
-     20),
-]
+def part_foundation(doc, questions):
+    section_banner(doc, "🌱  PART 3  |  Foundation Practice  (Questions 1–5)  ⭐  10 XP each", bg=GREEN)
+    body(doc, "Equations are partially set up for you. Complete the solution and answer in context.",
+         size=10, italic=True, color=DGRAY)
+
+    for num, q in enumerate(questions, 1):
+        heading(doc, f"Q{num}  —  {q.title}  {q.stars}  ({q.xp} XP)", size=12, color=GREEN,
+                space_before=10)
+        body(doc, q.text, size=11, color=DGRAY)
+        doc.add_paragraph()
+        for line_text in q.scaffold:
+            body(doc, "   " + line_text, size=11, color=DGRAY, space_before=2)
+        blank_lines(doc, 4)
+        answer_box(doc, 2)
 
-for title, question, xp in standard_qs:
-    heading(doc, f"{title}  ({xp} XP)", size=12, color=TEAL, space_before=10)
-    body(doc, question, size=11, color=DGRAY)
-    body(doc, "Define variables:", bold=True, size=10, color=NAVY, space_before=4)
-    body(doc, "   Let ___ = _______________        Let ___ = _______________",
-         size=11, color=DGRAY)
-    body(doc, "Equations:", bold=True, size=10, color=NAVY, space_before=2)
-    body(doc, "   (1) ________________________________     (2) ________________________________",
-         size=11, color=DGRAY)
-    blank_lines(doc, 5)
-    answer_box(doc, 2)
+# ══════════════════════════════════════════════════════════════════════════════
+# PART 5 – STANDARD PRACTICE
+# ══════════════════════════════════════════════════════════════════════════════
+def part_standard(doc, questions):
+    section_banner(doc,
+        "📘  PART 4  |  Standard Practice  (Questions 6–9)  ⭐⭐  15 XP each", bg=TEAL)
+    body(doc, "Set up your own equations. Choose your method. Full working required.",
+         size=10, italic=True, color=DGRAY)
+
+    for num, q in enumerate(questions, 6):
+        heading(doc, f"Q{num}  —  {q.title}  {q.stars}  ({q.xp} XP)", size=12, color=TEAL,
+                space_before=10)
+        body(doc, q.text, size=11, color=DGRAY)
+        body(doc, "Define variables:", bold=True, size=10, color=NAVY, space_before=4)
+        body(doc, "   Let ___ = _______________        Let ___ = _______________",
+             size=11, color=DGRAY)
+        body(doc, "Equations:", bold=True, size=10, color=NAVY, space_before=2)
+        body(doc, "   (1) ________________________________     (2) ________________________________",
+             size=11, color=DGRAY)
+        blank_lines(doc, 5)
+        answer_box(doc, 2)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # PART 6 – ADVANCED / REASONING
 # ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc,
-    "🔥  PART 5  |  Advanced & Reasoning  (Questions 10–14)  ⭐⭐⭐  20 XP each", bg=ORANGE)
-body(doc, "Multi-step reasoning — show clear logical working. These test your depth of understanding.",
-     size=10, italic=True, color=DGRAY)
-
-advanced_qs = [
-    ("Q10  —  Parallel Lines Analysis  ⭐⭐⭐",
-     "For each pair of equations, determine (without solving) whether there is one solution, "
-     "no solution, or infinite solutions. Justify your answer algebraically.\n\n"
-     "(a)  3x + 2y = 12   and   6x + 4y = 24\n"
-     "(b)  y = 4x − 3     and   2y = 8x + 1\n"
-     "(c)  x + 2y = 7     and   2x − y = 4"),
-    ("Q11  —  Break-Even (Extended)  ⭐⭐⭐",
-     "A start-up makes wireless earbuds. Fixed costs: $12 000. Variable cost: $18 per pair. "
-     "Selling price: $45 per pair.\n\n"
-     "(a)  Write equations for Cost C and Revenue R in terms of n.\n"
-     "(b)  Find the break-even point.\n"
-     "(c)  How many pairs must they sell to make a profit of at least $5 400?"),
-    ("Q12  —  Reverse Engineering  ⭐⭐⭐",
-     "A pair of simultaneous equations has the solution x = 3, y = −2. "
-     "Write TWO different pairs of equations that produce this solution. "
-     "Explain how you constructed them."),
-    ("Q13  —  Proof  ⭐⭐⭐⭐",
-     "Prove algebraically that if two lines y = m₁x + c₁ and y = m₂x + c₂ are parallel "
-     "(m₁ = m₂, c₁ ≠ c₂), then the system of equations has no solution."),
-    ("Q14  —  Real-World Modelling  ⭐⭐⭐⭐",
-     "Create your own real-world application problem involving simultaneous equations. "
-     "Your problem must:\n"
-     "  •  Be set in a realistic context\n"
-     "  •  Have exactly one solution\n"
-     "  •  Require both elimination and back-substitution\n"
-     "  •  Include a full worked solution\n\n"
-     "Exchange your problem with a partner and solve theirs!"),
-]
-
-for title, question in advanced_qs:
-    heading(doc, title, size=12, color=ORANGE, space_before=10)
-    body(doc, question, size=11, color=DGRAY)
-    blank_lines(doc, 6)
-    answer_box(doc, 2)
+def part_advanced(doc, questions):
+    section_banner(doc,
+        "🔥  PART 5  |  Advanced & Reasoning  (Questions 10–14)  ⭐⭐⭐  20 XP each", bg=ORANGE)
+    body(doc, "Multi-step reasoning — show clear logical working. These test your depth of understanding.",
+         size=10, italic=True, color=DGRAY)
+
+    for num, q in enumerate(questions, 10):
+        heading(doc, f"Q{num}  —  {q.title}  {q.stars}", size=12, color=ORANGE, space_before=10)
+        body(doc, q.text, size=11, color=DGRAY)
+        blank_lines(doc, 6)
+        answer_box(doc, 2)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # EXIT TICKET
 # ══════════════════════════════════════════════════════════════════════════════
-section_banner(doc, "🪞  EXIT TICKET  |  (3 minutes)  —  Hand this in before you leave!", bg=PURPLE)
-
-body(doc,
-     "A jar contains 20-cent and 50-cent coins. There are 30 coins worth $12.00 in total. "
-     "How many of each coin are there?",
-     size=12, bold=True, color=NAVY)
-blank_lines(doc, 5)
-answer_box(doc, 2)
-
-# Self-assessment
-body(doc, "Self-Assessment  —  circle one:", bold=True, size=11, color=NAVY, space_before=8)
-tbl_sa = doc.add_table(rows=1, cols=3)
-tbl_sa.alignment = WD_TABLE_ALIGNMENT.LEFT
-for i, (label, col) in enumerate([
-    ("🟢 GREEN — I've got this!", GREEN),
-    ("🟡 YELLOW — Nearly there…", RGBColor(0xC8, 0x96, 0x00)),
-    ("🔴 RED — Need more practice", RED),
-]):
-    cell = tbl_sa.cell(0, i)
-    set_cell_bg(cell, LGRAY)
-    r = cell.paragraphs[0].add_run(label)
-    r.font.size = Pt(11); r.font.bold = True; r.font.color.rgb = col
+def part_exit_ticket(doc, ticket):
+    section_banner(doc, "🪞  EXIT TICKET  |  (3 minutes)  —  Hand this in before you leave!", bg=PURPLE)
+
+    (_, coins), (values, worth) = equations(ticket)
+    body(doc,
+         f"A jar contains {num(100 * values['t'])}-cent and {num(100 * values['f'])}-cent coins. "
+         f"There are {num(coins)} coins worth ${float(worth):.2f} in total. "
+         "How many of each coin are there?",
+         size=12, bold=True, color=NAVY)
+    blank_lines(doc, 5)
+    answer_box(doc, 2)
 
-doc.add_paragraph()
-body(doc, "📚  Homework: Exercise 1K — Working programs on the class portal", bold=True,
-     size=11, color=NAVY, space_before=6)
+    # Self-assessment
+    body(doc, "Self-Assessment  —  circle one:", bold=True, size=11, color=NAVY, space_before=8)
+    bulk_table(doc, [[Cell(label, 11, col, bold=True, fill=LGRAY) for label, col in [
+        ("🟢 GREEN — I've got this!", GREEN),
+        ("🟡 YELLOW — Nearly there…", RGBColor(0xC8, 0x96, 0x00)),
+        ("🔴 RED — Need more practice", RED),
+    ]]])
+
+    doc.add_paragraph()
+    body(doc, "📚  Homework: Exercise 1K — Working programs on the class portal", bold=True,
+         size=11, color=NAVY, space_before=6)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BUILD
+# ══════════════════════════════════════════════════════════════════════════════
+LEVELS = ("foundation", "standard", "advanced")
+
+def worksheet_questions(level):
+    """Printed practice questions for one level, in bank order."""
+    return load_bank().select(set="practice", level=level, has="text")
+
+def copy_questions(seed=None):
+    """(foundation, standard, advanced) questions for one copy of the worksheet.
+
+    With a seed, the questions inside each practice PART are shuffled (and so
+    renumbered) and the templated foundation questions get fresh numbers; the
+    same seed always gives the same copy.
+    """
+    foundation, standard, advanced = (worksheet_questions(level) for level in LEVELS)
+    if seed is not None:
+        from problem_generator import vary     # NumPy is only needed for varied copies
+        rng = random.Random(seed)
+        for qs in (foundation, standard, advanced):
+            rng.shuffle(qs)
+        foundation = vary(foundation, seed)
+    return tuple(foundation), tuple(standard), tuple(advanced)
+
+def numbered_questions(seed=None, levels=LEVELS):
+    """(number, question) pairs as printed on one copy, for the chosen levels.
+
+    Numbers do not shift when a level is left out, so Q6 is the same question
+    on every copy made from the same seed.
+    """
+    out, first = [], 1
+    for level, questions in zip(LEVELS, copy_questions(seed)):
+        if level in levels:
+            out += enumerate(questions, first)
+        first += len(questions)
+    return out
+
+def worksheet_sections(student=None, class_name=None, seed=None, levels=LEVELS):
+    """The (PART function, args) list for one copy of the worksheet.
+
+    `levels` picks the practice PARTs to print (the difficulty mix).
+    """
+    foundation, standard, advanced = copy_questions(seed)
+    bank = load_bank()
+    practice = [
+        ("foundation", (part_foundation, (foundation,))),
+        ("standard",   (part_standard,   (standard,))),
+        ("advanced",   (part_advanced,   (advanced,))),
+    ]
+    return [
+        (worksheet_header,      (student, class_name)),
+        (part_warm_up,          (bank.get("warmup"),)),
+        (part_method_reference, (steps_ref,)),
+        (part_guided_examples,  (bank.get("exA"), bank.get("exB"))),
+        *(part for level, part in practice if level in levels),
+        (part_exit_ticket,      (bank.get("exit"),)),
+    ]
+
+# Any change to the shared helpers or palette invalidates every cached PART
+HELPER_SALT = source_salt(
+    _shd, _tc_borders, _rpr, style_run,
+    set_cell_bg, set_cell_borders, _rpr_xml, _run_xml, _cell_xml, bulk_table,
+    heading, body, blank_lines, answer_box, section_banner, step_scaffold_table,
+    num, money, term, check, equations, key_values, parse_equation, parse_side,
+    NAVY, TEAL, GOLD, WHITE, LGRAY, DGRAY, GREEN, ORANGE, PURPLE, RED,
+    docx.__version__,
+)
+
+# Wrapped to count calls and time them under --profile
+PROFILED_HELPERS = (
+    "style_run", "set_cell_bg", "set_cell_borders", "bulk_table", "heading", "body",
+    "blank_lines", "answer_box", "section_banner", "step_scaffold_table",
+)
+
+def worksheet_cache():
+    return SectionCache("worksheet", HELPER_SALT, parse_xml)
+
+def render_section(doc, cache, fn, args):
+    """Render one PART, splicing it from the cache when its inputs are unchanged."""
+    if cache is None:
+        fn(doc, *args)
+        return
+    body_el = doc.element.body
+    key = cache.key(fn, args)
+    cached = cache.fragment(key)
+    if cached is not None:
+        for el in cached:
+            body_el.sectPr.addprevious(el)
+        return
+    start = len(body_el) - 1            # new content goes in before w:sectPr
+    fn(doc, *args)
+    cache.store(key, body_el[start:len(body_el) - 1])
+
+def page_setup(doc):
+    # ── Page margins ─────────────────────────────────────────────────────────
+    section = doc.sections[0]
+    section.top_margin    = Cm(1.5)
+    section.bottom_margin = Cm(1.5)
+    section.left_margin   = Cm(2.0)
+    section.right_margin  = Cm(2.0)
+
+def build_worksheet(cache=None, student=None, class_name=None, seed=None, levels=LEVELS):
+    doc = Document()
+    page_setup(doc)
+    for fn, args in worksheet_sections(student, class_name, seed, levels):
+        with PROFILE.span(fn.__name__):
+            render_section(doc, cache, fn, args)
+    return doc
+
+def write_worksheet(out, cache=None, student=None, class_name=None, seed=None, levels=LEVELS):
+    """Build a worksheet and write the .docx to `out`.
+
+    `out` is a path or any writable binary file object: stdout, a socket file,
+    a member opened in another zip, …  It does not need to be seekable.
+    """
+    with PROFILE.span("build"):
+        doc = build_worksheet(cache, student, class_name, seed, levels)
+    with PROFILE.span("save"):
+        reproducible.save(doc, out)
+
+def worksheet_bytes(cache=None, student=None, class_name=None, seed=None, levels=LEVELS):
+    """The .docx package as a memoryview over an in-memory buffer (no temp file, no copy)."""
+    buf = io.BytesIO()
+    write_worksheet(buf, cache, student, class_name, seed, levels)
+    return buf.getbuffer()
+
+# ── Answer key document ───────────────────────────────────────────────────────
+def build_answer_key(class_name=None, seed=None, levels=LEVELS):
+    """A one-page teacher's key for the copy printed with `seed` and `levels`."""
+    doc = Document()
+    page_setup(doc)
+    heading(doc, "Ex 1K – Applications of Simultaneous Equations  |  Answer Key", size=16)
+    body(doc, f"Class: {class_name or '—'}     Variant: {'standard' if seed is None else seed}     "
+              f"Levels: {', '.join(l for l in LEVELS if l in levels)}", size=10, italic=True)
+    doc.add_paragraph()
 
-doc.save("/home/user/mathsteaching/Ex 1K - Applications Worksheet.docx")
-print("Worksheet saved successfully!")
+    rows = [[Cell(label, 10, WHITE, bold=True, fill=NAVY) for label in ("Q", "Question", "Answer")]]
+    for num, q in numbered_questions(seed, levels):
+        exact = ", ".join(q.key)     # varied questions carry their own, checked by vary()
+        answer = q.answer or "Reasoning — mark from working"
+        if exact and exact != answer:
+            answer = f"{answer}   ({exact})"
+        fill = LGRAY if num % 2 else None
+        rows.append([Cell(text, fill=fill) for text in (f"Q{num}", q.title, answer)])
+    bulk_table(doc, rows, widths=(Cm(1.5), Cm(6.0), Cm(9.5)))
+    return doc
+
+def answer_key_bytes(class_name=None, seed=None, levels=LEVELS):
+    buf = io.BytesIO()
+    reproducible.save(build_answer_key(class_name, seed, levels), buf)
+    return buf.getbuffer()
+
+def parse_levels(text):
+    """'Standard, foundation' -> ('foundation', 'standard'): known levels, in print order."""
+    chosen = {part.strip().lower() for part in text.split(",") if part.strip()}
+    unknown = chosen - set(LEVELS)
+    if unknown or not chosen:
+        raise ValueError(f"levels must be a comma-separated subset of {', '.join(LEVELS)}")
+    return tuple(level for level in LEVELS if level in chosen)
+
+# ── Batch mode: one personalised copy per student ─────────────────────────────
+def read_roster(path):
+    """Rows of (name, class) from a CSV roster; a "name" header row is skipped."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [r for r in csv.reader(f) if r and r[0].strip()]
+    if rows and rows[0][0].strip().lower() == "name":
+        rows = rows[1:]
+    return [(r[0].strip(), r[1].strip() if len(r) > 1 else "") for r in rows]
+
+def variant_seed(student, class_name, base_seed=0):
+    # Stable across runs and machines (unlike hash()), so reprints match
+    return zlib.crc32(f"{base_seed}|{class_name}|{student}".encode("utf-8"))
+
+def _safe(text):
+    return "".join(ch if ch.isalnum() or ch in " -_." else "_" for ch in text).strip(" .")
+
+def variant_paths(out_dir, roster):
+    """One .docx path per (name, class) in the roster, all distinct.
+
+    The class goes in the name, so namesakes in two classes do not collide; a
+    name that still clashes (a repeated row, or two that sanitise alike, even
+    on a case-insensitive filesystem) gets a " (2)", " (3)", … suffix.
+    """
+    stem = os.path.splitext(os.path.basename(OUTPUT))[0]
+    paths, taken = [], set()
+    for student, class_name in roster:
+        label = _safe(student) or "student"
+        if _safe(class_name):
+            label += f" ({_safe(class_name)})"
+        name, n = f"{stem} - {label}.docx", 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{stem} - {label} ({n}).docx"
+        taken.add(name.lower())
+        paths.append(os.path.join(out_dir, name))
+    return paths
+
+_worker_cache = None
+_worker_doc = None
+
+def _init_worker(use_cache):
+    # Runs once per pool process: map the compiled question bank and set up the
+    # fragment cache, so each copy only does the rendering itself.
+    global _worker_cache
+    load_bank()
+    _worker_cache = worksheet_cache() if use_cache else None
+
+def answer_rows(student, class_name, seed, levels=LEVELS):
+    return [(student, class_name, num, q.id, q.answer)
+            for num, q in numbered_questions(seed, levels) if q.answer]
+
+def write_answer_key(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "class", "question", "id", "answer"])
+        writer.writerows(rows)
+
+def _render_variant(job):
+    student, class_name, seed, levels, path = job
+    reproducible.save(build_worksheet(_worker_cache, student, class_name, seed, levels), path)
+    return path, answer_rows(student, class_name, seed, levels)
+
+def _render_copy(job):
+    # One pack copy as body XML; the worker's document is emptied and reused
+    global _worker_doc
+    student, class_name, seed, levels = job
+    if _worker_doc is None:
+        _worker_doc = Document()
+        page_setup(_worker_doc)     # table widths follow the margins
+    body = _worker_doc.element.body
+    for el in list(body):
+        if el is not body.sectPr:
+            body.remove(el)
+    for fn, args in worksheet_sections(student, class_name, seed, levels):
+        with PROFILE.span(fn.__name__):
+            render_section(_worker_doc, _worker_cache, fn, args)
+    xml, images = body_fragment(_worker_doc)
+    return xml, images, answer_rows(student, class_name, seed, levels)
+
+def build_batch(roster, out_dir, jobs=None, base_seed=0, use_cache=True, levels=LEVELS):
+    """Render one worksheet per (name, class) across a process pool.
+
+    Copies have different numbers, so an answer-key CSV covering every student
+    is written alongside them.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    load_bank()    # compile the index once, before any worker needs it
+    work = [(name, cls, variant_seed(name, cls, base_seed), levels, path)
+            for (name, cls), path in zip(roster, variant_paths(out_dir, roster))]
+    jobs = jobs or os.cpu_count() or 1
+    chunk = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(use_cache,)) as pool:
+        results = list(pool.map(_render_variant, work, chunksize=chunk))
+    write_answer_key(os.path.join(out_dir, "answer_key.csv"),
+                     [row for _, rows in results for row in rows])
+    return [path for path, _ in results]
+
+def build_pack(roster, path, jobs=None, base_seed=0, use_cache=True, levels=LEVELS):
+    """Write every student's copy into one printable .docx, a page break apart.
+
+    Copies are rendered across a process pool and come back as body XML, which
+    is streamed straight into the one package in roster order, so the pack has
+    a single set of styles, numbering and settings, each distinct image once,
+    and memory stays flat however long the roster is.  With jobs=1 everything
+    runs in this process.  The answer key goes next to the pack.
+    """
+    load_bank()
+    work = [(name, cls, variant_seed(name, cls, base_seed), levels) for name, cls in roster]
+    jobs = min(jobs or os.cpu_count() or 1, max(1, len(work)))
+    rows = []
+    with contextlib.ExitStack() as stack:
+        if jobs == 1:
+            _init_worker(use_cache)
+            copies = map(_render_copy, work)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(
+                max_workers=jobs, initializer=_init_worker, initargs=(use_cache,)))
+            copies = pool.map(_render_copy, work, chunksize=max(1, min(16, len(work) // (jobs * 4))))
+        doc = stack.enter_context(StreamingDocument(path))
+        page_setup(doc)
+        for i, (xml, images, copy_rows) in enumerate(copies):
+            if i:
+                doc.page_break()
+            with PROFILE.span("write"):
+                doc.write_fragment(xml, images)
+            rows += copy_rows
+        with PROFILE.span("save"):
+            doc.close()
+    write_answer_key(os.path.splitext(path)[0] + " - answer key.csv", rows)
+    return _worker_cache if jobs == 1 else None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-o", "--output", default=OUTPUT,
+                    help="where to save the worksheet; - writes it to stdout")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="render every PART from scratch")
+    ap.add_argument("--roster", metavar="CSV",
+                    help="batch mode: one varied copy per student (columns: name, class)")
+    ap.add_argument("--out-dir", default=os.path.dirname(OUTPUT),
+                    help="where batch-mode copies are written")
+    ap.add_argument("--pack", metavar="DOCX",
+                    help="with --roster, stream every copy into this one printable file")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="worker processes for batch and pack mode (default: one per core)")
+    ap.add_argument("--seed", type=int, default=0,
+                    help="base seed for question order in batch mode")
+    ap.add_argument("--levels", default=",".join(LEVELS),
+                    help="practice PARTs to print, e.g. foundation,standard (default: all)")
+    ap.add_argument("--answer-key", nargs="?", const=ANSWER_KEY, metavar="DOCX",
+                    help=f"also save the teacher's answer key (default: {os.path.basename(ANSWER_KEY)})")
+    build_profile.add_arguments(ap)
+    args = ap.parse_args(argv)
+    try:
+        args.levels = parse_levels(args.levels)
+    except ValueError as e:
+        ap.error(str(e))
+    build_profile.configure(args, globals(), PROFILED_HELPERS)
+    # Batch and pack mode return early; the report and unwrapping must still happen
+    try:
+        with PROFILE.span("verify"):
+            verify()
+        if args.roster and args.pack:
+            with PROFILE.span("build"):
+                cache = build_pack(read_roster(args.roster), args.pack, args.jobs, args.seed,
+                                   not args.no_cache, args.levels)
+            if cache is not None:
+                print(cache.summary())
+            print(f"Class pack saved to {args.pack}")
+            return
+        if args.roster:
+            with PROFILE.span("build"):
+                paths = build_batch(read_roster(args.roster), args.out_dir, args.jobs,
+                                    args.seed, not args.no_cache, args.levels)
+            print(f"{len(paths)} worksheets saved to {args.out_dir}")
+            return
+
+        cache = None if args.no_cache else worksheet_cache()
+        # With -o - the package goes to stdout, so progress notes go to stderr
+        to_stdout = args.output == "-"
+        write_worksheet(sys.stdout.buffer if to_stdout else args.output, cache, levels=args.levels)
+        log = sys.stderr if to_stdout else sys.stdout
+        if cache is not None:
+            print(cache.summary(), file=log)
+        print("Worksheet saved successfully!", file=log)
+        if args.answer_key:
+            with PROFILE.span("answer key"):
+                reproducible.save(build_answer_key(levels=args.levels), args.answer_key)
+            print(f"Answer key saved to {args.answer_key}", file=log)
+    finally:
+        build_profile.finish(args)
+
+if __name__ == "__main__":
+    main()
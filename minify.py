@@ -0,0 +1,160 @@
+"""
+Small, conservative minifiers for the generated web page.
+
+They only remove what can never change behaviour: comments, indentation,
+blank lines and the spaces around punctuation that cannot join two tokens.
+JavaScript keeps its line breaks, so automatic semicolon insertion works
+exactly as in the source, and string, template and regex literals are
+copied through untouched.
+"""
+import re
+
+# ── CSS ───────────────────────────────────────────────────────────────────────
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+_CSS_PUNCT = re.compile(r"\s*([{};,>])\s*")
+
+def minify_css(css):
+    strings = []
+
+    def keep(m):
+        if m.group(1) is None:
+            return " "                          # a comment
+        strings.append(m.group(1))
+        return f"\0{len(strings) - 1}\0"
+
+    code = re.sub(r"\s+", " ", _CSS_TOKENS.sub(keep, css))
+    code = _CSS_PUNCT.sub(r"\1", code).replace(": ", ":").replace(";}", "}")
+    return re.sub(r"\0(\d+)\0", lambda m: strings[int(m.group(1))], code).strip()
+
+
+# ── JavaScript ────────────────────────────────────────────────────────────────
+# After one of these a "/" starts a regex literal, not a division
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^") | {""}
+_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+                   "throw", "case", "do", "else", "yield", "await"}
+_JS_PUNCT = re.compile(r"[ \t]*([{}()\[\];,=:])[ \t]*")
+
+def _js_code(code):
+    lines = (re.sub(r"[ \t]+", " ", line).strip() for line in code.split("\n"))
+    return "\n".join(_JS_PUNCT.sub(r"\1", line) for line in lines if line)
+
+def _scan_string(src, i, quote):
+    j = i + 1
+    while src[j] != quote:
+        j += 2 if src[j] == "\\" else 1
+    return j + 1
+
+def _scan_regex(src, i):
+    j, in_class = i + 1, False
+    while True:
+        ch = src[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            break
+        j += 1
+    j += 1
+    while j < len(src) and (src[j].isalnum() or src[j] == "_"):
+        j += 1                                  # flags
+    return j
+
+def _scan_template(src, i):
+    j = i + 1
+    while src[j] != "`":
+        if src[j] == "\\":
+            j += 2
+        elif src.startswith("${", j):
+            j = _scan_expression(src, j + 2) + 1
+        else:
+            j += 1
+    return j + 1
+
+def _scan_expression(src, i):
+    # Index of the "}" closing a template's ${ ... }
+    depth = 0
+    while True:
+        ch = src[i]
+        if ch in "'\"":
+            i = _scan_string(src, i, ch)
+            continue
+        if ch == "`":
+            i = _scan_template(src, i)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            if depth == 0:
+                return i
+            depth -= 1
+        i += 1
+
+def _regex_allowed(code):
+    code = code.rstrip()
+    word = re.search(r"[A-Za-z_$][\w$]*$", code)
+    if word:
+        return word.group(0) in _REGEX_KEYWORDS
+    return (code[-1:] if code else "") in _REGEX_AFTER
+
+def minify_js(js):
+    # String, template and regex literals are set aside as placeholders, so the
+    # whitespace rules below only ever see code.
+    literals, code, i = [], [], 0
+    while i < len(js):
+        ch, nxt = js[i], js[i + 1:i + 2]
+        if ch == "/" and nxt == "/":
+            j = js.find("\n", i)
+            i = len(js) if j < 0 else j
+            continue
+        if ch == "/" and nxt == "*":
+            j = js.index("*/", i + 2) + 2
+            code.append("\n" if "\n" in js[i:j] else " ")
+            i = j
+            continue
+        if ch in "'\"":
+            j = _scan_string(js, i, ch)
+        elif ch == "`":
+            j = _scan_template(js, i)
+        elif ch == "/" and _regex_allowed("".join(code[-40:])):
+            j = _scan_regex(js, i)
+        else:
+            code.append(ch)
+            i += 1
+            continue
+        literals.append(js[i:j])
+        code.append(f"\0{len(literals) - 1}\0")
+        i = j
+    return re.sub(r"\0(\d+)\0", lambda m: literals[int(m.group(1))], _js_code("".join(code)))
+
+
+# ── HTML ──────────────────────────────────────────────────────────────────────
+_BLOCKS = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2>)", re.S | re.I)
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+
+def _html_text(text):
+    text = _COMMENT.sub("", text)
+    return "\n".join(line.strip() for line in text.split("\n") if line.strip())
+
+def minify_html(html):
+    """The page with inline CSS/JS minified, comments and indentation removed.
+
+    <pre> and <textarea> contents, and scripts that are not JavaScript, are
+    kept as they are.
+    """
+    out, pos = [], 0
+    for m in _BLOCKS.finditer(html):
+        out.append(_html_text(html[pos:m.start()]))
+        open_tag, tag, content, close_tag = m.groups()
+        tag = tag.lower()
+        if tag == "style":
+            content = minify_css(content)
+        elif tag == "script" and not re.search(r"\btype=[\"']?(?!text/javascript|module)", open_tag):
+            content = minify_js(content)
+        out.append(open_tag + content + close_tag)
+        pos = m.end()
+    out.append(_html_text(html[pos:]))
+    return "\n".join(part for part in out if part) + "\n"
@@ -0,0 +1,310 @@
+"""
+Bulk PDF export of the generated worksheets, decks and answer keys.
+
+    python pdf_export.py                       # everything in the output folder
+    python pdf_export.py packs/ "Ex 1K - Applications Worksheet.docx" --workers 4
+    python pdf_export.py --force --timeout 180 --retries 2
+
+Each argument is a .docx/.pptx file or a folder of them; with none, the
+folder make_worksheet.py and make_pptx.py write to is used.  PDFs go next to
+their sources (or to --out-dir) and any that are already newer than their
+source are skipped unless --force is given.  Two sources that would make the
+same PDF (x.docx and x.pptx, or same-named files from two folders going to one
+--out-dir) are an error rather than one silently replacing the other.
+
+Conversions are spread over a small pool of LibreOffice workers.  When
+LibreOffice's Python bridge (the `uno` module) is importable, each worker
+keeps one headless office running and converts file after file over a pipe,
+so the seconds of office start-up are paid once per worker, not once per
+file.  Without it, every file is a `soffice --convert-to pdf` run; those still
+go in parallel, and each worker keeps its own pre-initialised profile under
+.build_cache/soffice so no run repeats LibreOffice's first-start set-up.
+
+A conversion that takes longer than --timeout is killed (the office with it,
+which is restarted) and, like any failure, retried up to --retries times.
+"""
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+try:
+    import uno
+except ImportError:
+    uno = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROFILES = os.path.join(HERE, ".build_cache", "soffice")
+
+FILTERS = {".docx": "writer_pdf_Export", ".pptx": "impress_pdf_Export"}
+
+Job = namedtuple("Job", "source target")
+Result = namedtuple("Result", "job ok attempts seconds error")
+
+
+class ConversionError(Exception):
+    pass
+
+
+def find_soffice():
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in ("/Applications/LibreOffice.app/Contents/MacOS/soffice",
+                 r"C:\Program Files\LibreOffice\program\soffice.exe"):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# ── Converters (one per worker thread) ────────────────────────────────────────
+class CliConverter:
+    """One `soffice --convert-to` run per file, against this worker's own profile."""
+
+    def __init__(self, soffice, slot, timeout):
+        self.soffice = soffice
+        self.timeout = timeout
+        profile = os.path.join(PROFILES, f"worker-{slot}")
+        self.fresh = not os.path.isdir(profile)
+        os.makedirs(profile, exist_ok=True)
+        self.profile_arg = f"-env:UserInstallation={Path(profile).as_uri()}"
+
+    def command(self, *args):
+        return [self.soffice, self.profile_arg, "--headless", "--invisible", "--nologo",
+                "--norestore", "--nodefault", *args]
+
+    def start(self):
+        if self.fresh:      # first-start set-up happens here, not inside a timed job
+            subprocess.run(self.command("--terminate_after_init"), timeout=self.timeout,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.fresh = False
+
+    def convert(self, job):
+        with tempfile.TemporaryDirectory(prefix="pdf-export-") as tmp:
+            try:
+                proc = subprocess.run(self.command("--convert-to", "pdf", "--outdir", tmp, job.source),
+                                      timeout=self.timeout, capture_output=True, text=True)
+            except subprocess.TimeoutExpired:
+                raise ConversionError(f"timed out after {self.timeout:g}s") from None
+            produced = os.path.join(tmp, Path(job.source).stem + ".pdf")
+            if proc.returncode or not os.path.exists(produced):
+                raise ConversionError((proc.stderr or proc.stdout).strip() or
+                                      f"soffice exited with status {proc.returncode}")
+            os.replace(produced, job.target)
+
+    def close(self):
+        pass
+
+
+class UnoConverter(CliConverter):
+    """A long-lived headless office, driven over a UNO pipe."""
+
+    def __init__(self, soffice, slot, timeout):
+        super().__init__(soffice, slot, timeout)
+        self.pipe = f"pdf_export_{os.getpid()}_{slot}"
+        self.proc = None
+        self.desktop = None
+
+    def start(self):
+        if self.proc is not None and self.proc.poll() is None:
+            return
+        self.proc = subprocess.Popen(
+            self.command(f"--accept=pipe,name={self.pipe};urp;StarOffice.ComponentContext"),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:pipe,name={self.pipe};urp;StarOffice.ComponentContext")
+                break
+            except Exception:       # NoConnectException until the office is listening
+                if self.proc.poll() is not None or time.monotonic() > deadline:
+                    self.kill()
+                    raise ConversionError("LibreOffice did not start") from None
+                time.sleep(0.2)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+    def kill(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = self.desktop = None
+
+    def convert(self, job):
+        from com.sun.star.beans import PropertyValue
+        props = lambda **kw: tuple(PropertyValue(Name=k, Value=v) for k, v in kw.items())
+        self.start()
+        proc = self.proc
+        watchdog = threading.Timer(self.timeout, proc.kill)
+        watchdog.start()
+        tmp = job.target + ".part"
+        try:
+            doc = self.desktop.loadComponentFromURL(uno.systemPathToFileUrl(job.source), "_blank", 0,
+                                                    props(Hidden=True, ReadOnly=True))
+            if doc is None:
+                raise ConversionError("LibreOffice could not open the file")
+            try:
+                doc.storeToURL(uno.systemPathToFileUrl(tmp),
+                               props(FilterName=FILTERS[Path(job.source).suffix.lower()]))
+            finally:
+                doc.close(True)
+            os.replace(tmp, job.target)
+        except ConversionError:
+            raise
+        except Exception as e:
+            if proc.poll() is not None:      # killed by the watchdog, or crashed
+                self.kill()
+                raise ConversionError(f"timed out after {self.timeout:g}s" if not watchdog.is_alive()
+                                      else "LibreOffice exited") from None
+            raise ConversionError(repr(e)) from None
+        finally:
+            watchdog.cancel()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def close(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+                self.proc.wait(timeout=10)
+            except Exception:
+                pass
+        self.kill()
+
+
+# ── Queue ─────────────────────────────────────────────────────────────────────
+def collect(paths, out_dir=None, force=False):
+    """(jobs to run, number skipped as up to date) for the given files and folders."""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            sources += sorted(os.path.join(path, n) for n in os.listdir(path)
+                              if Path(n).suffix.lower() in FILTERS and not n.startswith("~$"))
+        elif Path(path).suffix.lower() in FILTERS:
+            sources.append(path)
+        else:
+            raise ValueError(f"not a .docx/.pptx file or a folder: {path}")
+    jobs, skipped, claimed = [], 0, {}
+    for source in dict.fromkeys(os.path.abspath(s) for s in sources):
+        target = os.path.join(out_dir or os.path.dirname(source), Path(source).stem + ".pdf")
+        other = claimed.setdefault(os.path.normcase(os.path.abspath(target)), source)
+        if other != source:
+            raise ValueError(f"{source} and {other} would both be written to {target}")
+        if (not force and os.path.exists(target)
+                and os.path.getmtime(target) >= os.path.getmtime(source)):
+            skipped += 1
+            continue
+        jobs.append(Job(source, target))
+    return jobs, skipped
+
+def export(jobs, soffice, workers=2, timeout=120.0, retries=1, warm=True, log=None):
+    """Convert every job across `workers` converters; returns a Result per job."""
+    converter = UnoConverter if warm and uno is not None else CliConverter
+    todo = queue.Queue()
+    for job in jobs:
+        todo.put((job, 1, 0.0))
+    results = []
+    lock = threading.Lock()
+
+    def work(slot):
+        conv = converter(soffice, slot, timeout)
+        try:
+            while True:
+                item = todo.get()
+                if item is None:
+                    return
+                job, attempt, spent = item
+                t0 = time.perf_counter()
+                try:
+                    conv.start()
+                    conv.convert(job)
+                    error = None
+                except (ConversionError, OSError, subprocess.SubprocessError) as e:
+                    error = str(e) or type(e).__name__
+                spent += time.perf_counter() - t0
+                if error and attempt <= retries:
+                    if log:
+                        log(f"  retrying {os.path.basename(job.source)} ({error})")
+                    todo.put((job, attempt + 1, spent))
+                else:
+                    with lock:
+                        results.append(Result(job, error is None, attempt, spent, error))
+                        if log:
+                            state = "ok" if error is None else f"FAILED: {error}"
+                            log(f"[{len(results)}/{len(jobs)}] {os.path.basename(job.target)} "
+                                f"{spent:.1f}s {state}")
+                todo.task_done()
+        finally:
+            conv.close()
+
+    threads = [threading.Thread(target=work, args=(slot,), daemon=True)
+               for slot in range(max(1, min(workers, len(jobs))))]
+    for t in threads:
+        t.start()
+    todo.join()
+    for _ in threads:
+        todo.put(None)
+    for t in threads:
+        t.join()
+    return sorted(results, key=lambda r: r.job.source)
+
+
+def default_sources():
+    from make_pptx import OUTPUT as DECK
+    from make_worksheet import OUTPUT as WORKSHEET
+    return sorted({os.path.dirname(WORKSHEET), os.path.dirname(DECK)})
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("paths", nargs="*",
+                    help=".docx/.pptx files or folders (default: the generators' output folder)")
+    ap.add_argument("--out-dir", help="write PDFs here instead of next to their sources")
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                    help="concurrent LibreOffice workers (default: up to 4)")
+    ap.add_argument("--timeout", type=float, default=120, help="seconds allowed per file")
+    ap.add_argument("--retries", type=int, default=1, help="extra attempts for a failed file")
+    ap.add_argument("--force", action="store_true", help="convert files whose PDF is up to date")
+    ap.add_argument("--cold", action="store_true",
+                    help="one soffice run per file even when the uno bridge is available")
+    ap.add_argument("--soffice", default=None, help="path to the soffice executable")
+    args = ap.parse_args(argv)
+
+    soffice = args.soffice or find_soffice()
+    if not soffice:
+        sys.exit("LibreOffice (soffice) not found; install it or pass --soffice")
+    try:
+        jobs, skipped = collect(args.paths or default_sources(), args.out_dir, args.force)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    if not jobs:
+        print(f"Nothing to export ({skipped} PDF(s) up to date)")
+        return 0
+
+    warm = not args.cold and uno is not None
+    print(f"Exporting {len(jobs)} file(s) with {min(args.workers, len(jobs))} "
+          f"{'warm' if warm else 'per-file'} worker(s)"
+          + (f", {skipped} up to date" if skipped else ""), file=sys.stderr)
+    t0 = time.perf_counter()
+    results = export(jobs, soffice, args.workers, args.timeout, args.retries, warm,
+                     log=lambda line: print(line, file=sys.stderr))
+    failed = [r for r in results if not r.ok]
+    print(f"{len(results) - len(failed)} PDF(s) written in {time.perf_counter() - t0:.1f}s"
+          + (f", {len(failed)} failed" if failed else ""))
+    for r in failed:
+        print(f"  {r.job.source}: {r.error}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Post-build size pass for .pptx packages.
+
+    python pptx_optimize.py deck.pptx [-o smaller.pptx] [--downsample [DPI]]
+    python make_pptx.py --optimize [--downsample [DPI]]
+
+Three things, all safe to run on any deck, generated or not:
+
+  1. Media parts are hashed; identical images collapse into one shared part
+     and every relationship that pointed at a duplicate is retargeted.
+  2. With --downsample, pictures stored at far more pixels than they are
+     shown at are resized to the largest size they appear on any slide at
+     the given DPI (default 150), and PNGs are re-encoded losslessly.  An
+     image is only replaced when the result is smaller.
+  3. The zip is rewritten with XML deflated at maximum compression and
+     already-compressed media stored as is (unless deflating still pays),
+     in reproducible order and with fixed metadata (see reproducible.py).
+"""
+import argparse
+import hashlib
+import io
+import os
+import posixpath
+import sys
+import zipfile
+import zlib
+from collections import namedtuple
+
+from lxml import etree
+from PIL import Image
+
+from reproducible import CONTENT_TYPES, natural, read_parts, write_package
+
+EMU_PER_INCH = 914400
+DEFAULT_DPI = 150
+
+# Already compressed formats: usually stored, since deflating them again saves
+# nothing (small files with large headers are the exception, so it is measured)
+STORED = (".png", ".jpg", ".jpeg", ".gif", ".mp3", ".mp4", ".m4a", ".wdp", ".zip")
+
+NS = {
+    "a":  "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p":  "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r":  "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "pr": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+}
+
+Report = namedtuple("Report", "size_before size_after duplicates downsampled recompressed")
+
+
+def source_of(rels):
+    # ppt/slides/_rels/slide1.xml.rels -> ppt/slides/slide1.xml
+    folder, name = posixpath.split(rels)
+    return posixpath.join(posixpath.dirname(folder), name[:-len(".rels")])
+
+def resolve(rels, target):
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_of(rels)), target))
+
+
+# ── 1. Duplicate media ────────────────────────────────────────────────────────
+def dedupe_media(parts):
+    """Collapse identical media parts into one; returns how many were dropped."""
+    first, duplicate = {}, {}
+    for name in sorted(parts, key=natural):
+        if name.startswith("ppt/media/"):
+            digest = hashlib.sha256(parts[name]).digest()
+            if digest in first:
+                duplicate[name] = first[digest]
+            else:
+                first[digest] = name
+    if not duplicate:
+        return 0
+
+    for rels in [n for n in parts if n.endswith(".rels")]:
+        tree = etree.fromstring(parts[rels])
+        changed = False
+        for rel in tree.iterfind("pr:Relationship", NS):
+            if rel.get("TargetMode") == "External":
+                continue
+            target = resolve(rels, rel.get("Target"))
+            if target in duplicate:
+                rel.set("Target", posixpath.relpath(duplicate[target],
+                                                    posixpath.dirname(source_of(rels))))
+                changed = True
+        if changed:
+            parts[rels] = etree.tostring(tree, xml_declaration=True, encoding="UTF-8",
+                                         standalone=True)
+    for name in duplicate:
+        del parts[name]
+    _drop_overrides(parts, duplicate)
+    return len(duplicate)
+
+def _drop_overrides(parts, names):
+    tree = etree.fromstring(parts[CONTENT_TYPES])
+    for el in tree.findall("ct:Override", NS):
+        if el.get("PartName").lstrip("/") in names:
+            tree.remove(el)
+    parts[CONTENT_TYPES] = etree.tostring(tree, xml_declaration=True, encoding="UTF-8",
+                                          standalone=True)
+
+
+# ── 2. Downsampling ───────────────────────────────────────────────────────────
+def display_sizes(parts):
+    """media part -> largest (cx, cy) in EMU it is shown at, scaled up for any cropping.
+
+    Images that are also used somewhere without a known size (backgrounds,
+    fills) are left out, so they are never downsampled.
+    """
+    sizes, unsized = {}, set()
+    for rels in [n for n in parts if n.endswith(".xml.rels")]:
+        part = source_of(rels)
+        if part not in parts or not part.startswith("ppt/"):
+            continue
+        targets = {rel.get("Id"): resolve(rels, rel.get("Target"))
+                   for rel in etree.fromstring(parts[rels]).iterfind("pr:Relationship", NS)
+                   if rel.get("TargetMode") != "External"}
+        tree = etree.fromstring(parts[part])
+        for blip in tree.iterfind(".//a:blip", NS):
+            media = targets.get(blip.get(f"{{{NS['r']}}}embed"))
+            if media is None:
+                continue
+            pic = blip.getparent().getparent()
+            ext = pic.find("p:spPr/a:xfrm/a:ext", NS) if pic.tag == f"{{{NS['p']}}}pic" else None
+            if ext is None:
+                unsized.add(media)
+                continue
+            cx, cy = int(ext.get("cx")), int(ext.get("cy"))
+            crop = blip.getparent().find("a:srcRect", NS)
+            if crop is not None:
+                keep_x = 1 - (int(crop.get("l", 0)) + int(crop.get("r", 0))) / 100000
+                keep_y = 1 - (int(crop.get("t", 0)) + int(crop.get("b", 0))) / 100000
+                cx, cy = cx / max(keep_x, 0.01), cy / max(keep_y, 0.01)
+            old = sizes.get(media, (0, 0))
+            sizes[media] = (max(old[0], cx), max(old[1], cy))
+    return {m: s for m, s in sizes.items() if m not in unsized}
+
+def downsample_media(parts, dpi=DEFAULT_DPI):
+    """Resize oversized pictures and re-encode PNGs; returns (downsampled, recompressed)."""
+    downsampled = recompressed = 0
+    for media, (cx, cy) in display_sizes(parts).items():
+        ext = posixpath.splitext(media)[1].lower()
+        if ext not in (".png", ".jpg", ".jpeg"):
+            continue
+        data = parts[media]
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            fmt = img.format
+            want = (max(1, round(cx / EMU_PER_INCH * dpi)), max(1, round(cy / EMU_PER_INCH * dpi)))
+            scale = max(want[0] / img.width, want[1] / img.height)
+            resized = scale < 0.9
+            if resized:
+                img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                                 Image.LANCZOS)
+            elif fmt != "PNG":
+                continue            # re-saving a JPEG at its own size only loses quality
+            out = io.BytesIO()
+            if fmt == "PNG":
+                img.save(out, "PNG", optimize=True)
+            else:
+                img.save(out, "JPEG", quality=85, optimize=True, progressive=True)
+        if len(out.getvalue()) < len(data):
+            parts[media] = out.getvalue()
+            if resized:
+                downsampled += 1
+            else:
+                recompressed += 1
+    return downsampled, recompressed
+
+
+# ── 3. Repacking ──────────────────────────────────────────────────────────────
+def _deflate_pays(data):
+    packer = zlib.compressobj(9, zlib.DEFLATED, -15)
+    return len(packer.compress(data) + packer.flush()) < len(data) * 0.95
+
+def _compression(name, data):
+    if name.lower().endswith(STORED) and not _deflate_pays(data):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def repack(parts):
+    buf = io.BytesIO()
+    write_package(parts, buf, _compression, compresslevel=9)
+    return buf.getvalue()
+
+
+def optimize_package(data, dpi=None):
+    """(optimised .pptx bytes, Report) for the package in `data`; dpi=None skips downsampling."""
+    parts = read_parts(data)
+    duplicates = dedupe_media(parts)
+    downsampled, recompressed = downsample_media(parts, dpi) if dpi else (0, 0)
+    out = repack(parts)
+    return out, Report(len(data), len(out), duplicates, downsampled, recompressed)
+
+def optimize_file(path, out=None, dpi=None):
+    """Optimise the deck at `path`, in place unless `out` is given; returns the Report."""
+    with open(path, "rb") as f:
+        data, report = optimize_package(f.read(), dpi)
+    out = out or path
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out)
+    return report
+
+def describe(report):
+    saved = report.size_before - report.size_after
+    return (f"optimised: {report.size_before / 1024:.1f} KB -> {report.size_after / 1024:.1f} KB "
+            f"({saved / report.size_before:.0%} smaller); {report.duplicates} duplicate image(s) "
+            f"merged, {report.downsampled} downsampled, {report.recompressed} re-encoded")
+
+
+def add_arguments(ap):
+    ap.add_argument("--downsample", nargs="?", type=int, const=DEFAULT_DPI, default=None,
+                    metavar="DPI",
+                    help=f"resize pictures stored above their shown size (default: {DEFAULT_DPI} dpi)")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("deck", help=".pptx package to optimise")
+    ap.add_argument("-o", "--output", help="write here instead of replacing the deck")
+    add_arguments(ap)
+    args = ap.parse_args(argv)
+    print(describe(optimize_file(args.deck, args.output, args.downsample)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
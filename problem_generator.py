@@ -0,0 +1,267 @@
+"""
+Vectorised generator for parameterised simultaneous-equation problems.
+
+Each template in TEMPLATES re-words one of the foundation questions in the
+question bank.  Givens are sampled in bulk as NumPy arrays, turned into an
+integer system
+
+    a1·x + b1·y = c1
+    a2·x + b2·y = c2
+
+and screened all at once with Cramer's rule in exact integer arithmetic: the
+determinant must be non-zero, both unknowns must be positive multiples of
+1/unit (whole numbers, half-dollars, …) and any template-specific condition
+must hold.  Sampling repeats, sized by the observed acceptance rate, until
+enough variants survive.
+
+    >>> v = generate("p1", 100_000, seed=1)     # dict of equal-length arrays
+    >>> render("p1", row(v, 0))                 # bank Question with new numbers
+
+Solutions are stored scaled by the template's unit ("xs", "ys"), so they stay
+exact integers; solution() turns them back into Fractions.
+
+Usage:  python problem_generator.py [count]    (timing run over every template)
+"""
+import sys
+import time
+from collections import namedtuple
+from fractions import Fraction
+
+import numpy as np
+
+from question_bank import load_bank
+
+# sample(rng, n) -> dict of int arrays        the givens
+# system(p)      -> (a1, b1, c1, a2, b2, c2)  integer coefficient arrays
+# valid(p)       -> bool array                template-specific screen (or None)
+# render(p)      -> dict of Question fields   p holds the givens plus x, y; the
+#                   fields include `system` and `key`, in the bank entry's notation
+Template = namedtuple("Template", "qid unit sample system valid render")
+
+
+def money(value):
+    value = Fraction(value)
+    return f"${value.numerator // value.denominator}" if value.denominator == 1 \
+        else f"${float(value):.2f}"
+
+def number(value):
+    value = Fraction(value)
+    return str(value.numerator) if value.denominator == 1 else f"{float(value):g}"
+
+def term(coeff, var):
+    """'3a', 'a' or '0.2x' for one term of a stated system."""
+    return f"{'' if coeff == 1 else number(coeff)}{var}"
+
+def key(**values):
+    """An exact answer key: key(x=Fraction(7, 2)) -> ('x = 7/2',)."""
+    return tuple(f"{var} = {Fraction(value)}" for var, value in values.items())
+
+def bags(n, fruit):
+    return f"{n} bag{'s' if n != 1 else ''} of {fruit}"
+
+
+# ── Q1  Two numbers ───────────────────────────────────────────────────────────
+def _two_numbers_render(p):
+    s, d = p["S"], p["D"]
+    return dict(
+        text=f"The sum of two numbers is {s} and their difference is {d}. Find both numbers.",
+        ask=f"The sum of two numbers is {s} and their difference is {d}. What is the larger number?",
+        hint=(f"Let x = larger, y = smaller. Equation (1): x + y = {s}. "
+              f"Equation (2): x − y = {d}. Add both equations: 2x = {s + d}."),
+        answer=number(p["x"]), accept=(number(p["x"]),),
+        system=(f"x + y = {s}", f"x - y = {d}"), key=key(x=p["x"], y=p["y"]),
+    )
+
+TWO_NUMBERS = Template(
+    "p1", 1,
+    lambda rng, n: dict(S=rng.integers(20, 121, n), D=rng.integers(2, 41, n)),
+    lambda p: (1, 1, p["S"], 1, -1, p["D"]),
+    None,
+    _two_numbers_render,
+)
+
+# ── Q2  Fruit shop ────────────────────────────────────────────────────────────
+def _fruit_shop_render(p):
+    a1, b1, c1, a2, b2, c2 = (p[k] for k in ("a1", "b1", "c1", "a2", "b2", "c2"))
+    a = p["x"]
+    facts = (f"{bags(a1, 'apples')} + {bags(b1, 'oranges')} = ${c1}. "
+             f"{bags(a2, 'apples')} + {bags(b2, 'oranges')} = ${c2}.")
+    def lhs(ca, cr):
+        return f"{term(ca, 'a')} + {term(cr, 'r')}"
+    return dict(
+        text=f"A bag of apples costs $a and a bag of oranges costs $r. {facts} Find the cost of each.",
+        scaffold=(f"(1)  {lhs(a1, b1)} = _______       (2)  {lhs(a2, b2)} = _______",
+                  "Method chosen: ________________________________",
+                  "Working:"),
+        ask=f"{facts} How much is one bag of apples? (answer in dollars, e.g. 3)",
+        hint="Let a = apples, r = oranges. Scale one equation so the a terms match, then subtract.",
+        answer=number(a), accept=(number(a), money(a)),
+        system=(f"{lhs(a1, b1)} = {c1}", f"{lhs(a2, b2)} = {c2}"), key=key(a=a, r=p["y"]),
+    )
+
+FRUIT_SHOP = Template(
+    "p2", 2,                                   # prices in half-dollar steps
+    lambda rng, n: dict(a1=rng.integers(1, 6, n), b1=rng.integers(1, 6, n),
+                        a2=rng.integers(1, 6, n), b2=rng.integers(1, 6, n),
+                        c1=rng.integers(5, 41, n), c2=rng.integers(5, 41, n)),
+    lambda p: (p["a1"], p["b1"], p["c1"], p["a2"], p["b2"], p["c2"]),
+    # the two bags should not cost the same
+    lambda p: (p["a1"] * p["c2"] - p["c1"] * p["a2"]) != (p["c1"] * p["b2"] - p["b1"] * p["c2"]),
+    _fruit_shop_render,
+)
+
+# ── Q3  Perimeter ─────────────────────────────────────────────────────────────
+def _perimeter_render(p):
+    per, d = p["P"], p["D"]
+    return dict(
+        text=(f"A rectangle has perimeter {per} cm. Its length is {d} cm more than its width. "
+              "Find the length and width."),
+        ask=(f"A rectangle has perimeter {per} cm. Its length is {d} cm more than its width. "
+             "What is the length in cm?"),
+        hint=f"l + w = {per // 2} (from perimeter ÷ 2). l − w = {d}. Add to get 2l = {per // 2 + d}.",
+        answer=number(p["x"]), accept=(number(p["x"]),),
+        system=(f"2l + 2w = {per}", f"l - w = {d}"), key=key(l=p["x"], w=p["y"]),
+    )
+
+PERIMETER = Template(
+    "p3", 1,
+    lambda rng, n: dict(P=2 * rng.integers(10, 101, n), D=rng.integers(1, 31, n)),
+    lambda p: (2, 2, p["P"], 1, -1, p["D"]),
+    None,
+    _perimeter_render,
+)
+
+# ── Q4  Mixing solutions ──────────────────────────────────────────────────────
+def _mixing_render(p):
+    lo, hi, mix, vol = p["lo"], p["hi"], p["mix"], p["V"]
+    x = p["x"]
+    return dict(
+        text=(f"A chemist mixes a {lo}% acid solution with a {hi}% acid solution to make {vol} litres "
+              f"of a {mix}% acid solution. How many litres of each solution does he use?"),
+        scaffold=(f"Let x = litres of {lo}% solution,  y = litres of {hi}% solution",
+                  "Total volume:  x + y = _______    … (1)",
+                  f"Acid equation:  {number(Fraction(lo, 100))}x + {number(Fraction(hi, 100))}y = _______    … (2)",
+                  "Working:"),
+        ask=(f"A chemist mixes {lo}% and {hi}% acid solutions to make {vol} L of {mix}% acid. "
+             f"How many litres of the {lo}% solution are needed?"),
+        hint=(f"x + y = {vol} and {number(Fraction(lo, 100))}x + {number(Fraction(hi, 100))}y = "
+              f"{number(Fraction(mix * vol, 100))}. Multiply the first equation by "
+              f"{number(Fraction(lo, 100))}, subtract."),
+        answer=number(x), accept=(number(x),),
+        system=(f"x + y = {vol}", f"{term(Fraction(lo, 100), 'x')} + {term(Fraction(hi, 100), 'y')} = "
+                                  f"{number(Fraction(mix * vol, 100))}"),
+        key=key(x=x, y=p["y"]),
+    )
+
+MIXING = Template(
+    "p4", 2,                                   # volumes in half-litre steps
+    lambda rng, n: dict(lo=5 * rng.integers(1, 10, n), hi=5 * rng.integers(6, 20, n),
+                        mix=5 * rng.integers(2, 19, n), V=rng.integers(4, 41, n)),
+    lambda p: (1, 1, p["V"], p["lo"], p["hi"], p["mix"] * p["V"]),
+    # strictly between the two strengths, and not simply half of each
+    lambda p: (p["lo"] < p["mix"]) & (p["mix"] < p["hi"]) & (2 * p["mix"] != p["lo"] + p["hi"]),
+    _mixing_render,
+)
+
+# ── Q5  Mobile plans ──────────────────────────────────────────────────────────
+# Unknowns are n (texts) and C (cost in cents):  r·n − C = −100·F
+def _mobile_render(p):
+    fa, ra, fb, rb = p["Fa"], p["ra"], p["Fb"], p["rb"]
+    plans = (f"Plan A: ${fa} per month + {money(Fraction(ra, 100))} per text. "
+             f"Plan B: ${fb} per month + {money(Fraction(rb, 100))} per text.")
+    return dict(
+        text=plans + " Find the number of texts for which both plans cost the same.",
+        ask=(f"Plan A: ${fa}/month + {money(Fraction(ra, 100))}/text. "
+             f"Plan B: ${fb}/month + {money(Fraction(rb, 100))}/text. "
+             "For how many texts are plans equal?"),
+        hint=(f"Set equal: {fa} + {number(Fraction(ra, 100))}n = {fb} + {number(Fraction(rb, 100))}n "
+              f"→ {fa - fb} = {number(Fraction(rb - ra, 100))}n."),
+        answer=number(p["x"]), accept=(number(p["x"]),),
+        # C is solved for in cents; the key states it in dollars, as the bank does
+        system=(f"C = {fa} + {term(Fraction(ra, 100), 'n')}", f"C = {fb} + {term(Fraction(rb, 100), 'n')}"),
+        key=key(n=p["x"], C=p["y"] / 100),
+    )
+
+MOBILE_PLANS = Template(
+    "p5", 1,
+    lambda rng, n: dict(Fa=rng.integers(15, 61, n), Fb=rng.integers(5, 40, n),
+                        ra=5 * rng.integers(1, 7, n), rb=5 * rng.integers(3, 11, n)),
+    lambda p: (p["ra"], -1, -100 * p["Fa"], p["rb"], -1, -100 * p["Fb"]),
+    lambda p: (p["Fa"] > p["Fb"]) & (p["ra"] < p["rb"]),
+    _mobile_render,
+)
+
+TEMPLATES = {t.qid: t for t in (TWO_NUMBERS, FRUIT_SHOP, PERIMETER, MIXING, MOBILE_PLANS)}
+
+
+# ── Sampling & screening ──────────────────────────────────────────────────────
+def screen(a1, b1, c1, a2, b2, c2, unit):
+    """Vectorised Cramer's rule: (mask, xs, ys) with solutions scaled by `unit`."""
+    a1, b1, c1, a2, b2, c2 = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64)
+                                                   for v in (a1, b1, c1, a2, b2, c2)))
+    det = a1 * b2 - a2 * b1
+    xn = (c1 * b2 - b1 * c2) * unit
+    yn = (a1 * c2 - c1 * a2) * unit
+    ok = det != 0
+    det = np.where(ok, det, 1)
+    ok &= (xn % det == 0) & (yn % det == 0)
+    xs, ys = xn // det, yn // det
+    ok &= (xs > 0) & (ys > 0)
+    return ok, xs, ys
+
+def generate(qid, n, seed=None):
+    """n screened variants of template `qid` as a dict of column arrays."""
+    t = TEMPLATES[qid]
+    rng = np.random.default_rng(seed)
+    chunks, have, rate = [], 0, 0.5
+    while have < n:
+        size = max(1024, int((n - have) / max(rate, 0.01) * 1.2))
+        p = t.sample(rng, size)
+        ok, xs, ys = screen(*t.system(p), t.unit)
+        if t.valid is not None:
+            ok &= t.valid(p)
+        rate = max(ok.mean(), 1e-3)
+        kept = {k: v[ok] for k, v in p.items()}
+        kept["xs"], kept["ys"] = xs[ok], ys[ok]
+        chunks.append(kept)
+        have += int(ok.sum())
+    return {k: np.concatenate([c[k] for c in chunks])[:n] for k in chunks[0]}
+
+def row(variants, i):
+    """Row i of a variants dict as plain Python ints."""
+    return {k: int(v[i]) for k, v in variants.items()}
+
+def solution(qid, r):
+    unit = TEMPLATES[qid].unit
+    return Fraction(r["xs"], unit), Fraction(r["ys"], unit)
+
+def render(qid, r, bank=None):
+    """The bank question `qid` re-worded with the numbers from row `r`."""
+    bank = bank or load_bank()
+    x, y = solution(qid, r)
+    fields = TEMPLATES[qid].render(dict(r, x=x, y=y))
+    return bank.get(qid)._replace(**fields)
+
+def vary(questions, seed):
+    """Replace every templated question with a fresh variant drawn from `seed`;
+    the variants' systems and keys are checked as the bank's are."""
+    from verify_answers import verify
+    out = []
+    for i, q in enumerate(questions):
+        if q.id in TEMPLATES:
+            q = render(q.id, row(generate(q.id, 1, seed=(seed, i)), 0))
+        out.append(q)
+    verify([q for q in out if q.id in TEMPLATES])
+    return out
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    total = 0.0
+    for qid in TEMPLATES:
+        t0 = time.perf_counter()
+        v = generate(qid, count, seed=0)
+        dt = time.perf_counter() - t0
+        total += dt
+        print(f"{qid}: {len(v['xs']):,} variants in {dt * 1000:.0f} ms")
+    print(f"total: {total * 1000:.0f} ms")
@@ -0,0 +1,165 @@
+"""
+Single question bank shared by make_worksheet.py, make_pptx.py and make_html.py.
+
+Questions are written once in question_bank.json and compiled into a compact
+binary index (question_bank.idx) the first time they are needed.  The index is
+memory-mapped and decoded lazily, so loading it costs a header read however
+large the bank is, and every build worker shares the same pages.
+
+Each question carries:
+
+    id        stable identifier ("p1", "w10", "c2", …)
+    set       "practice", "challenge" or "lesson" (warm-up, worked examples, …)
+    level     "foundation", "standard" or "advanced"
+    xp        points awarded
+    stars     difficulty stars shown beside the title
+    title     short title ("Two Numbers")
+    text      full wording used in print (worksheet / slides)
+    scaffold  list of fill-in lines printed under the question
+    ask       single-answer wording used on the website
+    hint      website scaffold
+    answer    canonical answer
+    accept    list of accepted responses
+    system    the pair of linear equations behind the question ("2p + 3d = 13")
+    key       exact answer key ("p = 16/5"), or "none" / "infinite"
+
+Fields a question does not use are left empty.
+
+Usage:  python question_bank.py [question_bank.json]   (force a recompile)
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BANK_SOURCE = os.path.join(HERE, "question_bank.json")
+
+FIELDS = ("id", "set", "level", "xp", "stars", "title", "text", "scaffold",
+          "ask", "hint", "answer", "accept", "system", "key")
+INT_FIELDS = ("xp",)
+LIST_FIELDS = ("scaffold", "accept", "system", "key")
+
+Question = namedtuple("Question", FIELDS)
+
+# ── Index layout ──────────────────────────────────────────────────────────────
+#   header   magic, record count, offset of the string heap
+#   records  one fixed-size record per question: (offset, length) into the
+#            heap for every text/list field, the integer fields inline
+#   heap     UTF-8 strings; list items are joined with the unit separator
+MAGIC = b"QBK2"     # bump whenever FIELDS changes
+HEADER = struct.Struct("<4sII")
+RECORD = struct.Struct("<" + "".join("I" if f in INT_FIELDS else "II" for f in FIELDS))
+SEP = "\x1f"
+
+
+def compile_bank(source=BANK_SOURCE, index=None):
+    """Compile a JSON bank into its binary index; returns the index path."""
+    index = index or os.path.splitext(source)[0] + ".idx"
+    with open(source, encoding="utf-8") as f:
+        questions = json.load(f)["questions"]
+
+    heap = bytearray()
+    strings = {}            # identical strings share one heap entry
+    records = []
+    for q in questions:
+        row = []
+        for field in FIELDS:
+            value = q.get(field)
+            if field in INT_FIELDS:
+                row.append(int(value or 0))
+                continue
+            if field in LIST_FIELDS:
+                value = SEP.join(value or ())
+            data = (value or "").encode("utf-8")
+            if data not in strings:
+                strings[data] = len(heap)
+                heap += data
+            row += (strings[data], len(data))
+        records.append(RECORD.pack(*row))
+
+    heap_offset = HEADER.size + RECORD.size * len(records)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index)), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records), heap_offset))
+        f.writelines(records)
+        f.write(heap)
+    os.replace(tmp, index)  # atomic, so concurrent workers never see a partial index
+    return index
+
+
+class QuestionBank:
+    """Read-only view over a compiled index."""
+
+    def __init__(self, index):
+        with open(index, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._heap = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{index} is not a compiled question bank")
+        self._ids = None
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        raw = RECORD.unpack_from(self._buf, HEADER.size + i * RECORD.size)
+        values, pos = [], 0
+        for field in FIELDS:
+            if field in INT_FIELDS:
+                values.append(raw[pos])
+                pos += 1
+                continue
+            start = self._heap + raw[pos]
+            text = self._buf[start:start + raw[pos + 1]].decode("utf-8")
+            if field in LIST_FIELDS:
+                text = tuple(text.split(SEP)) if text else ()
+            values.append(text)
+            pos += 2
+        return Question(*values)
+
+    def __iter__(self):
+        return (self[i] for i in range(self._count))
+
+    def get(self, qid):
+        if self._ids is None:
+            self._ids = {q.id: i for i, q in enumerate(self)}
+        return self[self._ids[qid]]
+
+    def select(self, set=None, level=None, has=None):
+        """Questions in bank order, filtered by set, level and a non-empty field."""
+        return [q for q in self
+                if (set is None or q.set == set)
+                and (level is None or q.level == level)
+                and (has is None or getattr(q, has))]
+
+
+_loaded = {}
+
+def load_bank(source=BANK_SOURCE):
+    """The compiled bank for `source`, recompiling the index if it is stale."""
+    index = os.path.splitext(source)[0] + ".idx"
+    try:
+        stale = os.path.getmtime(index) < os.path.getmtime(source)
+    except OSError:
+        stale = True
+    if stale:
+        compile_bank(source, index)
+        _loaded.pop(index, None)
+    if index not in _loaded:
+        try:
+            _loaded[index] = QuestionBank(index)
+        except ValueError:          # written by an older layout
+            _loaded[index] = QuestionBank(compile_bank(source, index))
+    return _loaded[index]
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else BANK_SOURCE
+    idx = compile_bank(src)
+    print(f"{len(QuestionBank(idx))} questions compiled to {idx}")
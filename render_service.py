@@ -0,0 +1,402 @@
+"""
+Local on-demand render service for the Ex 1K worksheet, deck and answer key.
+
+    python render_service.py [--port 8750] [--workers N] [--cache-mb 64]
+
+    GET /worksheet?class=10B&levels=foundation,standard&seed=3    -> .docx
+    GET /answer-key?class=10B&levels=foundation,standard&seed=3   -> .docx
+    GET /deck                                                     -> .pptx
+    GET /metrics                                                  -> JSON
+    POST /xp  {"class", "name", "amount", "reason", "id"}         -> JSON
+    GET /leaderboard?class=10B&name=Alex&limit=10                 -> JSON
+
+Requests are normalised before anything else happens: class names are
+trimmed and whitespace-collapsed, levels are validated and put in print
+order, a missing seed means the standard (unshuffled) copy, and parameters a
+kind does not use are dropped (the deck takes none).  The normalised key
+indexes an in-memory LRU of finished packages bounded by total size, so a
+repeat request is answered straight from memory.  Misses are rendered in a
+process pool whose workers keep the question bank mapped and the fragment
+caches warm; identical requests that arrive while one is rendering wait for
+that render instead of starting another.
+
+/metrics reports hits, misses, coalesced requests, cache size and evictions,
+and latency percentiles for hits, misses and the renders themselves.
+
+/xp and /leaderboard are the lesson page's leaderboard (see leaderboard.py);
+they answer any origin, so the page works when opened from a file or another
+server.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+RenderKey = namedtuple("RenderKey", "kind class_name levels seed")
+
+KINDS = {
+    # kind: (content type, file name stem, parameters it uses)
+    "worksheet":  ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                   "Ex 1K - Worksheet", ("class", "levels", "seed")),
+    "answer-key": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                   "Ex 1K - Answer Key", ("class", "levels", "seed")),
+    "deck":       ("application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                   "Ex 1K - Applications", ()),
+}
+EXTENSIONS = {"worksheet": ".docx", "answer-key": ".docx", "deck": ".pptx"}
+PARAMS = ("class", "levels", "seed")
+
+
+def normalise(kind, query):
+    """RenderKey for a request path and its query dict; ValueError if it is not valid."""
+    from make_worksheet import LEVELS, parse_levels
+    if kind not in KINDS:
+        raise LookupError(kind)
+    unknown = set(query) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+    used = KINDS[kind][2]
+    value = {name: query[name][-1] for name in query if name in used}
+
+    class_name = re.sub(r"\s+", " ", value.get("class", "")).strip()[:40]
+    levels = parse_levels(value["levels"]) if value.get("levels", "").strip() else LEVELS
+    seed = value.get("seed", "").strip()
+    if seed:
+        try:
+            seed = int(seed)
+        except ValueError:
+            raise ValueError("seed must be a whole number") from None
+        if seed < 0:        # numpy's seed sequences only take non-negative entropy
+            raise ValueError("seed must not be negative")
+    return RenderKey(kind, class_name, levels if "levels" in used else (), seed if seed != "" else None)
+
+
+# ── Pool workers ──────────────────────────────────────────────────────────────
+_caches = {}
+
+def _init_worker():
+    import make_pptx
+    import make_worksheet
+    from question_bank import load_bank
+    load_bank()
+    _caches["worksheet"] = make_worksheet.worksheet_cache()
+    _caches["deck"] = make_pptx.deck_cache()
+
+def _warm():
+    return os.getpid()
+
+def render(key):
+    """Package bytes for one normalised request (runs in a pool worker)."""
+    import make_pptx
+    import make_worksheet
+    t0 = time.perf_counter()
+    if key.kind == "worksheet":
+        data = make_worksheet.worksheet_bytes(_caches.get("worksheet"), None,
+                                              key.class_name or None, key.seed, key.levels)
+    elif key.kind == "answer-key":
+        data = make_worksheet.answer_key_bytes(key.class_name or None, key.seed, key.levels)
+    else:
+        data = make_pptx.deck_bytes(_caches.get("deck"))
+    return bytes(data), time.perf_counter() - t0
+
+
+# ── Package cache & metrics ───────────────────────────────────────────────────
+class PackageCache:
+    """LRU of rendered packages, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+            return entry
+
+    def put(self, key, data, etag):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (data, etag)
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, (old, _) = self._items.popitem(last=False)
+                self.bytes -= len(old)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class Latency:
+    """Rolling latency samples (the most recent 1024) in milliseconds."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=1024)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {"count": self.count}
+        ordered = sorted(self.samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+        return {"count": self.count, "mean": round(sum(ordered) / len(ordered), 2),
+                "p50": pick(0.50), "p95": pick(0.95), "max": round(ordered[-1], 2)}
+
+
+class RenderService:
+
+    def __init__(self, workers=None, cache_bytes=64 << 20, leaderboard=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        self.workers = self.pool._max_workers
+        self.cache = PackageCache(cache_bytes)
+        self.started = time.time()
+        self.counts = {"requests": 0, "hits": 0, "misses": 0, "coalesced": 0,
+                       "not_modified": 0, "errors": 0}
+        self.latency = {"hit": Latency(), "miss": Latency(), "render": Latency()}
+        self.leaderboard = leaderboard
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """Start every worker now, so the first requests do not pay for imports."""
+        for future in [self.pool.submit(_warm) for _ in range(self.workers)]:
+            future.result()
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def package(self, key):
+        """(data, etag, hit) for a normalised key, rendering it at most once at a time."""
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.count("hits")
+            return entry + (True,)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = self.pool.submit(render, key)
+                self.counts["misses"] += 1
+            else:
+                self.counts["coalesced"] += 1
+        try:
+            data, seconds = future.result()
+        finally:
+            if owner:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        etag = '"' + hashlib.sha256(data).hexdigest()[:20] + '"'
+        if owner:
+            self.latency["render"].add(seconds)
+            self.cache.put(key, data, etag)
+        return data, etag, False
+
+    def metrics(self):
+        with self._lock:
+            counts = dict(self.counts)
+        lookups = counts["hits"] + counts["misses"] + counts["coalesced"]
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "workers": self.workers,
+            **counts,
+            "hit_rate": round(counts["hits"] / lookups, 3) if lookups else None,
+            "cache": self.cache.stats(),
+            "latency_ms": {name: lat.summary() for name, lat in self.latency.items()},
+            **({"xp_events": self.leaderboard.events} if self.leaderboard else {}),
+        }
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        if self.leaderboard:
+            self.leaderboard.close()
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 1024       # a whole school posting XP at the bell
+
+
+def download_name(key):
+    stem = KINDS[key.kind][1]
+    extras = [key.class_name] if key.class_name else []
+    if key.levels and len(key.levels) < 3:
+        extras.append("+".join(key.levels))
+    if key.seed is not None:
+        extras.append(f"v{key.seed}")
+    name = " - ".join([stem] + extras)
+    return re.sub(r"[^\w .+-]", "_", name) + EXTENSIONS[key.kind]
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "Ex1KRender/1.0"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def send_body(self, status, body, content_type, headers=()):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_json(self, status, obj):
+        self.send_body(status, json.dumps(obj, indent=2).encode("utf-8") + b"\n",
+                       "application/json")
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Max-Age", "86400")
+        self.end_headers()
+
+    def do_POST(self):
+        if urlsplit(self.path).path.strip("/") != "xp" or self.service.leaderboard is None:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if not 0 < length <= 4096:
+                raise ValueError("expected a small JSON body")
+            event = json.loads(self.rfile.read(length))
+            if not isinstance(event, dict):
+                raise ValueError("expected a JSON object")
+            class_name = re.sub(r"\s+", " ", str(event.get("class", ""))).strip()[:40]
+            name = re.sub(r"\s+", " ", str(event.get("name", ""))).strip()[:40]
+            xp = self.service.leaderboard.record(class_name, name, event.get("amount"),
+                                                 str(event.get("reason", "")),
+                                                 str(event["id"])[:64] if event.get("id") else None)
+        except ValueError as e:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except Exception as e:          # the writer failed or timed out; the page retries
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": repr(e)})
+            return
+        self.send_json(HTTPStatus.OK, {"name": name, "class": class_name, "xp": xp})
+
+    def do_GET(self):
+        t0 = time.perf_counter()
+        url = urlsplit(self.path)
+        kind = url.path.strip("/")
+        if kind == "metrics":
+            self.send_json(HTTPStatus.OK, self.service.metrics())
+            return
+        if kind == "leaderboard" and self.service.leaderboard is not None:
+            query = {k: v[-1].strip() for k, v in parse_qs(url.query).items()}
+            try:
+                limit = int(query.get("limit", 10))
+            except ValueError:
+                self.send_json(HTTPStatus.BAD_REQUEST, {"error": "limit must be a whole number"})
+                return
+            self.send_json(HTTPStatus.OK, self.service.leaderboard.board(
+                re.sub(r"\s+", " ", query.get("class", "")), query.get("name"), limit))
+            return
+        self.service.count("requests")
+        try:
+            key = normalise(kind, parse_qs(url.query, keep_blank_values=True))
+        except LookupError:
+            self.send_json(HTTPStatus.NOT_FOUND,
+                           {"error": "not found", "paths": [f"/{k}" for k in KINDS] + ["/metrics"]})
+            return
+        except ValueError as e:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        try:
+            data, etag, hit = self.service.package(key)
+        except Exception as e:
+            self.service.count("errors")
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(e)})
+            return
+
+        self.service.latency["hit" if hit else "miss"].add(time.perf_counter() - t0)
+        cache_state = ("X-Cache", "hit" if hit else "miss")
+        if self.headers.get("If-None-Match") == etag:
+            self.service.count("not_modified")
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header(*cache_state)
+            self.end_headers()
+            return
+        self.send_body(HTTPStatus.OK, data, KINDS[key.kind][0], [
+            ("Content-Disposition", f'attachment; filename="{download_name(key)}"'),
+            ("ETag", etag),
+            cache_state,
+        ])
+
+    def log_message(self, fmt, *args):
+        if not self.server.quiet:
+            sys.stderr.write(f"{self.log_date_time_string()} {fmt % args}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8750)
+    ap.add_argument("--workers", type=int, default=None,
+                    help="render processes (default: one per core)")
+    ap.add_argument("--cache-mb", type=float, default=64,
+                    help="memory for finished packages (default: 64 MB)")
+    ap.add_argument("--leaderboard", default=None, metavar="DB",
+                    help="SQLite file for the page's XP leaderboard (default: leaderboard.db)")
+    ap.add_argument("--no-leaderboard", action="store_true", help="do not serve /xp or /leaderboard")
+    ap.add_argument("--quiet", action="store_true", help="do not log each request")
+    args = ap.parse_args(argv)
+
+    from verify_answers import verify
+    verify()
+    board = None
+    if not args.no_leaderboard:
+        from leaderboard import DB, Leaderboard
+        board = Leaderboard(args.leaderboard or DB)
+    service = RenderService(args.workers, int(args.cache_mb * (1 << 20)), board)
+    service.warm_up()
+    server = Server((args.host, args.port), Handler)
+    server.service = service
+    server.quiet = args.quiet
+    print(f"Serving on http://{args.host}:{server.server_port}/  "
+          f"({service.workers} workers, {args.cache_mb:g} MB cache)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
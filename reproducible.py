@@ -0,0 +1,118 @@
+"""
+Byte-reproducible .docx / .pptx packages.
+
+python-docx and python-pptx stamp every zip entry with the time of the save,
+so two builds of identical content never have identical bytes.  Everything the
+generators write goes through write_package() instead, which fixes what a zip
+would otherwise take from the clock or the platform:
+
+  * every entry's timestamp is 1980-01-01 (or SOURCE_DATE_EPOCH, if set)
+  * entry attributes and the creating system are fixed
+  * [Content_Types].xml comes first, then _rels/.rels, then every other part
+    in natural name order (slide2 before slide10)
+  * relationships are sorted by Id, content-type defaults by extension and
+    overrides by part name
+  * empty elements are always self-closed, so <a:t></a:t> from a freshly
+    rendered slide and <a:t/> from a cached one are the same bytes
+
+The same content therefore always gives the same bytes on any machine with
+the same zlib.
+"""
+import io
+import os
+import re
+import time
+import zipfile
+
+from lxml import etree
+
+CONTENT_TYPES = "[Content_Types].xml"
+ROOT_RELS = "_rels/.rels"
+_EMPTY = re.compile(rb"<([\w:.-]+)((?:\s[^<>]*)?)></\1>")
+
+
+def _epoch():
+    stamp = os.environ.get("SOURCE_DATE_EPOCH")
+    if stamp:
+        return max(time.gmtime(int(stamp))[:6], (1980, 1, 1, 0, 0, 0))
+    return (1980, 1, 1, 0, 0, 0)
+
+def natural(name):
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", name)]
+
+def part_order(names):
+    first = [n for n in (CONTENT_TYPES, ROOT_RELS) if n in names]
+    return first + sorted((n for n in names if n not in first), key=natural)
+
+def zip_info(name, compress_type=zipfile.ZIP_DEFLATED):
+    """A ZipInfo with nothing taken from the clock or the platform."""
+    info = zipfile.ZipInfo(name, _epoch())
+    info.compress_type = compress_type
+    info.create_system = 0
+    info.external_attr = 0o600 << 16
+    return info
+
+
+def _sorted_xml(data, key):
+    root = etree.fromstring(data)
+    children = sorted(root, key=key)
+    if children == list(root):
+        return data
+    root[:] = children
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def canonical_part(name, data):
+    """Part bytes with their unordered children put in a fixed order."""
+    if name.endswith(".rels"):
+        return _sorted_xml(data, lambda el: natural(el.get("Id", "")))
+    if name == CONTENT_TYPES:
+        # Defaults before Overrides, each in name order
+        return _sorted_xml(data, lambda el: (etree.QName(el).localname != "Default",
+                                             (el.get("Extension") or el.get("PartName", "")).lower()))
+    if name.endswith(".xml"):
+        return _EMPTY.sub(rb"<\1\2/>", data)
+    return data
+
+def write_package(parts, out, compression=None, compresslevel=None):
+    """Write {part name: bytes} as a reproducible zip to a path or binary file.
+
+    `compression(name, data)` picks each entry's compress type (default:
+    everything deflated).
+    """
+    target = open(out, "wb") if isinstance(out, (str, os.PathLike)) else out
+    try:
+        # A seekable buffer first, so non-seekable outputs (stdout, sockets) work too
+        buf = io.BytesIO() if not _seekable(target) else target
+        with zipfile.ZipFile(buf, "w") as z:
+            for name in part_order(parts):
+                data = canonical_part(name, parts[name])
+                kind = compression(name, data) if compression else zipfile.ZIP_DEFLATED
+                z.writestr(zip_info(name, kind), data,
+                           compresslevel=compresslevel if kind == zipfile.ZIP_DEFLATED else None)
+        if buf is not target:
+            target.write(buf.getvalue())
+    finally:
+        if target is not out:
+            target.close()
+
+def _seekable(f):
+    try:
+        return f.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+def read_parts(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+def normalise(data):
+    """Reproducible bytes for any OPC package."""
+    buf = io.BytesIO()
+    write_package(read_parts(data), buf)
+    return buf.getvalue()
+
+def save(obj, out):
+    """Save a python-docx Document or python-pptx Presentation reproducibly."""
+    buf = io.BytesIO()
+    obj.save(buf)
+    write_package(read_parts(buf.getvalue()), out)
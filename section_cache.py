@@ -0,0 +1,133 @@
+"""
+On-disk cache of rendered XML fragments for make_worksheet.py and make_pptx.py.
+
+Each worksheet PART and each slide is a cacheable unit.  A unit is keyed by a
+hash of its inputs: the source of the function that renders it, the arguments
+it is rendered with, and a salt covering the shared helpers and palette.  On a
+hit the stored fragment is spliced straight into the document; only units whose
+key changed are rendered again.
+
+Batch and pack builds store a PART per student, so the cache is bounded: the
+in-memory copy holds the MEMO_SIZE most recently used fragments, and once a
+build has written a little the namespace's folder is trimmed back to
+MAX_BYTES, dropping the least recently used fragments first (a hit touches
+its file).
+"""
+import hashlib
+import inspect
+import os
+import tempfile
+from collections import OrderedDict
+
+from lxml import etree
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".build_cache")
+MEMO_SIZE = 512             # fragments kept parsed-ready in memory
+MAX_BYTES = 64 << 20        # on disk, per namespace
+GC_EVERY = MAX_BYTES // 8   # bytes stored between trims
+
+
+def source_salt(*objs):
+    """Hash the source of helper functions (and the repr of anything else)."""
+    h = hashlib.sha256()
+    for obj in objs:
+        obj = inspect.unwrap(obj)       # lru_cache & co. hash as what they wrap
+        if inspect.isfunction(obj) or inspect.isclass(obj):
+            h.update(inspect.getsource(obj).encode("utf-8"))
+        else:
+            h.update(repr(obj).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SectionCache:
+    """Fragment store for one kind of document ("worksheet", "deck", …)."""
+
+    def __init__(self, namespace, salt, parse_xml, cache_dir=CACHE_DIR,
+                 max_bytes=MAX_BYTES, memo_size=MEMO_SIZE):
+        self.dir = os.path.join(cache_dir, namespace)
+        self.salt = salt
+        self.parse_xml = parse_xml
+        self.max_bytes = max_bytes
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._unchecked = None      # bytes stored since the last gc(); None before the first store
+
+    def key(self, fn, args):
+        h = hashlib.sha256(self.salt.encode("utf-8"))
+        h.update(inspect.getsource(fn).encode("utf-8"))
+        h.update(repr(args).encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.dir, key[:2], key + ".xml")
+
+    def fragment(self, key):
+        """Freshly parsed elements for `key`, or None on a miss."""
+        blob = self._memo.get(key)
+        if blob is None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    blob = f.read()
+                os.utime(path)              # recently used, for gc()
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            self._memo[key] = blob
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        else:
+            self._memo.move_to_end(key)
+        self.hits += 1
+        return list(self.parse_xml(blob))
+
+    def store(self, key, elements):
+        # Not memoised here: a per-student PART is rarely seen twice, and a
+        # class pack should not hold every one of them in memory
+        blob = b"<fragment>" + b"".join(etree.tostring(el) for el in elements) + b"</fragment>"
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent builds never see a half-written entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        # Trim on the first store of a build and then every GC_EVERY bytes, so
+        # a build that only hits never walks the folder
+        if self._unchecked is None or self._unchecked + len(blob) > GC_EVERY:
+            self.gc(self.max_bytes)
+            self._unchecked = 0
+        else:
+            self._unchecked += len(blob)
+
+    def gc(self, max_bytes):
+        """Drop the least recently used fragments until the folder fits in
+        `max_bytes`.  Returns (fragments removed, bytes freed)."""
+        entries = []
+        for sub, _, names in os.walk(self.dir):
+            for name in names:
+                path = os.path.join(sub, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:   # removed by a concurrent build
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def summary(self):
+        return f"cache: {self.hits} hit(s), {self.misses} miss(es)"
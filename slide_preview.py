@@ -0,0 +1,347 @@
+"""
+SVG previews of the deck, for checking a change without PowerPoint.
+
+    python slide_preview.py                       # build the deck, write preview/
+    python slide_preview.py --deck lesson.pptx    # preview a saved deck instead
+    python build_daemon.py preview                # warm; re-rendered on every save
+
+Each slide becomes preview/slideNN.svg and preview/index.html shows them all
+as a contact sheet.  The renderer walks the shapes make_pptx.py writes:
+rectangles from add_rect(), text boxes from add_text() and add_label_box(),
+the placeholders header_bar() fills, and the shapes and backgrounds the
+layouts carry.  Text is laid out with text_fit, the metrics add_text() sizes
+it with, each paragraph in the style of its first run.  Shadows and pictures
+are left out; this is a check of placement and overflow, not a print proof.
+
+An SVG depends only on the slide's XML, so an unchanged slide renders to the
+same bytes.  Each new SVG is compared with the one already on disk: changed
+slides are listed, their previous version is kept as slideNN.before.svg, and
+the contact sheet shows the two side by side.
+"""
+import argparse
+import glob
+import html
+import os
+import sys
+import time
+
+import text_fit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OUTPUT = os.path.join(HERE, "preview")
+
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+NO_FILL, SOLID_FILL = f"{A}noFill", f"{A}solidFill"
+PARA, RUN, TEXT = f"{A}p", f"{A}r", f"{A}t"
+EMU_PER_PT = 12700
+DESCENT = 0.25          # em below the baseline, Calibri's
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)   # l t r b, in EMU
+ALIGN = {"l": "start", "ctr": "middle", "r": "end", "just": "start"}
+# Placeholder types that inherit from the master's title / body placeholder
+MASTER_PH = {"title": "title", "ctrTitle": "title", "body": "body", "subTitle": "body"}
+
+def _pt(emu):
+    return int(emu) / EMU_PER_PT
+
+def _num(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+def _child(el, *tags):
+    """Follow a path of child tags; a plain loop is several times faster than find()."""
+    for tag in tags:
+        if el is None:
+            return None
+        for child in el:
+            if child.tag == tag:
+                el = child
+                break
+        else:
+            return None
+    return el
+
+def _color(el):
+    """'#RRGGBB' of an element's solid fill, 'none' for noFill, None if unset."""
+    if el is None:
+        return None
+    for child in el:
+        if child.tag == NO_FILL:
+            return "none"
+        if child.tag == SOLID_FILL:
+            rgb = _child(child, f"{A}srgbClr")
+            return f"#{rgb.get('val')}" if rgb is not None else None
+    return None
+
+
+# ── Placeholder inheritance ──────────────────────────────────────────────────
+# A shape's own text settings: bodyPr insets / wrap, and the first level of its
+# list style (alignment and default run properties)
+_BODY_ATTRS = ("lIns", "tIns", "rIns", "bIns", "wrap")
+
+def _ph_key(sp):
+    ph = _child(sp, f"{P}nvSpPr", f"{P}nvPr", f"{P}ph")
+    if ph is None:
+        return None
+    return ph.get("type", "body"), ph.get("idx", "0")
+
+def _own(sp):
+    """(box, text settings) set on the shape itself."""
+    box, props = None, {}
+    xfrm = _child(sp, f"{P}spPr", f"{A}xfrm")
+    if xfrm is not None:
+        off, ext = _child(xfrm, f"{A}off"), _child(xfrm, f"{A}ext")
+        box = _pt(off.get("x")), _pt(off.get("y")), _pt(ext.get("cx")), _pt(ext.get("cy"))
+    body = _child(sp, f"{P}txBody")
+    if body is None:
+        return box, props
+    body_pr = _child(body, f"{A}bodyPr")
+    for attr in _BODY_ATTRS:
+        if body_pr is not None and body_pr.get(attr) is not None:
+            props[attr] = body_pr.get(attr)
+    lvl = _child(body, f"{A}lstStyle", f"{A}lvl1pPr")
+    if lvl is not None:
+        if lvl.get("algn"):
+            props["algn"] = lvl.get("algn")
+        rpr = _child(lvl, f"{A}defRPr")
+        if rpr is not None:
+            props.update({a: rpr.get(a) for a in ("sz", "b", "i") if rpr.get(a) is not None})
+            if _color(rpr):
+                props["color"] = _color(rpr)
+    return box, props
+
+class _Inheritance:
+    """Resolved layout + master placeholder settings, computed once per layout."""
+
+    def __init__(self, master):
+        self.master = {}
+        for sp in master.iter(f"{P}sp"):
+            key = _ph_key(sp)
+            if key:
+                self.master.setdefault(key[0], _own(sp))
+        self.layouts = {}
+
+    def resolve(self, layout, key):
+        placeholders = self.layouts.get(layout)
+        if placeholders is None:
+            placeholders = self.layouts[layout] = {}
+            for sp in layout.iter(f"{P}sp"):
+                found = _ph_key(sp)
+                if found:
+                    placeholders.setdefault(found, _own(sp))
+                    placeholders.setdefault(found[0], placeholders[found])
+        box, props = self.master.get(MASTER_PH.get(key[0], key[0]), (None, {}))
+        layout_box, layout_props = placeholders.get(key) or placeholders.get(key[0]) or (None, {})
+        return layout_box or box, {**props, **layout_props}
+
+def _settings(sp, inheritance, layout):
+    box, props = _own(sp)
+    key = _ph_key(sp)
+    if key is None:
+        return box, props
+    inherited_box, inherited = inheritance.resolve(layout, key)
+    return box or inherited_box, {**inherited, **props}
+
+
+# ── Shapes ───────────────────────────────────────────────────────────────────
+def _rect_svg(sp, box):
+    x, y, w, h = box
+    sp_pr = _child(sp, f"{P}spPr")
+    fill = _color(sp_pr) or "none"
+    ln = _child(sp_pr, f"{A}ln")
+    stroke = _color(ln) if ln is not None else None
+    if stroke == "none":
+        stroke = None
+    if fill == "none" and not stroke:
+        return ""
+    attrs = f'x="{_num(x)}" y="{_num(y)}" width="{_num(w)}" height="{_num(h)}" fill="{fill}"'
+    if stroke:
+        attrs += f' stroke="{stroke}" stroke-width="{_num(max(_pt(ln.get("w", 0)), 0.75))}"'
+    return f"<rect {attrs}/>"
+
+def _text_svg(sp, box, props):
+    x, y, w, h = box
+    body = _child(sp, f"{P}txBody")
+    if body is None:
+        return ""
+    left, top, right = (_pt(props.get(a, d)) for a, d in zip(_BODY_ATTRS, DEFAULT_INSETS) if a != "bIns")
+    wrap = props.get("wrap") != "none"
+    width = w - left - right
+
+    out, cursor = [], y + top
+    paragraphs = [p for p in body if p.tag == PARA]
+    for i, p in enumerate(paragraphs):
+        runs = [r for r in p if r.tag == RUN]
+        text = "".join(_child(r, TEXT).text or "" for r in runs)
+        rpr = _child(runs[0], f"{A}rPr") if runs else None
+        if rpr is None:
+            rpr = _child(p, f"{A}endParaRPr")
+        own = rpr.get if rpr is not None else (lambda a: None)
+        size = int(own("sz") or props.get("sz") or 1800) / 100
+        bold = (own("b") or props.get("b")) in ("1", "true")
+        italic = (own("i") or props.get("i")) in ("1", "true")
+        ppr = _child(p, f"{A}pPr")
+        if ppr is not None:
+            before = _child(ppr, f"{A}spcBef", f"{A}spcPts")
+            if i and before is not None:
+                cursor += int(before.get("val")) / 100
+        if not text:
+            cursor += size * text_fit.LINE_HEIGHT
+            continue
+        color = _color(rpr) or props.get("color") or "#000000"
+        align = (ppr.get("algn") if ppr is not None else None) or props.get("algn") or "l"
+        lines = text_fit.wrap_lines(text, width, size, bold) if wrap else text.split("\n")
+        anchor = ALIGN.get(align, "start")
+        tx = {"start": x + left, "middle": x + left + width / 2, "end": x + w - right}[anchor]
+        attrs = f'font-size="{_num(size)}" fill="{color}"'
+        if bold:
+            attrs += ' font-weight="bold"'
+        if italic:
+            attrs += ' font-style="italic"'
+        if anchor != "start":
+            attrs += f' text-anchor="{anchor}"'
+        for line in lines:
+            cursor += size * text_fit.LINE_HEIGHT
+            baseline = cursor - size * DESCENT
+            out.append(f'<text x="{_num(tx)}" y="{_num(baseline)}" {attrs}>{html.escape(line)}</text>')
+    return "".join(out)
+
+def _shapes_svg(tree, inheritance, layout, placeholders=True):
+    out = []
+    for sp in _child(tree, f"{P}cSld", f"{P}spTree").iter(f"{P}sp"):
+        if not placeholders and _ph_key(sp):
+            continue                    # a layout's empty placeholders are not drawn
+        box, props = _settings(sp, inheritance, layout)
+        if box is None:
+            continue
+        out.append(_rect_svg(sp, box) + _text_svg(sp, box, props))
+    return "".join(out)
+
+def _background(*trees):
+    for tree in trees:
+        color = _color(tree.find(f"{P}cSld/{P}bg/{P}bgPr"))
+        if color:
+            return color
+    return "#FFFFFF"
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+def render(prs):
+    """One SVG string per slide of a python-pptx Presentation."""
+    width, height = _pt(prs.slide_width), _pt(prs.slide_height)
+    layouts = {}                # layout element -> its drawn shapes, rendered once
+    masters = {}                # master element -> its placeholder settings
+    svgs = []
+    for slide in prs.slides:
+        layout = slide.slide_layout._element
+        master = slide.slide_layout.slide_master._element
+        if master not in masters:
+            masters[master] = _Inheritance(master)
+        inheritance = masters[master]
+        if layout not in layouts:
+            layouts[layout] = _shapes_svg(layout, inheritance, layout, placeholders=False)
+        bg = _background(slide._element, layout, master)
+        svgs.append(
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_num(width)} {_num(height)}" '
+            f'xml:space="preserve" font-family="Calibri, Carlito, \'Segoe UI\', sans-serif">'
+            f'<rect width="100%" height="100%" fill="{bg}"/>'
+            f'{layouts[layout]}{_shapes_svg(slide._element, inheritance, layout)}</svg>\n')
+    return svgs
+
+SHEET = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Deck preview</title>
+<style>
+body {{ font: 14px system-ui, sans-serif; margin: 24px; background: #eee; }}
+.grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax({width}px, 1fr)); gap: 20px; }}
+figure {{ margin: 0; background: #fff; padding: 8px; box-shadow: 0 1px 3px #0003; }}
+figure.changed {{ grid-column: span 2; outline: 3px solid #E8571A; }}
+figure img {{ width: 100%; display: block; border: 1px solid #ccc; }}
+.pair {{ display: grid; grid-template-columns: 1fr 1fr; gap: 8px; }}
+figcaption {{ margin-top: 6px; color: #444; }}
+</style></head><body>
+<h1>Deck preview</h1>
+<p>{summary}</p>
+<div class="grid">
+{figures}
+</div></body></html>
+"""
+
+def contact_sheet(count, changed, summary, width=320):
+    figures = []
+    for n in range(1, count + 1):
+        name = f"slide{n:02d}.svg"
+        if n in changed and changed[n]:
+            before = f"slide{n:02d}.before.svg"
+            figures.append(
+                f'<figure class="changed"><div class="pair"><a href="{before}"><img src="{before}" '
+                f'alt="slide {n} before"></a><a href="{name}"><img src="{name}" alt="slide {n}"></a>'
+                f'</div><figcaption>Slide {n}, changed: before | after</figcaption></figure>')
+        else:
+            note = ", new" if n in changed else ""
+            figures.append(f'<figure><a href="{name}"><img src="{name}" alt="slide {n}">'
+                           f'</a><figcaption>Slide {n}{note}</figcaption></figure>')
+    return SHEET.format(width=width, summary=html.escape(summary), figures="\n".join(figures))
+
+def write_preview(svgs, folder):
+    """Write the SVGs and contact sheet to `folder`.
+
+    Returns {slide number: had a previous version} for the slides that changed.
+    """
+    os.makedirs(folder, exist_ok=True)
+    for stale in glob.glob(os.path.join(folder, "slide*.before.svg")):
+        os.remove(stale)
+    changed = {}
+    for n, svg in enumerate(svgs, 1):
+        path = os.path.join(folder, f"slide{n:02d}.svg")
+        data = svg.encode("utf-8")
+        try:
+            with open(path, "rb") as f:
+                old = f.read()
+        except FileNotFoundError:
+            old = None
+        if old == data:
+            continue
+        if old is not None:
+            os.replace(path, os.path.join(folder, f"slide{n:02d}.before.svg"))
+        with open(path, "wb") as f:
+            f.write(data)
+        changed[n] = old is not None
+    for n in range(len(svgs) + 1, 1000):        # slides the deck no longer has
+        path = os.path.join(folder, f"slide{n:02d}.svg")
+        if not os.path.exists(path):
+            break
+        os.remove(path)
+    return changed
+
+def describe(changed, count):
+    if not changed:
+        return f"{count} slide(s), none changed"
+    return f"{count} slide(s), {len(changed)} changed: " + ", ".join(map(str, sorted(changed)))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-o", "--output", default=OUTPUT, help="folder for the SVGs and index.html")
+    ap.add_argument("--deck", help="preview this .pptx instead of building the deck")
+    ap.add_argument("--no-cache", action="store_true", help="render every slide from scratch")
+    ap.add_argument("--width", type=int, default=320, help="contact sheet thumbnail width (px)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.deck:
+        from pptx import Presentation
+        prs = Presentation(args.deck)
+    else:
+        import make_pptx
+        prs = make_pptx.build_deck(None if args.no_cache else make_pptx.deck_cache())
+    t1 = time.perf_counter()
+    svgs = render(prs)
+    t2 = time.perf_counter()
+    changed = write_preview(svgs, args.output)
+    summary = describe(changed, len(svgs))
+    with open(os.path.join(args.output, "index.html"), "w", encoding="utf-8") as f:
+        f.write(contact_sheet(len(svgs), changed, summary, args.width))
+    print(f"preview: {summary}; deck {1000 * (t1 - t0):.0f} ms, "
+          f"rendered in {1000 * (t2 - t1):.0f} ms -> {os.path.join(args.output, 'index.html')}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
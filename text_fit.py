@@ -0,0 +1,226 @@
+"""
+Font-metric text fitting for the deck's text boxes.
+
+    python text_fit.py deck.pptx [...]      # list every box whose text overflows
+
+add_text() in make_pptx.py places text in boxes of fixed size.  fit_size()
+picks the largest font size (the requested one at most) at which the text,
+wrapped the way PowerPoint wraps it, fits inside the box, so a longer stage
+description or problem shrinks instead of spilling over the next shape.
+
+Text is measured with glyph-advance tables rather than rendered: the advances
+of the theme font (Calibri, regular and bold) are tabulated below in 1/1000
+em, and each word's width is computed once and cached, so laying out
+thousands of slides costs a dictionary lookup per word.  A box is the shape
+less PowerPoint's default insets (0.1" left and right, 0.05" top and bottom);
+a line is 1.2 em tall, as single spacing is for Calibri.
+
+Other fonts are tabulated from their .ttf once with register_font() (needs
+Pillow) and then named with `font=`.  Characters outside a table fall back to
+an estimate by Unicode width (emoji and CJK are a full em).
+"""
+import argparse
+import functools
+import re
+import sys
+import unicodedata
+from collections import namedtuple
+
+EMU_PER_INCH = 914400
+PT_PER_INCH = 72
+INSET_X = 0.1           # inches each side, PowerPoint's default for a text box
+INSET_Y = 0.05
+LINE_HEIGHT = 1.2       # em
+MIN_SIZE = 8            # pt; text is never shrunk below this
+STEP = 0.5              # pt between candidate sizes
+
+# ── Glyph advances ───────────────────────────────────────────────────────────
+# Calibri advances for U+0020..U+007E, in 1/1000 em
+_CALIBRI_ASCII = (
+    226, 326, 401, 498, 507, 715, 682, 221, 303, 303, 498, 498, 250, 306, 252, 386,
+    507, 507, 507, 507, 507, 507, 507, 507, 507, 507, 268, 268, 498, 498, 498, 463,
+    894, 579, 544, 533, 615, 488, 459, 631, 623, 252, 319, 520, 420, 855, 646, 662,
+    517, 673, 543, 459, 487, 642, 567, 890, 519, 487, 468, 307, 386, 307, 498, 498,
+    291, 479, 525, 423, 525, 498, 305, 471, 525, 230, 239, 455, 230, 799, 525, 527,
+    525, 525, 349, 391, 335, 525, 452, 715, 433, 453, 395, 314, 460, 314, 498,
+)
+_CALIBRI_BOLD_ASCII = (
+    226, 326, 438, 498, 507, 729, 705, 233, 312, 312, 498, 498, 258, 306, 267, 430,
+    507, 507, 507, 507, 507, 507, 507, 507, 507, 507, 276, 276, 498, 498, 498, 463,
+    898, 606, 561, 529, 630, 488, 459, 637, 631, 267, 331, 547, 423, 874, 659, 676,
+    532, 686, 563, 473, 495, 653, 591, 906, 551, 520, 478, 325, 430, 325, 498, 498,
+    300, 494, 537, 418, 537, 503, 316, 474, 537, 246, 255, 480, 246, 813, 537, 538,
+    537, 537, 355, 399, 347, 537, 473, 745, 459, 474, 397, 344, 475, 344, 498,
+)
+# Punctuation and symbols the lessons use beyond ASCII (same in both weights)
+_CALIBRI_EXTRA = {
+    " ": 226, "–": 498, "—": 905, "‘": 250, "’": 250, "“": 418, "”": 418,
+    "•": 498, "…": 690, "×": 498, "÷": 498, "±": 498, "≤": 498, "≥": 498, "≠": 498,
+    "→": 1000, "←": 1000, "°": 332, "²": 342, "³": 342, "½": 797, "£": 507, "€": 507,
+}
+
+_ASCII = [chr(c) for c in range(32, 127)]
+
+# font name -> (regular advances, bold advances)
+TABLES = {
+    "Calibri": ({**dict(zip(_ASCII, _CALIBRI_ASCII)), **_CALIBRI_EXTRA},
+                {**dict(zip(_ASCII, _CALIBRI_BOLD_ASCII)), **_CALIBRI_EXTRA}),
+}
+FONT = "Calibri"        # the theme's body font, which add_text() boxes use
+
+def font_table(path, chars=None):
+    """Advances of a TrueType/OpenType font in 1/1000 em, measured with Pillow."""
+    from PIL import ImageFont
+    font = ImageFont.truetype(path, 1000)
+    return {ch: round(font.getlength(ch)) for ch in chars or _ASCII + list(_CALIBRI_EXTRA)}
+
+def register_font(name, regular, bold=None):
+    """Tabulate a font from its .ttf file(s) once, for use as fit(..., font=name)."""
+    regular = font_table(regular)
+    TABLES[name] = (regular, font_table(bold) if bold else regular)
+    _word_em.cache_clear()
+
+def _fallback(ch):
+    """An advance for a character no table covers."""
+    if unicodedata.category(ch) in ("Mn", "Me", "Cf"):
+        return 0                # joiners, variation selectors, accents
+    if unicodedata.east_asian_width(ch) in "WF":
+        return 1000             # emoji, CJK
+    return 600
+
+@functools.lru_cache(maxsize=65536)
+def _word_em(word, bold, font):
+    advances = TABLES[font][bool(bold)]
+    return sum(advances[ch] if ch in advances else _fallback(ch) for ch in word) / 1000
+
+def text_width(text, size, bold=False, font=FONT):
+    """Width of one line of `text` at `size` pt, in points."""
+    return _word_em(text, bold, font) * size
+
+# ── Wrapping ─────────────────────────────────────────────────────────────────
+# A line may break after a run of spaces or after a hyphen, as in PowerPoint
+_PIECES = re.compile(r"[^\s-]+-?|-+|[^\S\n]+")
+
+def _break_word(word, width, size, bold, font):
+    """Split a word too wide for a line at character boundaries."""
+    lines, line = [], ""
+    for ch in word:
+        if line and text_width(line + ch, size, bold, font) > width:
+            lines.append(line)
+            line = ""
+        line += ch
+    return lines, line
+
+def wrap_lines(text, width, size, bold=False, font=FONT):
+    """The lines PowerPoint would show for `text` in a column `width` pt wide."""
+    lines = []
+    for para in text.split("\n"):
+        line, line_w, gap = "", 0.0, ""
+        for piece in _PIECES.findall(para):
+            if piece.isspace():
+                gap += piece
+                continue
+            piece_w = text_width(piece, size, bold, font)
+            gap_w = text_width(gap, size, bold, font) if gap else 0.0
+            if not line:
+                line, line_w = piece, piece_w
+            elif line_w + gap_w + piece_w <= width:
+                line, line_w = line + gap + piece, line_w + gap_w + piece_w
+            else:
+                lines.append(line)
+                line, line_w = piece, piece_w
+            gap = ""
+            if line_w > width:
+                broken, line = _break_word(line, width, size, bold, font)
+                lines.extend(broken)
+                line_w = text_width(line, size, bold, font)
+        lines.append(line)
+    return lines
+
+# ── Fitting ──────────────────────────────────────────────────────────────────
+Fit = namedtuple("Fit", "size lines fits")
+
+def _inner(w, h):
+    """Usable width and height in points of a w x h inch box."""
+    return (max(w - 2 * INSET_X, 0) * PT_PER_INCH, max(h - 2 * INSET_Y, 0) * PT_PER_INCH)
+
+def _fits(text, width, height, size, bold, wrap, font):
+    if wrap:
+        lines = wrap_lines(text, width, size, bold, font)
+        return lines, len(lines) * size * LINE_HEIGHT <= height
+    lines = text.split("\n")
+    ok = (len(lines) * size * LINE_HEIGHT <= height
+          and max(text_width(line, size, bold, font) for line in lines) <= width)
+    return lines, ok
+
+def fit(text, w, h, size, bold=False, wrap=True, min_size=MIN_SIZE, font=FONT):
+    """The largest size from `size` down to `min_size` at which `text` fits a
+    w x h inch box, with its lines; `fits` is False if even `min_size` overflows."""
+    width, height = _inner(w, h)
+    lines, ok = _fits(text, width, height, size, bold, wrap, font)
+    if ok or size <= min_size:
+        return Fit(size, lines, ok)
+    # Taller with every step up, so the candidates can be bisected
+    steps = int((size - min_size) / STEP)
+    lo, hi, best = 1, steps, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        candidate = size - mid * STEP
+        lines, ok = _fits(text, width, height, candidate, bold, wrap, font)
+        if ok:
+            best, hi = Fit(candidate, lines, True), mid - 1
+        else:
+            lo = mid + 1
+    if best:
+        return best
+    lines, _ = _fits(text, width, height, min_size, bold, wrap, font)
+    return Fit(min_size, lines, False)
+
+def fit_size(text, w, h, size, bold=False, wrap=True, min_size=MIN_SIZE, font=FONT):
+    """Just the font size fit() picks."""
+    return fit(text, w, h, size, bold, wrap, min_size, font).size
+
+# ── Checking a saved deck ────────────────────────────────────────────────────
+Overflow = namedtuple("Overflow", "slide shape text size need have")
+
+def overflows(prs):
+    """Every single-size text box in a Presentation whose text does not fit."""
+    found = []
+    for number, slide in enumerate(prs.slides, 1):
+        for shape in slide.shapes:
+            if not shape.has_text_frame or shape.width is None:
+                continue
+            tf = shape.text_frame
+            runs = [r for p in tf.paragraphs for r in p.runs]
+            sizes = {r.font.size for r in runs}
+            if not runs or len(sizes) != 1 or None in sizes:
+                continue        # placeholder text, or mixed sizes: not ours to judge
+            text = "\n".join(p.text for p in tf.paragraphs)
+            size, bold = runs[0].font.size.pt, bool(runs[0].font.bold)
+            w, h = shape.width / EMU_PER_INCH, shape.height / EMU_PER_INCH
+            width, height = _inner(w, h)
+            lines, ok = _fits(text, width, height, size, bold, tf.word_wrap is not False, FONT)
+            if not ok:
+                need = len(lines) * size * LINE_HEIGHT / PT_PER_INCH + 2 * INSET_Y
+                found.append(Overflow(number, shape.name, text, size, need, h))
+    return found
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("decks", nargs="+", help=".pptx files to check")
+    args = ap.parse_args(argv)
+    from pptx import Presentation
+    bad = 0
+    for path in args.decks:
+        for o in overflows(Presentation(path)):
+            bad += 1
+            snippet = o.text.replace("\n", " / ")
+            snippet = snippet if len(snippet) <= 50 else snippet[:47] + "..."
+            print(f'{path}: slide {o.slide}, {o.shape}: {o.size:g}pt needs {o.need:.2f}" '
+                  f'of {o.have:.2f}"  "{snippet}"')
+    if not bad:
+        print("every text box fits")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
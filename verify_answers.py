@@ -0,0 +1,188 @@
+"""
+Answer-key verification for every stated system in the lesson content.
+
+Every bank entry with a `system` states a pair of linear equations and an
+exact answer `key`, which must give a value for each unknown.  All systems
+are parsed with Fraction arithmetic, scaled to integer coefficients and solved
+together in one vectorised Cramer's-rule pass; each key value p/q is compared
+by cross-multiplication, so nothing is ever rounded.  A web `answer` must be one of the key values, or its floor/ceiling
+when the exact value is not a whole number (e.g. "445" units to break even).
+
+Generated variants (problem_generator.py) are checked the same way, straight
+from their integer arrays, by substituting the solution back into both
+equations — hundreds of thousands of rows take milliseconds.
+
+The generators call verify() before building and stop on any mismatch.  The
+lesson entries (warm-up, worked examples, special cases, exit ticket) are what
+the slides and worksheet print from: their givens, equations, working and
+answers are all read off the entry's system and key with equations() and
+key_values(), so every number shown in class is one checked here.
+
+Usage:  python verify_answers.py [--variants N]
+"""
+import argparse
+import math
+import re
+import sys
+from fractions import Fraction
+
+import numpy as np
+
+from question_bank import load_bank
+
+
+class AnswerKeyError(Exception):
+    pass
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+_TERM = re.compile(r"([+-]?)\s*(\d+(?:\.\d+)?(?:/\d+)?)?\s*([A-Za-z]\w*)?\s*")
+
+def parse_side(text):
+    """'12a + 7s - 3' -> ({'a': 12, 's': 7}, -3) with Fraction values."""
+    coeffs, const = {}, Fraction(0)
+    text = text.replace("−", "-").strip()
+    pos = 0
+    while pos < len(text):
+        m = _TERM.match(text, pos)
+        sign, num, var = m.groups()
+        if m.end() == pos or not (num or var) or (pos and not sign):
+            raise ValueError(f"cannot parse {text!r}")
+        value = Fraction(num) if num else Fraction(1)
+        if sign == "-":
+            value = -value
+        if var:
+            coeffs[var] = coeffs.get(var, 0) + value
+        else:
+            const += value
+        pos = m.end()
+    return coeffs, const
+
+def parse_equation(text):
+    """'C = 18n + 12000' -> ({'C': 1, 'n': -18}, 12000)  i.e. C − 18n = 12000."""
+    lhs, rhs = text.split("=")
+    lc, lk = parse_side(lhs)
+    rc, rk = parse_side(rhs)
+    coeffs = dict(lc)
+    for var, value in rc.items():
+        coeffs[var] = coeffs.get(var, 0) - value
+    return coeffs, rk - lk
+
+def equations(q):
+    """A bank entry's system as [({var: coeff}, const), …], unknowns on the left."""
+    return [parse_equation(eq) for eq in q.system]
+
+def key_values(q):
+    """A bank entry's key as {var: Fraction}, in key order; empty for "none" / "infinite"."""
+    return {var.strip(): Fraction(value.strip())
+            for var, eq, value in (k.partition("=") for k in q.key) if eq}
+
+def integer_row(coeffs, const, names):
+    """Scale one equation to integer coefficients (a, b, c)."""
+    values = [Fraction(coeffs.get(n, 0)) for n in names] + [Fraction(const)]
+    scale = math.lcm(*(v.denominator for v in values))
+    return [int(v * scale) for v in values]
+
+
+# ── Batched solve ─────────────────────────────────────────────────────────────
+def solve_systems(systems):
+    """Solve many 2×2 systems at once.
+
+    `systems` is a list of (eq1, eq2) strings.  Returns (names, det, xn, yn, consistent):
+    the variable names of each system and integer arrays such that x = xn/det,
+    y = yn/det when det != 0; `consistent` says whether a singular system has
+    infinitely many solutions (True) or none (False).
+    """
+    names, rows = [], []
+    for eq1, eq2 in systems:
+        p1, p2 = parse_equation(eq1), parse_equation(eq2)
+        vars_ = sorted(set(p1[0]) | set(p2[0]), key=(eq1 + eq2).index)
+        if len(vars_) != 2:
+            raise AnswerKeyError(f"{eq1!r}, {eq2!r}: expected two unknowns, found {vars_}")
+        names.append(vars_)
+        rows.append(integer_row(*p1, vars_) + integer_row(*p2, vars_))
+    # Object arrays keep Python's unbounded ints should a bank ever overflow int64
+    big = any(abs(v) >= 2**31 for r in rows for v in r)
+    a1, b1, c1, a2, b2, c2 = np.array(rows, dtype=object if big else np.int64).reshape(-1, 6).T
+    det = a1 * b2 - a2 * b1
+    xn = c1 * b2 - b1 * c2
+    yn = a1 * c2 - c1 * a2
+    consistent = (xn == 0) & (yn == 0)
+    return names, det, xn, yn, consistent
+
+def check_bank(bank=None):
+    """Every mismatch between a stated system and its key, as readable strings."""
+    bank = bank or load_bank()
+    items = [q for q in bank if q.system]
+    if not items:
+        return []
+    names, det, xn, yn, consistent = solve_systems([q.system for q in items])
+    problems = []
+    for i, q in enumerate(items):
+        where = f"{q.id} ({q.title})"
+        x, y = names[i]
+        if det[i] == 0:
+            actual = "infinite" if consistent[i] else "none"
+            if q.key != (actual,):
+                problems.append(f"{where}: system has {actual} solutions, key says {', '.join(q.key)}")
+            elif q.answer and actual not in q.answer.lower():
+                problems.append(f"{where}: answer {q.answer!r} but system has {actual} solutions")
+            continue
+        exact = {x: Fraction(int(xn[i]), int(det[i])), y: Fraction(int(yn[i]), int(det[i]))}
+        stated = {entry.partition("=")[0].strip() for entry in q.key}
+        for var in exact:
+            if var not in stated:
+                problems.append(f"{where}: key gives no value for {var} "
+                                f"({var} = {exact[var]})")
+        for entry in q.key:
+            var, _, value = entry.partition("=")
+            var = var.strip()
+            if var not in exact:
+                problems.append(f"{where}: key names unknown variable {var!r}")
+            elif Fraction(value.strip()) != exact[var]:
+                problems.append(f"{where}: key says {var} = {value.strip()}, "
+                                f"but {var} = {exact[var]} ({float(exact[var]):g})")
+        if q.answer and re.fullmatch(r"-?\d+(\.\d+)?", q.answer):
+            ans = Fraction(q.answer)
+            ok = any(ans in (v, math.floor(v), math.ceil(v)) for v in exact.values())
+            if not ok:
+                problems.append(f"{where}: answer {q.answer} matches no solution "
+                                f"({', '.join(f'{k} = {float(v):g}' for k, v in exact.items())})")
+    return problems
+
+def check_variants(qid, variants):
+    """Indices of generated variants whose stored solution does not satisfy the system."""
+    from problem_generator import TEMPLATES
+    t = TEMPLATES[qid]
+    a1, b1, c1, a2, b2, c2 = (np.asarray(v, dtype=np.int64) for v in t.system(variants))
+    xs, ys = variants["xs"], variants["ys"]
+    bad = (a1 * xs + b1 * ys != c1 * t.unit) | (a2 * xs + b2 * ys != c2 * t.unit)
+    return np.flatnonzero(bad)
+
+def verify(bank=None):
+    """Raise AnswerKeyError listing every mismatch in the bank."""
+    problems = check_bank(bank)
+    if problems:
+        raise AnswerKeyError("answer key mismatch:\n  " + "\n  ".join(problems))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check every stated answer key.")
+    ap.add_argument("--variants", type=int, default=0,
+                    help="also generate and check N variants of every template")
+    args = ap.parse_args(argv)
+
+    problems = check_bank()
+    if args.variants:
+        from problem_generator import TEMPLATES, generate
+        for qid in TEMPLATES:
+            bad = check_variants(qid, generate(qid, args.variants))
+            problems += [f"{qid} variant {i}: solution does not satisfy the system" for i in bad[:10]]
+    if problems:
+        print("\n".join(problems), file=sys.stderr)
+        return 1
+    print("All answer keys check out.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())